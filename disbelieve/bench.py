@@ -0,0 +1,925 @@
+try: from .libs.colors import cc, cprint
+except: from libs.colors import cc, cprint
+try: from .libs.config import FIRST_BUY_AMOUNT, NEXT_BUY_AMOUNT, GAS
+except: from libs.config import FIRST_BUY_AMOUNT, NEXT_BUY_AMOUNT, GAS
+try: from .libs.meteoraDBC.state import (
+    VirtualPool, VirtualPoolLayout, VIRTUAL_POOL_FIELDS, VIRTUAL_POOL_SIZE,
+    sqrt_price_from_account, price_from_sqrt, Q64,
+)
+except: from libs.meteoraDBC.state import (
+    VirtualPool, VirtualPoolLayout, VIRTUAL_POOL_FIELDS, VIRTUAL_POOL_SIZE,
+    sqrt_price_from_account, price_from_sqrt, Q64,
+)
+try: from .libs.feed import LogFeed
+except: from libs.feed import LogFeed
+try: from .libs.timers import TimerHeap
+except: from libs.timers import TimerHeap
+try: from .libs.meteoraDBC.swap import MeteoraDBCSwap, WSOL_MINT
+except: from libs.meteoraDBC.swap import MeteoraDBCSwap, WSOL_MINT
+try: from .libs.broadcast import Broadcaster
+except: from libs.broadcast import Broadcaster
+try: from .libs.rpcpool import ReadPool
+except: from libs.rpcpool import ReadPool
+try: from .libs.confirm import ConfirmationTracker
+except: from libs.confirm import ConfirmationTracker
+try: from .libs.meteoraDBC.quote import CurveQuoter, delta_quote
+except: from libs.meteoraDBC.quote import CurveQuoter, delta_quote
+try: from .libs.ticks import TickStore
+except: from libs.ticks import TickStore
+try: from .libs.recorder import Recorder, read_records, split_account, LOG_FRAME, ACCOUNT, TX_META, ONBOARD
+except: from libs.recorder import Recorder, read_records, split_account, LOG_FRAME, ACCOUNT, TX_META, ONBOARD
+try: from .libs.meteoraDBC.state import SQRT_PRICE_OFFSET
+except: from libs.meteoraDBC.state import SQRT_PRICE_OFFSET
+try: from .libs.common import fast_loads
+except: from libs.common import fast_loads
+try: from .libs.mints import MintRegistry, SoldSet
+except: from libs.mints import MintRegistry, SoldSet
+try: from .main import Disbelieve, Settings
+except: from main import Disbelieve, Settings
+try: from .replay import Replay
+except: from replay import Replay
+try: from .sweep import PARAMS, build_grid, load_recording, simulate_launches, sweep
+except: from sweep import PARAMS, build_grid, load_recording, simulate_launches, sweep
+try: from .mockrpc import MockSolana, Scenario, Faults
+except: from mockrpc import MockSolana, Scenario, Faults
+from solders.pubkey import Pubkey # type: ignore
+from solders.keypair import Keypair # type: ignore
+from solders.hash import Hash # type: ignore
+from solders.message import MessageV0 # type: ignore
+from solders.transaction import VersionedTransaction # type: ignore
+from solders.signature import Signature # type: ignore
+from solders.transaction_status import TransactionConfirmationStatus # type: ignore
+from types import SimpleNamespace
+from collections import defaultdict
+from aiohttp import web
+import argparse, asyncio, base64, contextlib, functools, io, itertools, json, logging, os, platform, random, signal, statistics, subprocess, sys, tempfile, time, timeit, tracemalloc
+
+BENCHMARKS = {}
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "hotpath.json")
+RECORDING = None # set by --recording, fixtures are then taken from a RECORD_PATH file
+
+def benchmark(name: str):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+def measure(fn, number: int = 20_000, repeat: int = 5) -> float:
+    """
+        Best-of-`repeat` seconds per call.
+    """
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:,.2f} {unit}"
+    return f"{seconds * 1e9:,.0f} ns"
+
+def account_frame(data: bytes, slot: int = 0) -> str:
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "method": "accountNotification",
+        "params": {
+            "result": {"context": {"slot": slot}, "value": {"data": [base64.b64encode(data).decode(), "base64"], "owner": "dbcij3LWUppWqq96dh6gJWwBifmcGfLSB5D4DuSMaqN", "executable": False, "lamports": 0}},
+            "subscription": 1,
+        },
+    })
+
+@functools.lru_cache(maxsize=None)
+def fixtures(recording: str | None = None) -> dict:
+    """
+        Frames the hot path consumes: a launch log frame, a non-launch log frame and a pool account
+        notification, from the bundled fixture file or from the first matching records of a recording.
+    """
+    with open(FIXTURES) as f:
+        fx = json.load(f)
+    if recording is not None:
+        frames, onboards, mint = {}, {}, None
+        for kind, _, slot, payload in read_records(recording):
+            if kind == LOG_FRAME:
+                value = json.loads(payload).get("params", {}).get("result", {}).get("value")
+                if value and value.get("logs"):
+                    frames.setdefault("launch_frame" if Disbelieve.is_mint(None, value["logs"]) else "other_frame", payload.decode())
+            elif kind == ACCOUNT and "account_frame" not in frames:
+                mint, data = split_account(payload)
+                frames["account_frame"] = account_frame(data, slot)
+            elif kind == ONBOARD:
+                entry = json.loads(payload)
+                onboards[entry["mint"]] = entry
+        if mint in onboards:
+            frames["pool"], frames["base_decimals"] = onboards[mint]["pool"], onboards[mint]["decimals"]
+        fx.update(frames) # whatever the recording lacks stays the bundled fixture
+    fx["account_data"] = base64.b64decode(json.loads(fx["account_frame"])["params"]["result"]["value"]["data"][0])
+    return fx
+
+def fake_pool_account(seed: int = 7) -> bytes:
+    rng = random.Random(seed)
+    return bytes(rng.getrandbits(8) for _ in range(VIRTUAL_POOL_SIZE))
+
+def check_virtual_pool_parity(blob: bytes):
+    """
+        Compare every VirtualPool field decoded at fixed offsets with the construct layout.
+    """
+    parsed = VirtualPoolLayout.parse(blob[8:])
+    view = VirtualPool(blob)
+    mismatches = []
+    for name in VIRTUAL_POOL_FIELDS:
+        expected = parsed[name]
+        if name == "sqrt_price_raw":
+            name, expected = "sqrt_price", int.from_bytes(expected, "little")
+        elif name in VirtualPool.PUBKEYS:
+            expected = str(Pubkey.from_bytes(expected))
+        if view[name] != expected:
+            mismatches.append(name)
+    if mismatches:
+        raise AssertionError(f"VirtualPool decoder disagrees with VirtualPoolLayout on: {', '.join(mismatches)}")
+
+@benchmark("virtual_pool")
+def bench_virtual_pool():
+    blobs = [fake_pool_account(seed) for seed in range(32)]
+    for blob in blobs:
+        check_virtual_pool_parity(blob)
+    blob = blobs[0]
+
+    def construct_tick():
+        vp = VirtualPoolLayout.parse(blob[8:])
+        return price_from_sqrt(int.from_bytes(vp.sqrt_price_raw, "little"), 6, 9)
+
+    def offset_tick():
+        return price_from_sqrt(sqrt_price_from_account(blob), 6, 9)
+
+    def construct_state():
+        parsed = VirtualPoolLayout.parse(blob[8:])
+        return {
+            k: str(Pubkey.from_bytes(v)) if isinstance(v, bytes) and len(v) == 32 else v
+            for k, v in parsed.items()
+        }
+
+    def view_state():
+        state = VirtualPool(blob)
+        return state.pubkey("base_mint"), state.pubkey("base_vault"), state.pubkey("quote_vault"), state["pool_type"]
+
+    return {
+        "tick.construct": measure(construct_tick),
+        "tick.offsets": measure(offset_tick),
+        "state.construct": measure(construct_state, number=5_000),
+        "state.view": measure(view_state, number=5_000),
+    }
+
+def fake_log_frame(signature: str, logs: list, subscription: int = 1) -> str:
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "method": "logsNotification",
+        "params": {
+            "result": {"context": {"slot": 340_000_000}, "value": {"signature": signature, "err": None, "logs": logs}},
+            "subscription": subscription,
+        },
+    })
+
+def fake_log_burst(frames: int = 5_000, mint_every: int = 50, redelivered: float = 0.1, seed: int = 7) -> list:
+    """
+        A replayed burst of Believe program logs, mostly non-mint traffic with some redelivered frames.
+    """
+    rng = random.Random(seed)
+    transfer = ["Program 11111111111111111111111111111111 invoke [1]", "Program 11111111111111111111111111111111 success"] * 8
+    launch = ["Program log: Instruction: VaultTransactionExecute", "Program log: Instruction: InitializeMint2"] + transfer
+    burst = []
+    for i in range(frames):
+        burst.append(fake_log_frame(f"sig{i}", launch if i % mint_every == 0 else transfer))
+        if burst and rng.random() < redelivered:
+            burst.append(rng.choice(burst))
+    return burst
+
+@benchmark("log_feed")
+def bench_log_feed():
+    burst = fake_log_burst()
+    queue = asyncio.Queue()
+
+    def decode_all():
+        for raw in burst:
+            queue.put_nowait(json.loads(raw))
+        while not queue.empty():
+            queue.get_nowait()
+
+    def prefiltered():
+        feed = LogFeed(queue, "BELIEVE")
+        for raw in burst:
+            feed(raw)
+        while not queue.empty():
+            queue.get_nowait()
+        return feed
+
+    cprint(f"log_feed replayed burst, {prefiltered().summary()}", color=cc.LIGHT_GRAY)
+    return {
+        "frame.decode_all": measure(decode_all, number=5, repeat=3) / len(burst),
+        "frame.prefiltered": measure(prefiltered, number=5, repeat=3) / len(burst),
+    }
+
+async def simulate_positions(n: int, event_driven: bool, duration: float = 2.0, rate: int = 500) -> tuple:
+    """
+        `n` positions following random price ticks, either polling every 100 ms like the old
+        handle_position loop or waking on change with inactivity timers on one TimerHeap.
+        Returns (median reaction latency, CPU seconds used).
+    """
+    prices = [0.0] * n
+    published = [0.0] * n
+    wakeups = [asyncio.Event() for _ in range(n)]
+    timers = TimerHeap()
+    latencies = []
+    done = asyncio.Event()
+
+    async def position(i):
+        last = 0.0
+        while not done.is_set():
+            wakeups[i].clear()
+            if prices[i] != last:
+                latencies.append(time.perf_counter() - published[i])
+                last = prices[i]
+                if event_driven:
+                    timers.schedule((i, "no_activity"), time.time() + 10, wakeups[i].set)
+            if event_driven:
+                await wakeups[i].wait()
+            else:
+                await asyncio.sleep(0.1)
+
+    async def producer():
+        rng = random.Random(n)
+        for tick in range(int(duration * rate)):
+            i = rng.randrange(n)
+            prices[i] = tick + 1.0
+            published[i] = time.perf_counter()
+            if event_driven:
+                wakeups[i].set()
+            await asyncio.sleep(1 / rate)
+        done.set()
+        for wakeup in wakeups:
+            wakeup.set()
+
+    timer_task = asyncio.create_task(timers.run())
+    cpu = time.process_time()
+    await asyncio.gather(producer(), *(position(i) for i in range(n)))
+    cpu = time.process_time() - cpu
+    timer_task.cancel()
+    return statistics.median(latencies), cpu
+
+@benchmark("positions")
+def bench_positions():
+    results = {}
+    for n in (10, 100, 1000):
+        for mode, event_driven in (("poll", False), ("event", True)):
+            latency, cpu = asyncio.run(simulate_positions(n, event_driven))
+            results[f"{n}.{mode}.latency"] = latency
+            results[f"{n}.{mode}.cpu"] = cpu
+    return results
+
+def allocated(build) -> int:
+    """
+        Bytes still allocated after `build()`, with its result alive.
+    """
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+@benchmark("mints")
+def bench_mints():
+    """
+        Per-mint strategy state, the dicts it used to be spread over against one MintState each,
+        and done mints as a set of base58 strings against the SoldSet's 32-byte keys.
+    """
+    n = 10_000
+    mints = [str(Pubkey.new_unique()) for _ in range(n)]
+
+    def copies(): # the structures keep their own strings alive, as they do live
+        return [(mint + " ")[:-1] for mint in mints]
+
+    def scattered():
+        prices, open_prices, holdings, balance_sold, considers = defaultdict(dict), {}, {}, defaultdict(int), defaultdict(dict)
+        for i, mint in enumerate(copies()):
+            prices[mint]["price"] = i * 1e-9
+            open_prices[mint] = i * 1e-9
+            holdings[mint] = {"state": "bought", "buy_price": i * 1e-9}
+            balance_sold[mint] += 0.5
+            considers[mint]["peak_stabilizer_tick"] = 1
+        return prices, open_prices, holdings, balance_sold, considers
+
+    def registry():
+        mints_state = MintRegistry(ttl=300, capacity=n)
+        for i, mint in enumerate(copies()):
+            state = mints_state.track(mint)
+            state.price = state.open_price = state.buy_price = i * 1e-9
+            state.held, state.sold_pct, state.stabilize_until = True, 0.5, 1.0
+        return mints_state
+
+    state_old, state_new = allocated(scattered) / n, allocated(registry) / n
+    sold_old, sold_new = allocated(lambda: set(copies())) / n, allocated(lambda: SoldSet(copies())) / n
+    cprint(f"mints state {state_old:.0f} -> {state_new:.0f} bytes per mint (registry reports {registry().nbytes() / n:.0f}), done set {sold_old:.0f} -> {sold_new:.0f} bytes per mint", color=cc.LIGHT_GRAY)
+
+    tracked, done = registry(), SoldSet(mints)
+    probe = itertools.cycle(mints)
+    raw = itertools.cycle([bytes(Pubkey.from_string(mint)) for mint in mints])
+
+    def tick():
+        state = tracked.get(next(probe))
+        state.price = 1e-9
+        tracked.touch(state)
+
+    return {
+        "tick.update": measure(tick),
+        "done.lookup": measure(lambda: next(probe) in done),
+        "done.lookup.raw": measure(lambda: next(raw) in done),
+        "sweep.idle": measure(lambda: tracked.sweep(), number=1_000),
+    }
+
+def fake_pool_state(seed: int = 7) -> VirtualPool:
+    state = VirtualPool(fake_pool_account(seed))
+    state["pool_type"] = 0
+    state["_pubkey"] = str(Keypair().pubkey())
+    return state
+
+@benchmark("swap_tx")
+def bench_swap_tx():
+    """
+        Decision to signed transaction bytes, compiling every trade versus patching a prebuilt template.
+    """
+    swap = MeteoraDBCSwap(None, Keypair())
+    state = fake_pool_state()
+    blockhash = Hash.new_unique()
+    base_mint = state.pubkey("base_mint")
+    creates = swap.atas.missing(WSOL_MINT, base_mint)
+
+    def compile_buy():
+        ix = swap.swap_instructions(state, True, creates, 1_000_000, 1, 1_000, quote_mint=WSOL_MINT)
+        msg = MessageV0.try_compile(payer=swap.payer.pubkey(), instructions=ix, address_lookup_table_accounts=[], recent_blockhash=blockhash)
+        return bytes(VersionedTransaction(msg, [swap.payer]))
+
+    template = swap.prepare(state)
+    if VersionedTransaction.from_bytes(template.sign(True, creates, blockhash, 1_000_000, 1, 1_000)) != VersionedTransaction.from_bytes(compile_buy()):
+        raise AssertionError("patched template differs from a freshly compiled transaction")
+
+    def template_buy():
+        return template.sign(True, creates, blockhash, 1_000_000, 1, 1_000)
+
+    return {
+        "buy.compile": measure(compile_buy, number=1_000),
+        "buy.template": measure(template_buy, number=1_000),
+    }
+
+@benchmark("decode")
+def bench_decode():
+    """
+        Notification frame to price: JSON decode of log and account frames, account data, layout parse and price.
+    """
+    fx = fixtures(RECORDING)
+    launch, account, data = fx["launch_frame"], fx["account_frame"], fx["account_data"]
+    if fast_loads(account) != json.loads(account):
+        raise AssertionError("fast_loads disagrees with json.loads on the account frame")
+    decimals = fx["base_decimals"]
+    return {
+        "log_frame.json": measure(lambda: json.loads(launch)),
+        "log_frame.fast": measure(lambda: fast_loads(launch)),
+        "account_frame.json": measure(lambda: json.loads(account)),
+        "account_frame.fast": measure(lambda: fast_loads(account)),
+        "account_data.b64": measure(lambda: base64.b64decode(fast_loads(account)["params"]["result"]["value"]["data"][0])),
+        "pool.construct_parse": measure(lambda: VirtualPoolLayout.parse(data[8:]), number=5_000),
+        "pool.sqrt_price": measure(lambda: sqrt_price_from_account(data)),
+        "price_from_sqrt": measure(lambda: price_from_sqrt(sqrt_price_from_account(data), decimals, 9)),
+    }
+
+@benchmark("is_mint")
+def bench_is_mint():
+    """
+        Launch detection over the decoded logs of a launch and of an unrelated Believe transaction.
+    """
+    fx = fixtures(RECORDING)
+    launch = json.loads(fx["launch_frame"])["params"]["result"]["value"]["logs"]
+    other = json.loads(fx["other_frame"])["params"]["result"]["value"]["logs"]
+    if not Disbelieve.is_mint(None, launch) or Disbelieve.is_mint(None, other):
+        raise AssertionError("is_mint misclassified a fixture frame")
+    return {
+        "launch": measure(lambda: Disbelieve.is_mint(None, launch)),
+        "other": measure(lambda: Disbelieve.is_mint(None, other)),
+    }
+
+@benchmark("sign")
+def bench_sign():
+    """
+        Every step from pool state to signed wire bytes of a buy, as compiled per trade.
+    """
+    fx = fixtures(RECORDING)
+    swap = MeteoraDBCSwap(None, Keypair.from_seed(bytes(32)))
+    state = VirtualPool(fx["account_data"])
+    state["_pubkey"] = fx["pool"]
+    user, blockhash = swap.payer.pubkey(), Hash.new_unique()
+    creates = swap.atas.missing(WSOL_MINT, state.pubkey("base_mint"))
+    ixs = swap.swap_instructions(state, True, creates, 1_000_000, 1, 1_000, quote_mint=WSOL_MINT)
+    msg = MessageV0.try_compile(payer=user, instructions=ixs, address_lookup_table_accounts=[], recent_blockhash=blockhash)
+    tx = VersionedTransaction(msg, [swap.payer])
+    return {
+        "build_dbc_swap_ix": measure(lambda: swap.build_dbc_swap_ix(state, user, 1_000_000, 1, quote_mint=WSOL_MINT)),
+        "swap_instructions": measure(lambda: swap.swap_instructions(state, True, creates, 1_000_000, 1, 1_000, quote_mint=WSOL_MINT), number=2_000),
+        "compile": measure(lambda: MessageV0.try_compile(payer=user, instructions=ixs, address_lookup_table_accounts=[], recent_blockhash=blockhash), number=2_000),
+        "sign": measure(lambda: VersionedTransaction(msg, [swap.payer]), number=2_000),
+        "serialize": measure(lambda: bytes(tx)),
+    }
+
+async def stand_in_rpc(handler, port: int = 0) -> tuple:
+    """
+        Local HTTP JSON-RPC server, `handler(request body)` returns the response body.
+    """
+    async def rpc(request):
+        return web.json_response(await handler(await request.json()))
+
+    app = web.Application()
+    app.router.add_post("/", rpc)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}/"
+
+def send_endpoint(delay: float, fail: bool = False, jitter: float = 0.0, seed: int = 0):
+    rng = random.Random(seed)
+    signature = str(Signature.new_unique())
+
+    async def handler(body):
+        await asyncio.sleep(delay + rng.random() * jitter)
+        if fail:
+            return {"jsonrpc": "2.0", "id": body["id"], "error": {"code": -32002, "message": "node is behind"}}
+        return {"jsonrpc": "2.0", "id": body["id"], "result": signature}
+    return handler
+
+async def broadcast_latency(delays: list, sends: int = 50) -> tuple:
+    servers = [await stand_in_rpc(send_endpoint(delay, fail=fail, jitter=delay, seed=i)) for i, (delay, fail) in enumerate(delays)]
+    broadcaster = Broadcaster([url for _, url in servers])
+    latencies = []
+    try:
+        for _ in range(sends):
+            started = time.perf_counter()
+            await broadcaster.send(b"\x01" + bytes(64) + bytes(32))
+            latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(max(delay for delay, _ in delays) * 2) # let the losers land in the stats
+        cprint(f"broadcast {broadcaster.summary()}", color=cc.LIGHT_GRAY)
+    finally:
+        await broadcaster.close()
+        for runner, _ in servers:
+            await runner.cleanup()
+    return statistics.median(latencies)
+
+@benchmark("broadcast")
+def bench_broadcast():
+    """
+        First-ack latency against stand-in send endpoints: one slow, one failing, one fast with jitter.
+    """
+    return {
+        "single_slow": asyncio.run(broadcast_latency([(0.050, False)])),
+        "first_ack": asyncio.run(broadcast_latency([(0.050, False), (0.002, True), (0.010, False)])),
+    }
+
+class SkewedEndpoint:
+    """
+        In-process stand-in for an RPC endpoint, `get_account_info` answers after a sampled delay.
+    """
+    PROFILES = {
+        "tail": lambda rng: 0.300 if rng.random() < 0.05 else rng.lognormvariate(-3.9, 0.3), # ~20 ms, 5% stalls
+        "steady": lambda rng: 0.030 + rng.random() * 0.005,
+        "slow": lambda rng: 0.080 + rng.random() * 0.040,
+    }
+
+    def __init__(self, url: str):
+        self.sample = self.PROFILES[url]
+        self.rng = random.Random(url)
+
+    async def get_account_info(self, *args, **kwargs):
+        await asyncio.sleep(self.sample(self.rng))
+        return "account"
+
+    async def close(self):
+        pass
+
+def percentiles(samples: list) -> tuple:
+    ordered = sorted(samples)
+    return ordered[len(ordered) // 2], ordered[int(len(ordered) * 0.99)]
+
+async def read_latencies(reader, reads: int = 400) -> list:
+    latencies = []
+    for _ in range(reads):
+        started = time.perf_counter()
+        await reader.get_account_info("pool")
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+@benchmark("read_pool")
+def bench_read_pool():
+    """
+        p50/p99 read latency: one endpoint with a heavy tail alone, versus the pool hedging across three.
+    """
+    single = asyncio.run(read_latencies(SkewedEndpoint("tail")))
+    pool = ReadPool(["tail", "steady", "slow"], client_factory=SkewedEndpoint)
+    hedged = asyncio.run(read_latencies(pool))
+    cprint(f"read_pool {pool.summary()}", color=cc.LIGHT_GRAY)
+    (single_p50, single_p99), (hedged_p50, hedged_p99) = percentiles(single), percentiles(hedged)
+    return {
+        "single.p50": single_p50,
+        "single.p99": single_p99,
+        "hedged.p50": hedged_p50,
+        "hedged.p99": hedged_p99,
+    }
+
+def fake_pool_config(collect_fee_mode: int = 0) -> dict:
+    """
+        Three-segment curve from price 1e-4 (raw units) to 16x that, ~55 SOL of quote, 1% cliff fee.
+    """
+    start = int(0.01 * Q64)
+    return {
+        "sqrt_start_price": start,
+        "curve": [(start * 2, 3_000 * 10**9 * Q64), (start * 3, 1_500 * 10**9 * Q64), (start * 4, 1_000 * 10**9 * Q64)],
+        "collect_fee_mode": collect_fee_mode,
+        "activation_type": 1,
+        "base_fee": {"cliff_fee_numerator": 10_000_000, "first_factor": 0, "second_factor": 0, "third_factor": 0, "base_fee_mode": 0},
+        "dynamic_fee": {"initialized": 0, "bin_step": 0, "variable_fee_control": 0},
+    }
+
+def fake_curve_state(sqrt_price: int) -> VirtualPool:
+    state = VirtualPool(bytes(VIRTUAL_POOL_SIZE))
+    state["sqrt_price"] = sqrt_price
+    return state
+
+def check_quote_parity(quoter: CurveQuoter, state, sizes: list):
+    """
+        Exact-out inverts exact-in, batch matches single quotes, outputs grow with size and a
+        single-segment buy agrees with the real-valued curve formula.
+    """
+    for buy in (True, False):
+        batch = quoter.quote_batch(state, sizes, buy)
+        single = [quoter.quote_exact_in(state, size, buy)["amount_out"] for size in sizes]
+        if batch != single:
+            raise AssertionError("quote_batch disagrees with quote_exact_in")
+        if any(b < a for a, b in zip(single, single[1:])):
+            raise AssertionError("quote outputs aren't monotonic in the input size")
+        for size, out in zip(sizes, single):
+            needed = quoter.quote_exact_out(state, out, buy)["amount_in"]
+            if needed > size or quoter.quote_exact_in(state, needed, buy)["amount_out"] < out:
+                raise AssertionError(f"exact-out doesn't invert exact-in for {size} ({'buy' if buy else 'sell'})")
+
+    upper, liquidity = quoter.curve[0]
+    sqrt_price = state["sqrt_price"]
+    amount_in = delta_quote(sqrt_price, upper, liquidity, False) // 2
+    l, sp = liquidity / Q64, sqrt_price / Q64
+    keep = 1 - quoter.base_fee["cliff_fee_numerator"] / 1e9
+    if quoter.fees_on_input(True):
+        expected = l * (1 / sp - 1 / (sp + amount_in * keep / l))
+    else:
+        expected = l * (1 / sp - 1 / (sp + amount_in / l)) * keep
+    got = quoter.quote_exact_in(state, amount_in, True)["amount_out"]
+    if abs(got - expected) > max(2, expected * 1e-9):
+        raise AssertionError(f"buy quote {got} doesn't match the curve formula {expected:.0f}")
+
+@benchmark("quote")
+def bench_quote():
+    """
+        Exact-in, exact-out and a 100-size batch against a pool mid-curve, per quote.
+    """
+    quoter = CurveQuoter(fake_pool_config())
+    state = fake_curve_state(int(0.015 * Q64))
+    sizes = [int(0.05 * 10**9 * (i + 1)) for i in range(100)]
+    check_quote_parity(quoter, state, sizes)
+    check_quote_parity(CurveQuoter(fake_pool_config(collect_fee_mode=1)), state, sizes)
+    return {
+        "exact_in": measure(lambda: quoter.quote_exact_in(state, 10**9, True)),
+        "exact_out": measure(lambda: quoter.quote_exact_out(state, 10**12, True)),
+        "batch_per_size": measure(lambda: quoter.quote_batch(state, sizes, True), number=200) / len(sizes),
+    }
+
+@benchmark("ticks")
+def bench_ticks():
+    """
+        Event loop cost of appending a tick, and a one minute range read out of 100k ticks of one mint.
+    """
+    with tempfile.TemporaryDirectory() as path:
+        store = TickStore(path)
+        ts = iter(range(10**9))
+        append = measure(lambda: store.append("mint", float(next(ts)), 1, 1 << 64, 10**15, 10**9, 1e-7), number=100_000, repeat=1)
+        store.close()
+        reader = TickStore(path)
+        read = measure(lambda: reader.ticks("mint", 50_000.0, 50_060.0)["price"].max(), number=2_000)
+        if len(reader.ticks("mint", 50_000.0, 50_060.0)) != 60:
+            raise AssertionError("tick range lookup returned the wrong slice")
+        reader.close()
+    return {"append": append, "range_read": read}
+
+class LandingChain:
+    """
+        Stand-in for the websocket pool and the read client: every signature lands after a sampled
+        delay, `dropped` of the signature notifications never arrive so only polling can see them.
+    """
+    def __init__(self, dropped: float = 0.2, seed: int = 7):
+        self.rng = random.Random(seed)
+        self.dropped = dropped
+        self.landed = {} # signature -> perf_counter() it landed at
+        self.calls = 0
+
+    def land(self, signature: str, delay: float):
+        def landed():
+            self.landed[signature] = time.perf_counter()
+        asyncio.get_running_loop().call_later(delay, landed)
+
+    async def subscribe(self, method, params, callback, key=None):
+        signature = params[0]
+        if self.rng.random() >= self.dropped:
+            async def notify():
+                while signature not in self.landed:
+                    await asyncio.sleep(0.001)
+                callback({"params": {"result": {"context": {"slot": 1}, "value": {"err": None}}}})
+            asyncio.create_task(notify())
+        return None
+
+    async def unsubscribe(self, sub):
+        pass
+
+    async def get_transaction(self, signature, **kwargs):
+        self.calls += 1
+        return signature in self.landed
+
+    async def get_signature_statuses(self, signatures):
+        self.calls += 1
+        return SimpleNamespace(value=[
+            SimpleNamespace(slot=1, err=None, confirmation_status=TransactionConfirmationStatus.Confirmed)
+            if str(sig) in self.landed else None for sig in signatures
+        ])
+
+async def confirmation_latency(tracked: bool, n: int = 100, retry_delay: float = 0.3) -> tuple:
+    """
+        Median time from landing to confirmed and the RPC calls spent, `retry_delay` is the old
+        3 s polling period scaled down by 10 like the landing delays.
+    """
+    chain = LandingChain()
+    signatures = [str(Signature.new_unique()) for _ in range(n)]
+    for signature in signatures:
+        chain.land(signature, 0.05 + chain.rng.random() * 0.25)
+
+    confirmed = {}
+
+    async def poll(signature):
+        while not await chain.get_transaction(signature):
+            await asyncio.sleep(retry_delay)
+        confirmed[signature] = time.perf_counter()
+
+    tracker = ConfirmationTracker(chain, chain, poll_after=0.2, poll_interval=0.1)
+    async def wait(signature):
+        await tracker.wait(signature)
+        confirmed[signature] = time.perf_counter()
+
+    await asyncio.gather(*((wait if tracked else poll)(signature) for signature in signatures))
+    await tracker.close()
+    return statistics.median(confirmed[sig] - chain.landed[sig] for sig in signatures), chain.calls
+
+@benchmark("confirm")
+def bench_confirm():
+    """
+        Landing to confirmed for 100 signatures: per-signature get_transaction polling versus the
+        tracker, with a fifth of the websocket notifications dropped.
+    """
+    polled, polled_calls = asyncio.run(confirmation_latency(False))
+    tracked, tracked_calls = asyncio.run(confirmation_latency(True))
+    cprint(f"confirm rpc calls: polling {polled_calls}, tracker {tracked_calls}", color=cc.LIGHT_GRAY)
+    return {"polling": polled, "tracker": tracked}
+
+def fake_launch_recording(path: str, launches: int = 12, seed: int = 7) -> list:
+    """
+        A recording of `launches` back to back launches: the launch log frame, its tx meta and
+        onboarding, then a random walk of pool updates with pumps, repeated prices and quiet gaps.
+        Returns the mints in launch order.
+    """
+    rng = random.Random(seed)
+    recorder = Recorder(path)
+    launch_logs = ["Program log: Instruction: VaultTransactionExecute", "Program log: Instruction: InitializeMint2"]
+    ts, mints = 1_750_000_000.0, []
+    for i in range(launches):
+        mint = f"Mint{i:04d}{seed:04d}believe"
+        mints.append(mint)
+        recorder.write(TX_META, json.dumps({"signature": f"launch{i}", "meta": {"postTokenBalances": [{"mint": mint}]}}).encode(), ts=ts)
+        recorder.write(LOG_FRAME, fake_log_frame(f"launch{i}", launch_logs).encode(), ts=ts)
+        recorder.write(ONBOARD, json.dumps({"mint": mint, "pool": f"pool{i}", "decimals": 6, "config": None}).encode(), ts=ts)
+        price, drift = 2.8e-5, rng.uniform(-0.02, 0.04)
+        for _ in range(rng.randrange(40, 160)):
+            roll = rng.random()
+            ts += rng.uniform(15, 45) if roll < 0.03 else rng.expovariate(1 / 1.5)
+            if roll > 0.9:
+                pass # a trade that didn't move the price
+            elif roll > 0.88:
+                price *= rng.uniform(1.2, 1.8)
+            else:
+                price *= max(0.5, 1 + drift + rng.gauss(0, 0.06))
+            data = bytearray(VIRTUAL_POOL_SIZE)
+            data[SQRT_PRICE_OFFSET:SQRT_PRICE_OFFSET + 16] = int((price * 10**-3) ** 0.5 * Q64).to_bytes(16, "little")
+            recorder.write(ACCOUNT, bytes([len(mint)]) + mint.encode() + bytes(data), ts=ts)
+        ts += 60
+    recorder.close()
+    return mints
+
+def replay_launches(path: str, row, disable_first_buy: bool) -> dict:
+    """
+        PnL per mint of a full replay with the Settings of one grid row.
+    """
+    settings = Settings()
+    for (name, _), value in zip(PARAMS, row):
+        setattr(settings, name, float(value))
+    settings.disable_first_buy = disable_first_buy
+    settings.debug_sensitivity = 0
+    level = logging.getLogger().level
+    logging.getLogger().setLevel(logging.WARNING)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return asyncio.run(Replay(path, settings=settings).run())["mint_pnl"]
+    finally:
+        logging.getLogger().setLevel(level)
+
+@benchmark("sweep")
+def bench_sweep():
+    """
+        Per-launch sweep PnL checked against replays through the real handlers for a sample of rows,
+        then a 4096 row grid over the same launches, on one worker and on every core.
+    """
+    values = {
+        "target_profit": [1.2, 1.5, 2.0, 4.0],
+        "max_loss": [0.5, 0.7, 0.8, 0.9],
+        "checkpoint_balance_percentage": [0.5, 10, 50, 100],
+        "no_activity_threshold": [5, 10, 20, 40],
+        "max_loss_from_peak": [0.05, 0.1, 0.2, 0.3],
+        "min_buys_threshold": [3, 5, 10, 15],
+    }
+    grid = build_grid(values)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "launches.rec")
+        mints = fake_launch_recording(path)
+        launches = load_recording(path)
+        rows = random.Random(7).sample(range(len(grid)), 8)
+        started = time.perf_counter()
+        for disable_first_buy in (False, True):
+            pnl, _ = simulate_launches((launches, grid[rows], FIRST_BUY_AMOUNT, NEXT_BUY_AMOUNT, GAS, disable_first_buy))
+            for j, row in enumerate(rows):
+                replayed = replay_launches(path, grid[row], disable_first_buy)
+                for i, mint in enumerate(mints):
+                    if abs(replayed.get(mint, 0.0) - pnl[i, j]) > 1e-9:
+                        raise AssertionError(f"sweep PnL of {mint} with row {row} is {pnl[i, j]:.9f}, replay {replayed.get(mint, 0.0):.9f}")
+        replay = (time.perf_counter() - started) / (2 * len(rows))
+
+    single = measure(lambda: sweep(launches, grid, workers=1), number=1, repeat=1)
+    pooled = measure(lambda: sweep(launches, grid), number=1, repeat=1)
+    cprint(f"sweep {len(grid)} rows over {len(launches)} launches: {single:.2f}s on one worker, {pooled:.2f}s on {os.cpu_count()}", color=cc.LIGHT_GRAY)
+    return {"replay_per_row": replay, "grid_per_row": single / len(grid), "grid_per_row.pooled": pooled / len(grid)}
+
+async def end_to_end(scenario: Scenario, faults: Faults | None = None, linger: float = 2.0, workers: int = 0) -> dict:
+    """
+        The bot as it runs live, in its own process against a MockSolana playing `scenario`,
+        stopped with SIGINT `linger` seconds after the last event. Returns the mock's report.
+    """
+    mock = MockSolana(scenario, faults, port=0)
+    await mock.start()
+    env = {k: v for k, v in os.environ.items() if k not in ("SEND_RPC_URLS", "READ_RPC_URLS", "RECORD_PATH", "TICK_STORE", "METRICS_PORT")}
+    env.update(
+        HTTP_RPC_URL=mock.url, WS_RPC_URL=mock.ws_url, PRIVATE_KEY=str(Keypair()), DBC_POOL_CONFIGS=str(mock.config),
+        DISABLE_FIRST_BUY="", WORKERS=str(workers), PYTHONPATH=os.pathsep.join(filter(None, (os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env.get("PYTHONPATH")))),
+    )
+    with tempfile.TemporaryDirectory() as cwd: # no .env to pick up
+        bot = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "disbelieve.main", cwd=cwd, env=env,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        exited = asyncio.create_task(bot.wait())
+        try:
+            played = asyncio.create_task(mock.play())
+            await asyncio.wait((played, exited), return_when=asyncio.FIRST_COMPLETED)
+            if not played.done():
+                played.cancel()
+                raise RuntimeError(f"the bot exited with {bot.returncode} before the scenario finished")
+            await asyncio.sleep(linger)
+        finally:
+            if bot.returncode is None:
+                bot.send_signal(signal.SIGINT)
+                try:
+                    await asyncio.wait_for(exited, 10)
+                except asyncio.TimeoutError:
+                    bot.kill()
+            await mock.close()
+    return mock.ledger.report(mock.launches)
+
+@benchmark("e2e")
+def bench_e2e():
+    """
+        Launch to buy through the whole stack, websockets and HTTP included: 60 launches in 10 s
+        with crowd trades and noise frames, the latencies are the mock's wall clock view. The
+        `.first` cases are the earliest launch, which should not pay for anything the rest don't.
+    """
+    scenario = Scenario(launches=60, duration=10, trades=12, trade_interval=0.3, noise=20)
+    report = asyncio.run(end_to_end(scenario))
+    launches, latency = report["launches"], report["latency"]
+    if not launches["bought"]:
+        raise AssertionError(f"no launch was bought: {launches}")
+    cprint(f"e2e {launches['bought']}/{launches['announced']} launches bought, {sum(report['requests'].values())} requests, sends {report['sends']}", color=cc.LIGHT_GRAY)
+    return {
+        "detect": latency["detect"]["p50"],
+        "onboard": latency["onboard"]["p50"],
+        "onboard.p90": latency["onboard"]["p90"],
+        "reaction": latency["reaction"]["p50"],
+        "reaction.first": latency["reaction"]["first"],
+        "to_buy": latency["to_buy"]["p50"],
+        "to_buy.first": latency["to_buy"]["first"],
+    }
+
+@benchmark("shards")
+def bench_shards():
+    """
+        The e2e load at 2.5x the launch rate with 3x the trades, trading on the ingestion loop and
+        then in worker processes. A saturated loop shows in the onboarding and reaction tails.
+    """
+    workers = min(4, (os.cpu_count() or 1) - 1)
+    if workers < 2:
+        cprint(f"shards needs at least 3 cores, {os.cpu_count()} here, skipped", color=cc.LIGHT_GRAY)
+        return {}
+    scenario = Scenario(launches=150, duration=10, trades=40, trade_interval=0.2, noise=50)
+    results = {}
+    for label, n in (("single", 0), ("workers", workers)):
+        report = asyncio.run(end_to_end(scenario, workers=n))
+        latency = report["latency"]
+        cprint(f"shards {label} ({n} workers): {report['launches']['bought']}/{report['launches']['announced']} launches bought", color=cc.LIGHT_GRAY)
+        results.update({
+            f"{label}.onboard.p90": latency["onboard"]["p90"],
+            f"{label}.reaction": latency["reaction"]["p50"],
+            f"{label}.reaction.p90": latency["reaction"]["p90"],
+        })
+    return results
+
+def run_benchmarks(names=None) -> dict:
+    results = {}
+    for name, fn in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        for case, seconds in fn().items():
+            results[f"{name}.{case}"] = seconds
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+        Print every case next to its baseline, returns the cases slower by more than `threshold` percent.
+    """
+    regressions = []
+    for case, seconds in results.items():
+        before = baseline.get(case)
+        if not before:
+            cprint(f"{case:<40} {format_seconds(seconds):>14}   (new)", color=cc.LIGHT_WHITE)
+            continue
+        change = (seconds / before - 1) * 100
+        if change > threshold:
+            regressions.append(case)
+            color = cc.LIGHT_RED
+        else:
+            color = cc.LIGHT_GREEN if change < -threshold else cc.LIGHT_WHITE
+        cprint(f"{case:<40} {format_seconds(seconds):>14} {format_seconds(before):>14} {change:+8.1f}%", color=color)
+    return regressions
+
+def main():
+    global RECORDING
+    parser = argparse.ArgumentParser(description="Disbelieve hot path benchmarks")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--json", help="write the results here, the file can be used as a baseline later")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent slower than the baseline that counts as a regression")
+    parser.add_argument("--recording", help="take the frames from a RECORD_PATH file instead of the bundled fixtures")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    RECORDING = args.recording
+
+    results = run_benchmarks(args.names)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+    else:
+        regressions = []
+        for case, seconds in results.items():
+            cprint(f"{case:<40} {format_seconds(seconds):>14}", color=cc.LIGHT_WHITE)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "created": time.time(),
+                "results": results,
+            }, f, indent=2)
+    if regressions:
+        cprint(f"{len(regressions)} cases regressed more than {args.threshold:g}%: {', '.join(regressions)}", color=cc.LIGHT_RED)
+        sys.exit(1)
+
+def run():
+    main()
+
+if __name__ == "__main__":
+    main()
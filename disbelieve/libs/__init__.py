@@ -2,6 +2,9 @@ from .colors import *
 from .config import *
 from .common import *
 from .hooks import *
+from .shards import *
+from .mints import *
+from .timers import *
 from .meteoraDBC import *
 
-__all__ = ["cc", "cprint", "cinput", "HTTP_RPC_URL", "WS_RPC_URL", "PRIVATE_KEY", "ASYNC_CLIENT", "BELIEVE", "SolHook", "MeteoraDBC", "FIRST_BUY_AMOUNT", "NEXT_BUY_AMOUNT", "GAS"]
\ No newline at end of file
+__all__ = ["cc", "cprint", "cinput", "HTTP_RPC_URL", "WS_RPC_URL", "PRIVATE_KEY", "ASYNC_CLIENT", "BELIEVE", "SolHook", "IngestHook", "ShardHook", "WORKERS", "MINT_IDLE_TTL", "MAX_TRACKED_MINTS", "MintRegistry", "SoldSet", "MeteoraDBC", "FIRST_BUY_AMOUNT", "NEXT_BUY_AMOUNT", "GAS"]
\ No newline at end of file
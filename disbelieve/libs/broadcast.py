@@ -0,0 +1,121 @@
+import time
+import base64
+import asyncio
+import aiohttp
+from collections import deque
+from solders.signature import Signature # type: ignore
+
+def _consume(future):
+    if not future.cancelled():
+        future.exception() # late losers are only recorded in the stats
+
+class EndpointStats:
+    def __init__(self):
+        self.sent = 0
+        self.accepted = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=256) # seconds until the endpoint accepted
+
+    def error_rate(self) -> float:
+        return self.errors / self.sent if self.sent else 0.0
+
+    def median(self) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[len(ordered) // 2]
+
+class Broadcaster:
+    """
+        Sends the same signed transaction bytes to every configured endpoint at once and
+        returns the first accepted signature, slower endpoints finish in the background
+        so their acceptance latency and errors are still recorded.
+    """
+    def __init__(self, endpoints: list, timeout: float = 5.0):
+        self.endpoints = list(dict.fromkeys(endpoints))
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.stats = {url: EndpointStats() for url in self.endpoints}
+        self.last_used = {url: 0.0 for url in self.endpoints} # monotonic() of the last request
+        self.session = None
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
+        return self.session
+
+    async def _post(self, url: str, payload: dict) -> str:
+        stats = self.stats[url]
+        stats.sent += 1
+        self.last_used[url] = time.monotonic()
+        started = time.perf_counter()
+        try:
+            async with self.session.post(url, json=payload) as response:
+                data = await response.json(content_type=None)
+            if "error" in data:
+                raise RuntimeError(data["error"].get("message", data["error"]))
+            stats.latencies.append(time.perf_counter() - started)
+            stats.accepted += 1
+            return data["result"]
+        except Exception:
+            stats.errors += 1
+            raise
+
+    async def send(self, tx: bytes, skip_preflight: bool = True, max_retries: int | None = 0) -> Signature:
+        self._session()
+        config = {"encoding": "base64", "skipPreflight": skip_preflight}
+        if max_retries is not None:
+            config["maxRetries"] = max_retries
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "sendTransaction",
+            "params": [base64.b64encode(tx).decode(), config],
+        }
+
+        posts = [asyncio.ensure_future(self._post(url, payload)) for url in self.endpoints]
+        for post in posts:
+            post.add_done_callback(_consume)
+
+        last_error = None
+        for sent in asyncio.as_completed(posts):
+            try:
+                return Signature.from_string(await sent)
+            except Exception as e:
+                last_error = e
+        raise RuntimeError(f"Transaction rejected by all {len(self.endpoints)} endpoints, last error: {last_error}")
+
+    async def _touch(self, url: str):
+        self.last_used[url] = time.monotonic()
+        async with self._session().post(url, json={"jsonrpc": "2.0", "id": 1, "method": "getHealth"}) as response:
+            await response.read()
+
+    async def warm(self, urls: list | None = None) -> int:
+        """
+            getHealth to every endpoint so the first send finds an open connection, not counted in
+            the send stats. Returns how many answered.
+        """
+        results = await asyncio.gather(*(self._touch(url) for url in urls or self.endpoints), return_exceptions=True)
+        return sum(1 for result in results if not isinstance(result, BaseException))
+
+    async def keep_warm(self, interval: float = 10.0):
+        """
+            Touch endpoints idle for `interval` seconds, aiohttp closes connections idle for 15 s.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            idle = [url for url in self.endpoints if time.monotonic() - self.last_used[url] >= interval]
+            if idle:
+                await self.warm(idle)
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{url.split('?')[0]}: {s.accepted}/{s.sent} accepted, median {s.median() * 1000:.1f}ms, {s.error_rate():.0%} errors"
+            for url, s in self.stats.items()
+        )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+__all__ = ["Broadcaster"]
@@ -1,5 +1,12 @@
+import json
 from solders.pubkey import Pubkey # type: ignore
 
+try:
+    import orjson
+    fast_loads = orjson.loads
+except ImportError:
+    fast_loads = json.loads
+
 BELIEVE = Pubkey.from_string("5qWya6UjwWnGVhdSBL3hyZ7B45jbk6Byt1hwd7ohEGXE")
 WSOL_MINT = Pubkey.from_string("So11111111111111111111111111111111111111112")
 
@@ -54,6 +54,19 @@ ASYNC_CLIENT = AsyncClient(HTTP_RPC_URL)
 FIRST_BUY_AMOUNT = float(os.getenv("FIRST_BUY_AMOUNT") or 0.00001)
 NEXT_BUY_AMOUNT = float(os.getenv("NEXT_BUY_AMOUNT") or 0.00001)
 GAS = float(os.getenv("GAS") or 0.00001)
+WS_POOL_SIZE = int(os.getenv("WS_POOL_SIZE") or 2) # websocket connections shared by all subscriptions
+DBC_POOL_CONFIGS = [c.strip() for c in (os.getenv("DBC_POOL_CONFIGS") or "").split(",") if c.strip()] # known pool config accounts, pools on them are derived locally
+SEND_RPC_URLS = [u.strip() for u in (os.getenv("SEND_RPC_URLS") or HTTP_RPC_URL or "").split(",") if u.strip()] # every signed transaction is sent to all of them
+READ_RPC_URLS = [u.strip() for u in (os.getenv("READ_RPC_URLS") or HTTP_RPC_URL or "").split(",") if u.strip()] # reads go to the fastest healthy one, hedged to the runner-up
+PRICE_HISTORY = int(os.getenv("PRICE_HISTORY") or 0) # ticks kept per mint, 0 keeps only the latest price
+BUY_SLIPPAGE_PCT = float(os.getenv("BUY_SLIPPAGE_PCT") or 25) # min tokens out = quoted amount minus this
+SLIPPAGE_PCT = float(os.getenv("SLIPPAGE_PCT") or 5) # min SOL out of sells = quoted amount minus this
+RECORD_PATH = os.getenv("RECORD_PATH") or None # append the live feed and pool streams here for replay
+TICK_STORE = os.getenv("TICK_STORE") or None # directory keeping the price history of every followed mint
+METRICS_PORT = int(os.getenv("METRICS_PORT") or 0) # local Prometheus endpoint, 0 disables it
+WORKERS = int(os.getenv("WORKERS") or 0) # trading processes owning disjoint shards of the mints, 0 trades on the ingestion loop
+MINT_IDLE_TTL = float(os.getenv("MINT_IDLE_TTL") or 300) # seconds without a price change before a mint we don't hold is dropped
+MAX_TRACKED_MINTS = int(os.getenv("MAX_TRACKED_MINTS") or 4096) # mints we don't hold beyond this are dropped, least recently active first
 
 
 
@@ -0,0 +1,172 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from solders.signature import Signature # type: ignore
+from solders.transaction_status import TransactionConfirmationStatus # type: ignore
+
+try: from .colors import cc
+except: from colors import cc
+
+COMMITMENT_LEVELS = {"processed": 0, "confirmed": 1, "finalized": 2}
+# solders enums compare equal but aren't hashable, so the level is the position in this list
+STATUS_LEVELS = [
+    TransactionConfirmationStatus.Processed,
+    TransactionConfirmationStatus.Confirmed,
+    TransactionConfirmationStatus.Finalized,
+]
+MAX_STATUSES_PER_CALL = 256 # getSignatureStatuses limit
+
+class PendingSignature:
+    __slots__ = ("signature", "commitment", "future", "sub", "started", "deadline")
+
+    def __init__(self, signature: str, commitment: str, future: asyncio.Future, started: float, deadline: float):
+        self.signature = signature
+        self.commitment = commitment
+        self.future = future
+        self.sub = None
+        self.started = started
+        self.deadline = deadline
+
+class ConfirmationTracker:
+    """
+        Resolves one future per transaction signature once it reaches its target commitment.
+
+        Every signature gets a `signatureSubscribe` on the shared websocket pool, signatures still
+        pending after `poll_after` seconds are checked together with one `getSignatureStatuses`
+        call per 256 of them, so a dropped socket or a missed notification only delays the result.
+        Futures resolve to {"signature", "slot", "err", "latency", "source"} or None on timeout.
+    """
+    def __init__(self, subscriptions, reader, commitment: str = "confirmed", poll_after: float = 2.0,
+                 poll_interval: float = 1.0, timeout: float = 60.0):
+        self.subscriptions = subscriptions
+        self.reader = reader
+        self.commitment = commitment
+        self.poll_after = poll_after
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.pending = {} # signature -> PendingSignature
+        self.latencies = deque(maxlen=256)
+        self.stats = {"tracked": 0, "confirmed": 0, "failed": 0, "expired": 0, "ws": 0, "polled": 0, "status_calls": 0}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def track(self, signature: str | Signature, commitment: str | None = None) -> asyncio.Future:
+        signature = str(signature)
+        entry = self.pending.get(signature)
+        if entry is not None:
+            return entry.future
+
+        now = time.perf_counter()
+        entry = PendingSignature(
+            signature, commitment or self.commitment, asyncio.get_running_loop().create_future(), now, now + self.timeout
+        )
+        self.pending[signature] = entry
+        self.stats["tracked"] += 1
+        asyncio.create_task(self._subscribe(entry))
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll())
+        self._wakeup.set()
+        return entry.future
+
+    async def wait(self, signature: str | Signature, timeout: float | None = None, commitment: str | None = None) -> bool | None:
+        """
+            True once confirmed without error, False if it landed with an error, None if it never showed up.
+        """
+        try:
+            result = await asyncio.wait_for(asyncio.shield(self.track(signature, commitment)), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            return None
+        if result is None:
+            return None
+        return result["err"] is None
+
+    async def _subscribe(self, entry: PendingSignature):
+        def on_signature(message):
+            result = message["params"]["result"]
+            entry.sub = None # signature subscriptions end with their first notification
+            self._resolve(entry, result["context"]["slot"], result["value"].get("err"), "ws")
+
+        try:
+            entry.sub = await self.subscriptions.subscribe(
+                "signatureSubscribe",
+                [entry.signature, {"commitment": entry.commitment}],
+                on_signature,
+                key=f"sig:{entry.signature}",
+            )
+            if entry.future.done(): # polled before the subscription went out
+                await self._unsubscribe(entry)
+        except Exception as e:
+            logging.warning(f"{cc.YELLOW}Could not subscribe to {entry.signature}, polling instead: {e}{cc.RESET}")
+
+    async def _unsubscribe(self, entry: PendingSignature):
+        sub, entry.sub = entry.sub, None
+        if sub is not None:
+            await self.subscriptions.unsubscribe(sub)
+
+    def _resolve(self, entry: PendingSignature, slot: int | None, err, source: str):
+        if self.pending.pop(entry.signature, None) is None or entry.future.done():
+            return
+        latency = time.perf_counter() - entry.started
+        self.latencies.append(latency)
+        self.stats[source] += 1
+        self.stats["confirmed" if err is None else "failed"] += 1
+        entry.future.set_result({"signature": entry.signature, "slot": slot, "err": err, "latency": latency, "source": source})
+
+    def _expire(self, entry: PendingSignature):
+        self.pending.pop(entry.signature, None)
+        self.stats["expired"] += 1
+        if not entry.future.done():
+            entry.future.set_result(None)
+        asyncio.create_task(self._unsubscribe(entry))
+
+    async def poll_once(self):
+        now = time.perf_counter()
+        due = []
+        for entry in list(self.pending.values()):
+            if now >= entry.deadline:
+                self._expire(entry)
+            elif now - entry.started >= self.poll_after:
+                due.append(entry)
+
+        for at in range(0, len(due), MAX_STATUSES_PER_CALL):
+            batch = due[at:at + MAX_STATUSES_PER_CALL]
+            self.stats["status_calls"] += 1
+            statuses = (await self.reader.get_signature_statuses([Signature.from_string(e.signature) for e in batch])).value
+            for entry, status in zip(batch, statuses):
+                if status is None:
+                    continue
+                level = STATUS_LEVELS.index(status.confirmation_status) if status.confirmation_status in STATUS_LEVELS else 2 # no status means rooted
+                if level >= COMMITMENT_LEVELS[entry.commitment] or status.err is not None:
+                    self._resolve(entry, status.slot, status.err, "polled")
+                    await self._unsubscribe(entry)
+
+    async def _poll(self):
+        while True:
+            if not self.pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logging.error(f"{cc.RED}Error polling signature statuses, {e}{cc.RESET}")
+
+    def summary(self) -> str:
+        median = sorted(self.latencies)[len(self.latencies) // 2] * 1000 if self.latencies else 0.0
+        s = self.stats
+        return (
+            f"{s['tracked']} tracked, {s['confirmed']} confirmed, {s['failed']} failed, {s['expired']} expired | "
+            f"{s['ws']} via websocket, {s['polled']} via {s['status_calls']} status calls, median {median:.1f}ms"
+        )
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for entry in list(self.pending.values()):
+            if not entry.future.done():
+                entry.future.cancel()
+        self.pending.clear()
+
+__all__ = ["ConfirmationTracker"]
@@ -0,0 +1,66 @@
+import time
+import asyncio
+from collections import OrderedDict
+
+try: from .common import fast_loads
+except: from common import fast_loads
+
+MINT_MARKERS = ("InitializeMint", "VaultTransactionExecute") # both appear in every Believe launch
+
+class SeenSignatures:
+    """
+        Bounded LRU of transaction signatures, drops notifications redelivered after a reconnect.
+    """
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._seen = OrderedDict()
+
+    def add(self, signature: str) -> bool:
+        """
+            Returns False if the signature was already seen.
+        """
+        if signature in self._seen:
+            self._seen.move_to_end(signature)
+            return False
+        self._seen[signature] = None
+        if len(self._seen) > self.maxsize:
+            self._seen.popitem(last=False)
+        return True
+
+    def __len__(self):
+        return len(self._seen)
+
+class LogFeed:
+    """
+        Callback for a raw logsSubscribe stream, frames without both mint markers
+        are dropped before JSON decoding and duplicate signatures never reach the queue.
+        Queued items are [message, program, perf_counter() of the frame's arrival].
+    """
+    def __init__(self, queue: asyncio.Queue, program, maxsize: int = 4096):
+        self.queue = queue
+        self.program = program
+        self.seen = SeenSignatures(maxsize)
+        self.counters = {"received": 0, "dropped": 0, "decoded": 0, "duplicates": 0}
+
+    def __call__(self, raw: str):
+        self.counters["received"] += 1
+        for marker in MINT_MARKERS:
+            if marker not in raw:
+                self.counters["dropped"] += 1
+                return
+        received = time.perf_counter() # only launch frames are timed, the marker scan is a few hundred ns
+
+        message = fast_loads(raw)
+        self.counters["decoded"] += 1
+        value = message.get("params", {}).get("result", {}).get("value", {})
+        signature = value.get("signature")
+        if signature and not self.seen.add(signature):
+            self.counters["duplicates"] += 1
+            return
+        self.queue.put_nowait([message, self.program, received])
+
+    def summary(self) -> str:
+        c = self.counters
+        return f"{c['received']} frames: {c['dropped']} dropped, {c['decoded']} decoded, {c['duplicates']} duplicates"
+
+__all__ = ["LogFeed", "SeenSignatures", "MINT_MARKERS"]
@@ -1,7 +1,6 @@
 import base64
-import aiohttp
 from typing import Optional
-import websockets
+from collections import deque
 import json
 import asyncio
 import logging
@@ -9,16 +8,37 @@ import traceback
 import time
 from solders.keypair import Keypair # type: ignore
 from solders.pubkey import Pubkey # type: ignore
+from solders.signature import Signature # type: ignore
 from solana.rpc.commitment import Processed, Confirmed
 
-try: from .config import WS_RPC_URL, HTTP_RPC_URL, ASYNC_CLIENT, FIRST_BUY_AMOUNT, NEXT_BUY_AMOUNT, GAS
-except: from config import WS_RPC_URL, HTTP_RPC_URL, ASYNC_CLIENT, FIRST_BUY_AMOUNT, NEXT_BUY_AMOUNT, GAS
+try: from .config import WS_RPC_URL, HTTP_RPC_URL, ASYNC_CLIENT, FIRST_BUY_AMOUNT, NEXT_BUY_AMOUNT, GAS, PRICE_HISTORY, DBC_POOL_CONFIGS, SEND_RPC_URLS, READ_RPC_URLS, BUY_SLIPPAGE_PCT, SLIPPAGE_PCT, RECORD_PATH, TICK_STORE, METRICS_PORT
+except: from config import WS_RPC_URL, HTTP_RPC_URL, ASYNC_CLIENT, FIRST_BUY_AMOUNT, NEXT_BUY_AMOUNT, GAS, PRICE_HISTORY, DBC_POOL_CONFIGS, SEND_RPC_URLS, READ_RPC_URLS, BUY_SLIPPAGE_PCT, SLIPPAGE_PCT, RECORD_PATH, TICK_STORE, METRICS_PORT
 try: from .colors import cc, cprint, cinput
 except: from colors import cc, cprint, cinput
 try: from .meteoraDBC import MeteoraDBC
 except: from meteoraDBC import MeteoraDBC
 try: from .common import WSOL_MINT
 except: from common import WSOL_MINT
+try: from .subscriptions import SubscriptionManager
+except: from subscriptions import SubscriptionManager
+try: from .feed import LogFeed, MINT_MARKERS
+except: from feed import LogFeed, MINT_MARKERS
+try: from .meteoraDBC.state import VirtualPool, VIRTUAL_POOL_SIZE
+except: from meteoraDBC.state import VirtualPool, VIRTUAL_POOL_SIZE
+try: from .pricebus import PriceBus
+except: from pricebus import PriceBus
+try: from .broadcast import Broadcaster
+except: from broadcast import Broadcaster
+try: from .rpcpool import ReadPool
+except: from rpcpool import ReadPool
+try: from .confirm import ConfirmationTracker
+except: from confirm import ConfirmationTracker
+try: from .recorder import Recorder
+except: from recorder import Recorder
+try: from .ticks import TickStore
+except: from ticks import TickStore
+try: from .metrics import Metrics
+except: from metrics import Metrics
 
 logging.basicConfig(level=logging.INFO)
 
@@ -43,15 +63,34 @@ for log_name in suppress_logs:
     logging.getLogger(log_name).propagate = False
 
 class SolHook:
+    ingests = True # owns the log and pool streams, and so their recording
+    trades = True  # signs and sends, and so warms the send path
+
     def __init__(self, parent, privkey: Keypair):
         self.parent = parent
         self.stop_event = asyncio.Event()
         self.logs = asyncio.Queue()
-        self.session = aiohttp.ClientSession()
-        self.meteora_dbc = MeteoraDBC(ASYNC_CLIENT, privkey)
+        self.broadcaster = Broadcaster(SEND_RPC_URLS)
+        self.reader = ReadPool(READ_RPC_URLS)
+        self.subscriptions = SubscriptionManager(self.stop_event)
+        self.confirmations = ConfirmationTracker(self.subscriptions, self.reader)
+        self.meteora_dbc = MeteoraDBC(
+            ASYNC_CLIENT, privkey, pool_configs=DBC_POOL_CONFIGS,
+            sender=self.broadcaster, reader=self.reader, confirm=self.confirmations.wait,
+        )
+        self.meteora_dbc.configs.on_add = self.watch_config
+        self.meteora_dbc.configs.on_evict = self.unwatch_config
+        self._config_subs = {} # config -> task subscribing to the cached config's account
         self._dec_cache = {}
-        self.updates = asyncio.Queue() # streaming price updates
-        self.accounts = set()
+        self.prices = PriceBus(history=PRICE_HISTORY) # streaming price updates, latest value per mint
+        self.feed = None
+        self._balance_subs = {} # mint -> our ATA subscription
+        self.onboard_times = deque(maxlen=256) # seconds from detection to trade-ready
+        self.recorder = Recorder(RECORD_PATH) if RECORD_PATH and self.ingests else None
+        self.ticks = TickStore(TICK_STORE) if TICK_STORE else None
+        self.metrics = Metrics()
+        self.metrics.collect(self.collect_metrics)
+        self.meteora_dbc.swap.trace = self.metrics.mark
 
     async def get_decimals(self, mint: str | Pubkey):
         mint = mint if isinstance(mint, Pubkey) else Pubkey.from_string(mint)
@@ -61,7 +100,7 @@ class SolHook:
         if mint in self._dec_cache:
             return self._dec_cache[mint]
         
-        mint_info = await ASYNC_CLIENT.get_account_info_json_parsed(
+        mint_info = await self.reader.get_account_info_json_parsed(
             mint,
             commitment=Processed
         )
@@ -75,79 +114,34 @@ class SolHook:
 
         return self._dec_cache[mint]
 
-    async def await_confirm_transaction(self, tx_signature: str, max_attempts: int = 20, retry_delay: int = 3) -> Optional[bool]:
-        attempt = 1
-        while attempt < max_attempts:
-            try:
-                txn_resp = await ASYNC_CLIENT.get_transaction(
-                    tx_signature,
-                    encoding="json",
-                    commitment=Confirmed,
-                    max_supported_transaction_version=0
-                )
-                txn_meta = json.loads(txn_resp.value.transaction.meta.to_json())
-                if txn_meta['err'] is None:
-                    return True
-                if txn_meta['err']:
-                    return False
-            except Exception:
-                attempt += 1
-                await asyncio.sleep(retry_delay)
-        logging.info("Max attempts reached. Transaction confirmation failed.")
-        return None
+    async def await_confirm_transaction(self, tx_signature: str | Signature, timeout: float = 60.0) -> Optional[bool]:
+        confirmed = await self.confirmations.wait(tx_signature, timeout)
+        if confirmed is None:
+            logging.info("Transaction not seen before the timeout. Transaction confirmation failed.")
+        return confirmed
 
     async def subscribe(self, program):
         """
             Subscribe to the Solana network for program logs.
         """
-        while not self.stop_event.is_set():
-            ws = None
-            try:
-                time_measure = time.time()
-                async with websockets.connect(
-                    WS_RPC_URL,
-                    ping_interval=2,
-                    ping_timeout=15,
-                ) as ws:
-                    await ws.send(json.dumps(
-                        {
-                            "jsonrpc": "2.0",
-                            "method": "logsSubscribe",
-                            "id": 1,
-                            "params": [
-                                {"mentions": [str(program)]},
-                                {"commitment": "processed"}
-                            ]
-                        }))
-                    response = json.loads(await ws.recv())
-
-                    if 'result' in response:
-                        time_measure = time.time() - time_measure
-                        logging.info(f"{cc.LIGHT_GRAY}Successfully connected to {program} in {time_measure:.10f}s{cc.RESET} ✔")
-
-                    async for message in ws:
-                        if self.stop_event.is_set():
-                            break
-                        hMessage = json.loads(message)
-                        await self.logs.put([hMessage, program])
-
-            except websockets.exceptions.ConnectionClosedError:
-                logging.error(f"{cc.RED}Connection closed when subscribing to {program}.{cc.RESET}")
-                await asyncio.sleep(5)
-            except TimeoutError:
-                logging.error(f"{cc.RED}TimeoutError when subscribing to {program}.{cc.RESET}")
-                await asyncio.sleep(5)
-            except Exception as e:
-                logging.error(f"{cc.RED}Error when subscribing to {program}, {e}{cc.RESET}")
-                await asyncio.sleep(5)
-                traceback.print_exc()
-            finally:
-                if ws:
-                    try:
-                        await ws.close()
-                    except RuntimeError:
-                        break
-                await asyncio.sleep(0.2)
+        time_measure = time.time()
+        self.feed = LogFeed(self.logs, program)
+        sub = await self.subscriptions.subscribe(
+            "logsSubscribe",
+            [
+                {"mentions": [str(program)]},
+                {"commitment": "processed"}
+            ],
+            self.feed if self.recorder is None else self.recorder.tap(self.feed),
+            key=str(program),
+            raw=True,
+        )
+        await sub.active.wait()
+        if sub.error is not None:
+            raise RuntimeError(f"logsSubscribe for {program} refused: {sub.error}")
+        time_measure = time.time() - time_measure
+        logging.info(f"{cc.LIGHT_GRAY}Successfully connected to {program} in {time_measure:.10f}s{cc.RESET} ✔")
+        await self.stop_event.wait()
 
     async def subscribe_state(self, pool_state, base_dec: int, quote_dec: int, mint: str | Pubkey):
         """
@@ -159,83 +153,300 @@ class SolHook:
         else:
             raise TypeError(f"Pool state must be a tuple of (parsed_state): {type(pool_state)}")
 
-        while mint not in self.parent.sold:
+        if mint in self.parent.sold:
+            return
+
+        def on_account(message):
+            result = message["params"]["result"]
+            self.on_pool_account(mint, base64.b64decode(result["value"]["data"][0]), result["context"]["slot"], base_dec, quote_dec)
+
+        sub = await self.subscriptions.subscribe_account(mint, account_key, on_account, commitment=Processed)
+        if sub is None:
+            logging.info(f"{cc.YELLOW}Already subscribed to {mint}{cc.RESET}")
+            return
+        await sub.active.wait()
+        if sub.error is not None: # logged by the connection, the mint goes quiet and is evicted
+            await self.subscriptions.unsubscribe_account(mint)
+            return
+        logging.info(f"{cc.LIGHT_GRAY}Started price monitoring for {mint} ✔{cc.RESET}")
+
+    def on_pool_account(self, mint: str, data: bytes, slot: int, base_dec: int, quote_dec: int):
+        if self.recorder is not None:
+            self.recorder.account(mint, data, slot)
+        sqrt_q64 = self.meteora_dbc.sqrt_price_from_account(data)
+        price    = self.meteora_dbc.price_from_sqrt(sqrt_q64, base_dec, quote_dec)
+        ts       = time.time()
+        self.publish_price(mint, data, {"mint": mint, "price": price, "sqrt": sqrt_q64, "ts": ts}, slot)
+        if self.ticks is not None:
+            self.ticks.append(mint, ts, slot, sqrt_q64, *self.meteora_dbc.reserves_from_account(data), price)
+
+    def publish_price(self, mint: str, data: bytes, update: dict, slot: int):
+        """
+            A decoded pool update reaches the strategy: fresh state for quoting, then the price bus.
+        """
+        self.meteora_dbc.update_state(mint, data)
+        self.prices.publish(mint, update)
+
+    async def unsubscribe_state(self, mint: str | Pubkey):
+        await self.subscriptions.unsubscribe_account(str(mint))
+        await self.unwatch_balance(mint)
+        self.meteora_dbc.discard_state(str(mint))
+        pool = self.meteora_dbc.pools.pools.get(str(mint))
+        if pool:
+            self.meteora_dbc.swap.discard(pool)
+        self.meteora_dbc.pools.forget(str(mint))
+        self.meteora_dbc.swap.balances.discard(mint)
+        mint = mint if isinstance(mint, Pubkey) else Pubkey.from_string(mint)
+        self.meteora_dbc.swap.atas.discard(mint)
+        self._dec_cache.pop(mint, None)
+        if self.ticks is not None:
+            self.ticks.forget(str(mint))
+
+    async def onboard(self, mint: str, detected_at: float | None = None):
+        """
+            Pool, decimals and our ATAs from one batched read, then templates and the price stream.
+            `detected_at` is the perf_counter() of the launch log, the time until trade-ready is logged.
+        """
+        started = time.perf_counter()
+        detected_at = detected_at or started
+        swap = self.meteora_dbc.swap
+        base_ata, wsol_ata = swap.atas.ata(Pubkey.from_string(mint)), swap.atas.ata(WSOL_MINT)
+        try:
+            info = await self.meteora_dbc.onboard(mint, [base_ata, wsol_ata])
+        except Exception as e:
+            logging.error(f"{cc.RED}Error onboarding {mint}, {e}{cc.RESET}")
+            traceback.print_exc()
+            return
+        fetched = time.perf_counter()
+        self.metrics.mark(mint, "accounts", fetched)
+
+        pool_state = info["pool"]
+        if pool_state[1] == "NO_ACC":
+            logging.warning(f"{cc.YELLOW}No pool account found for {mint}{cc.RESET}")
+            return
+        dec_base = await self.prepare_mint(mint, info)
+        self.metrics.mark(mint, "decimals")
+        await asyncio.gather(
+            self.subscribe_state(pool_state, dec_base, 9, mint),
+            self.meteora_dbc.warm_configs(pool_state[1]["config"]),
+        )
+
+        ready = time.perf_counter()
+        self.metrics.mark(mint, "ready", ready)
+        self.onboard_times.append(ready - detected_at)
+        if self.recorder is not None:
+            self.recorder.onboard(mint, pool_state[0], dec_base, pool_state[1]["config"])
+        logging.info(
+            f"{cc.LIGHT_GRAY}{mint} trade-ready {(ready - detected_at) * 1000:.1f}ms after detection "
+            f"(accounts {(fetched - started) * 1000:.1f}ms, subscribe {(ready - fetched) * 1000:.1f}ms){cc.RESET}"
+        )
+
+    async def prepare_mint(self, mint: str, info: dict) -> int:
+        """
+            Trading side of onboarding from the batched read: decimals, our ATAs and the swap templates.
+            Returns the base decimals.
+        """
+        swap = self.meteora_dbc.swap
+        if info["decimals"] is not None:
+            self._dec_cache[Pubkey.from_string(mint)] = info["decimals"]
+        for ata, data in info["atas"].items():
+            if data is None:
+                swap.atas.forget(ata)
+            else:
+                swap.atas.mark(ata)
+                swap.balances.apply_account(data, ata)
+        self.prepare_swaps(info["pool"])
+        return await self.get_decimals(mint) # cached above unless the mint wasn't visible yet
+
+    def onboard_summary(self) -> str:
+        if not self.onboard_times:
+            return "no mints onboarded"
+        ordered = sorted(self.onboard_times)
+        return (
+            f"{len(ordered)} mints, detection to trade-ready median {ordered[len(ordered) // 2] * 1000:.1f}ms, "
+            f"max {ordered[-1] * 1000:.1f}ms"
+        )
+
+    def collect_metrics(self) -> list:
+        """
+            Counters of the feed, price bus, reads, sends, confirmations and blockhash ages for the metrics endpoint.
+        """
+        feed = self.feed.counters if self.feed is not None else {}
+        health = self.reader.health
+        return [
+            ("disbelieve_log_frames_total", "counter", "Believe log frames by outcome", [({"outcome": k}, v) for k, v in feed.items()]),
+            ("disbelieve_price_updates_total", "counter", "Pool price updates by outcome", [({"outcome": k}, v) for k, v in self.prices.counters.items()]),
+            ("disbelieve_rpc_reads_total", "counter", "RPC reads by method", [({"method": k}, v) for k, v in self.reader.methods.items()]),
+            ("disbelieve_rpc_hedged_total", "counter", "RPC reads duplicated to a second endpoint", [({}, self.reader.stats["hedged"])]),
+            ("disbelieve_rpc_read_errors_total", "counter", "Failed RPC reads by endpoint", [({"endpoint": url.split("?")[0]}, h.errors) for url, h in health.items()]),
+            ("disbelieve_rpc_read_seconds", "gauge", "Moving average read latency by endpoint", [({"endpoint": url.split("?")[0]}, h.ewma or 0.0) for url, h in health.items()]),
+            ("disbelieve_tx_sent_total", "counter", "Transactions sent by endpoint", [({"endpoint": url.split("?")[0]}, s.sent) for url, s in self.broadcaster.stats.items()]),
+            ("disbelieve_tx_send_errors_total", "counter", "Rejected sends by endpoint", [({"endpoint": url.split("?")[0]}, s.errors) for url, s in self.broadcaster.stats.items()]),
+            ("disbelieve_confirmations_total", "counter", "Tracked signatures by outcome", [({"outcome": k}, v) for k, v in self.confirmations.stats.items()]),
+            ("disbelieve_followed_mints", "gauge", "Mints with a live price stream", [({}, len(self.meteora_dbc.states))]),
+        ] + (self.meteora_dbc.swap.blockhashes.collect() if self.trades else []) # workers report their own
+
+    async def serve_metrics(self):
+        if METRICS_PORT:
+            await self.metrics.serve(METRICS_PORT)
+
+    def prepare_swaps(self, pool_state):
+        """
+            Precompile the buy and sell transactions of a freshly detected pool.
+        """
+        try:
+            if isinstance(pool_state, tuple) and pool_state[1] != "NO_ACC":
+                self.meteora_dbc.swap.prepare(pool_state[1])
+        except Exception as e:
+            logging.error(f"{cc.RED}Error preparing swap templates for {pool_state[0]}, {e}{cc.RESET}")
+            traceback.print_exc()
+
+    async def warm_up(self):
+        """
+            Everything the first launch would otherwise pay for, awaited before the log subscription:
+            connections to every read and send endpoint, a blockhash, the known pool configs (later
+            ones arrive with their pools) and one pass through the decode and build paths.
+        """
+        started = time.perf_counter()
+        timings = {}
+
+        async def timed(name, coro):
+            t = time.perf_counter()
             try:
-                if mint not in self.accounts:
-                    self.accounts.add(mint)
-                else:
-                    logging.info(f"{cc.YELLOW}Already subscribed to {mint}{cc.RESET}")
-                    return
-
-                async with websockets.connect(WS_RPC_URL, ping_interval=2, ping_timeout=15) as ws:
-                    await ws.send(json.dumps({
-                        "jsonrpc": "2.0",
-                        "id": 1,
-                        "method": "accountSubscribe",
-                        "params": [account_key, {"encoding": "base64", "commitment": Processed}]
-                    }))
-                    await ws.recv()
-                    logging.info(f"{cc.LIGHT_GRAY}Started price monitoring for {mint} ✔{cc.RESET}")
-
-                    async for raw in ws:
-                        if mint in self.parent.sold:
-                            break
-                        data_b64 = json.loads(raw)["params"]["result"]["value"]["data"][0]
-                        blob     = base64.b64decode(data_b64)[8:] # 8-byte discr.
-                        vp       = self.meteora_dbc.virtual_pool_layout.parse(blob)
-                        sqrt_q64 = int.from_bytes(vp.sqrt_price_raw, "little")
-                        price    = self.meteora_dbc.price_from_sqrt(sqrt_q64, base_dec, quote_dec)
-                        await self.updates.put(
-                            {"mint": mint, "price": price, "sqrt": sqrt_q64, "ts": time.time()}
-                        )
-
-            except (websockets.exceptions.ConnectionClosedError, asyncio.TimeoutError):
-                await asyncio.sleep(3)            # quick back-off reconnect
-            except Exception as err:
-                logging.error(f"{cc.RED}state-stream error {err}{cc.RESET}")
-                traceback.print_exc()
-                await asyncio.sleep(3)
+                return await coro
+            except Exception as e:
+                logging.warning(f"{cc.YELLOW}Warm-up of {name} failed, {e}{cc.RESET}")
+            finally:
+                timings[name] = time.perf_counter() - t
+
+        self.subscriptions.start() # websockets connect meanwhile
+        swap = self.meteora_dbc.swap
+        steps = [timed("configs", self.meteora_dbc.warm_configs()), timed("reads", self.reader.warm())]
+        if self.trades:
+            steps += [timed("sends", self.broadcaster.warm()), timed("blockhash", swap.blockhashes.refresh())]
+        configs, reads, *sends = await asyncio.gather(*steps)
+        if self.trades:
+            swap.blockhashes.start()
+
+        t = time.perf_counter()
+        self.rehearse()
+        timings["paths"] = time.perf_counter() - t
+        self.metrics.warm_up = time.perf_counter() - started
+
+        endpoints = f"{reads or 0}/{len(self.reader.endpoints)} read"
+        if self.trades:
+            endpoints += f" and {sends[0] or 0}/{len(self.broadcaster.endpoints)} send"
+        logging.info(
+            f"{cc.LIGHT_GRAY}Warmed up in {self.metrics.warm_up * 1000:.0f}ms: {configs or 0} pool configs, {endpoints} endpoints "
+            f"({', '.join(f'{name} {seconds * 1000:.0f}ms' for name, seconds in timings.items())}) ✔{cc.RESET}"
+        )
+
+    def rehearse(self):
+        """
+            A made-up launch frame through the feed and a zeroed pool account through the price math,
+            plus a throwaway buy and sell through the template builder when this hook trades.
+        """
+        if self.ingests:
+            frame = json.dumps({"params": {"result": {"value": {"signature": "warm-up", "err": None, "logs": list(MINT_MARKERS)}}}})
+            LogFeed(asyncio.Queue(), None)(frame)
+        state = VirtualPool(bytes(VIRTUAL_POOL_SIZE))
+        self.meteora_dbc.price_from_sqrt(state["sqrt_price"], 6, 9)
+        _ = state["base_mint"], state["config"] # warms the lazy decode of the pubkey fields onboarding reads
+        if self.trades:
+            self.meteora_dbc.swap.warm()
+
+    async def keep_warm(self):
+        """
+            Keep the connections opened by warm_up() from idling out between launches.
+        """
+        loops = [self.reader.keep_warm()]
+        if self.trades:
+            loops.append(self.broadcaster.keep_warm())
+        await asyncio.gather(*loops)
+
+    def watch_config(self, config: str):
+        """
+            Refresh a newly cached pool config from its account notifications.
+        """
+        configs = self.meteora_dbc.configs
+
+        def on_account(message):
+            configs.apply_account(config, base64.b64decode(message["params"]["result"]["value"]["data"][0]))
+
+        self._config_subs[config] = asyncio.create_task(self.subscriptions.subscribe(
+            "accountSubscribe",
+            [config, {"encoding": "base64", "commitment": Confirmed}],
+            on_account,
+            key=f"config:{config}",
+        ))
+
+    def unwatch_config(self, config: str):
+        task = self._config_subs.pop(config, None)
+        if task is not None:
+            asyncio.create_task(self._unwatch_config(task))
+
+    async def _unwatch_config(self, task: asyncio.Task):
+        """
+            Evicted configs may still be subscribing, the subscription is dropped once it's made.
+        """
+        try:
+            sub = await task
+        except Exception:
+            return
+        await self.subscriptions.unsubscribe(sub)
+
+    async def watch_balance(self, mint: str | Pubkey):
+        """
+            Keep the in-memory balance of our ATA for `mint` current from account notifications.
+        """
+        mint = str(mint)
+        if mint in self._balance_subs:
+            return
+        swap = self.meteora_dbc.swap
+        ata = swap.atas.ata(Pubkey.from_string(mint))
+
+        def on_account(message):
+            data = base64.b64decode(message["params"]["result"]["value"]["data"][0])
+            if data:
+                swap.balances.apply_account(data, ata)
+
+        self._balance_subs[mint] = await self.subscriptions.subscribe(
+            "accountSubscribe",
+            [str(ata), {"encoding": "base64", "commitment": Processed}],
+            on_account,
+            key=f"ata:{mint}",
+        )
+
+    async def unwatch_balance(self, mint: str | Pubkey):
+        sub = self._balance_subs.pop(str(mint), None)
+        if sub is not None:
+            await self.subscriptions.unsubscribe(sub)
 
     async def get_swap_tx(self, tx_id: str):
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getTransaction",
-                "params": [
-                    tx_id,
-                    {
-                        "commitment": "confirmed",
-                        "encoding": "json",
-                        "maxSupportedTransactionVersion": 0
-                    }
-                ]
-            }
-            headers = {
-                "Content-Type": "application/json"
-            }
-
-            async with self.session.post(HTTP_RPC_URL, json=payload, headers=headers, timeout=10) as response:
-                if response.status != 200:
-                    logging.error(f"HTTP Error {response.status}: {await response.text()}")
-                    raise Exception(f"HTTP Error {response.status}")
-
-                data = await response.json()
-
-                if data and data.get('result') is not None:
-                    result = data['result']
-                    meta = result.get("meta", {})
-                    return meta
-                else:
-                    logging.warning(f"Transaction result is None.")
+            resp = await self.reader.get_transaction(
+                Signature.from_string(tx_id),
+                encoding="json",
+                commitment=Confirmed,
+                max_supported_transaction_version=0
+            )
+            if resp.value is not None:
+                meta = json.loads(resp.value.transaction.meta.to_json())
+                if self.recorder is not None:
+                    self.recorder.tx_meta(tx_id, meta)
+                return meta
+            else:
+                logging.warning(f"Transaction result is None.")
         except Exception as e:
             logging.warning(f"Exception occurred: {e}")
 
     async def meteora_dbc_buy(self, mint: str, buy_amount: float = FIRST_BUY_AMOUNT, fee_sol: float = GAS):
         try:
-            buy = await self.meteora_dbc.buy(mint, float(buy_amount), fee_sol)
+            buy = await self.meteora_dbc.buy(mint, float(buy_amount), fee_sol, slippage_pct=BUY_SLIPPAGE_PCT)
             if buy == "migrated":
                 return "migrated"
+            if buy:
+                await self.watch_balance(mint)
             logging.info(f"{cc.GREEN}Buy transaction sent: https://solscan.io/tx/{buy}{cc.RESET}")
             return buy
         except RuntimeError as e:
@@ -248,7 +459,7 @@ class SolHook:
 
     async def meteora_dbc_sell(self, mint: str, percentage: float, fee_sol: float = GAS):
         try:
-            sell = await self.meteora_dbc.sell(mint, percentage, fee_sol)
+            sell = await self.meteora_dbc.sell(mint, percentage, fee_sol, slippage_pct=SLIPPAGE_PCT)
             if sell == "migrated":
                 return "migrated"
             logging.info(f"{cc.GREEN}Sell transaction sent: https://solscan.io/tx/{sell}{cc.RESET}")
@@ -262,4 +473,25 @@ class SolHook:
             traceback.print_exc()
 
     async def close(self):
-        await self.session.close()
\ No newline at end of file
+        if self.feed is not None:
+            logging.info(f"{cc.LIGHT_GRAY}Log feed: {self.feed.summary()}{cc.RESET}")
+        logging.info(f"{cc.LIGHT_GRAY}Price bus: {self.prices.summary()}{cc.RESET}")
+        logging.info(f"{cc.LIGHT_GRAY}Onboarding: {self.onboard_summary()}{cc.RESET}")
+        logging.info(f"{cc.LIGHT_GRAY}Latency: {self.metrics.summary()}{cc.RESET}")
+        await self.metrics.close()
+        logging.info(f"{cc.LIGHT_GRAY}Pool configs: {self.meteora_dbc.configs.summary()}{cc.RESET}")
+        logging.info(f"{cc.LIGHT_GRAY}Blockhash: {self.meteora_dbc.swap.blockhashes.summary()}{cc.RESET}")
+        await self.meteora_dbc.swap.blockhashes.close()
+        logging.info(f"{cc.LIGHT_GRAY}Broadcast: {self.broadcaster.summary()}{cc.RESET}")
+        await self.broadcaster.close()
+        logging.info(f"{cc.LIGHT_GRAY}Confirmations: {self.confirmations.summary()}{cc.RESET}")
+        await self.confirmations.close()
+        logging.info(f"{cc.LIGHT_GRAY}Reads: {self.reader.summary()}{cc.RESET}")
+        await self.reader.close()
+        await self.subscriptions.close()
+        if self.recorder is not None:
+            logging.info(f"{cc.LIGHT_GRAY}Recorded {self.recorder.summary()}{cc.RESET}")
+            self.recorder.close()
+        if self.ticks is not None:
+            self.ticks.close()
+            logging.info(f"{cc.LIGHT_GRAY}Ticks: {self.ticks.summary()}{cc.RESET}")
\ No newline at end of file
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Processed, Confirmed
+from solana.rpc.types import TokenAccountOpts
+from solders.pubkey import Pubkey # type: ignore
+from spl.token.instructions import get_associated_token_address, create_idempotent_associated_token_account
+
+TOKEN_PROGRAM = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+TOKEN_2022 = Pubkey.from_string("TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb")
+
+async def owner_token_accounts(client: AsyncClient, owner: Pubkey) -> list:
+    """
+        Every token account of `owner` under both token programs, as [(pubkey, raw data)].
+    """
+    responses = await asyncio.gather(*(
+        client.get_token_accounts_by_owner(owner, TokenAccountOpts(program_id=program, encoding="base64"), commitment=Processed)
+        for program in (TOKEN_PROGRAM, TOKEN_2022)
+    ))
+    return [(acc.pubkey, acc.account.data) for resp in responses for acc in resp.value]
+
+class AtaRegistry:
+    """
+        Associated token accounts of the payer known to exist.
+
+        Filled from one owner-wide lookup at startup and from our own confirmed transactions,
+        the swap builder only emits an idempotent create for ATAs that aren't known here.
+        ATAs of `transient` mints are never known: every sell closes the WSOL one, and a buy's
+        confirmation can't tell whether a sell closed it again meanwhile.
+    """
+    def __init__(self, client: AsyncClient, owner: Pubkey, confirm=None, transient=()):
+        self.client = client
+        self.owner = owner
+        self.confirm = confirm # async (signature) -> bool | None, polls the client when None
+        self.transient = {get_associated_token_address(owner, mint) for mint in transient}
+        self.known = set()
+        self._atas = {} # mint -> derived ATA, a PDA search costs ~20us
+
+    async def load(self) -> list:
+        try:
+            accounts = await owner_token_accounts(self.client, self.owner)
+        except Exception as e:
+            logging.error(f"Error loading token accounts of {self.owner}, {e}")
+            return []
+        self.mark(*(pubkey for pubkey, _ in accounts))
+        logging.info(f"Loaded {len(self.known)} token accounts of {self.owner}")
+        return accounts
+
+    def ata(self, mint: Pubkey) -> Pubkey:
+        ata = self._atas.get(mint)
+        if ata is None:
+            ata = self._atas[mint] = get_associated_token_address(self.owner, mint)
+        return ata
+
+    def discard(self, mint: Pubkey):
+        self._atas.pop(mint, None)
+
+    def create_ix(self, mint: Pubkey):
+        """
+            Idempotent create-ATA instruction, or None if the ATA is known to exist.
+        """
+        if self.ata(mint) in self.known:
+            return None
+        return create_idempotent_associated_token_account(payer=self.owner, owner=self.owner, mint=mint)
+
+    def missing(self, *mints: Pubkey) -> tuple:
+        """
+            Mints whose ATA isn't known to exist, in the order given.
+        """
+        return tuple(mint for mint in mints if self.ata(mint) not in self.known)
+
+    def mark(self, *atas: Pubkey):
+        self.known.update(ata for ata in atas if ata not in self.transient)
+
+    def forget(self, *atas: Pubkey):
+        self.known.difference_update(atas)
+
+    async def settle(self, signature, atas: list):
+        """
+            Mark `atas` as existing once the transaction that creates them is confirmed.
+        """
+        if not atas:
+            return
+        try:
+            if self.confirm is not None:
+                if await self.confirm(signature):
+                    self.mark(*atas)
+                return
+            resp = await self.client.confirm_transaction(signature, commitment=Confirmed)
+            if resp.value and resp.value[0] is not None and resp.value[0].err is None:
+                self.mark(*atas)
+        except Exception as e:
+            logging.warning(f"Could not confirm ATA creation in {signature}: {e}")
+
+__all__ = ["AtaRegistry", "owner_token_accounts"]
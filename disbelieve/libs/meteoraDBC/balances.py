@@ -0,0 +1,89 @@
+import struct
+import asyncio
+import logging
+from solana.rpc.async_api import AsyncClient
+from solders.pubkey import Pubkey # type: ignore
+from spl.token.instructions import get_associated_token_address
+try: from .ata import owner_token_accounts
+except: from ata import owner_token_accounts
+
+TOKEN_AMOUNT = struct.Struct("<Q") # token account: mint (32), owner (32), amount (u64)
+TOKEN_AMOUNT_OFFSET = 64
+
+class BalanceTracker:
+    """
+        Raw token balances of the payer's ATAs per mint, kept in memory so sells don't fetch them.
+
+        Updated from account notifications of our ATAs, `reconcile()` compares against the chain
+        and corrects any drift. Only the ATA sells spend from counts, other token accounts of the
+        owner holding the same mint are left out.
+    """
+    def __init__(self, client: AsyncClient, owner: Pubkey, ata=None):
+        self.client = client
+        self.owner = owner
+        self.ata = ata or (lambda mint: get_associated_token_address(owner, mint)) # mint -> our ATA
+        self.balances = {} # mint -> raw amount
+        self.versions = {} # mint -> updates applied, reconcile() leaves mints updated during its read alone
+        self.corrections = 0
+
+    def get(self, mint: str) -> int | None:
+        return self.balances.get(str(mint))
+
+    def set(self, mint: str, amount: int):
+        mint = str(mint)
+        self.balances[mint] = amount
+        self.versions[mint] = self.versions.get(mint, 0) + 1
+
+    def apply_account(self, data: bytes, pubkey: Pubkey | str | None = None):
+        """
+            Raw token account data, as delivered by accountSubscribe or getTokenAccountsByOwner.
+            With its `pubkey`, accounts other than our ATA of the mint are skipped.
+        """
+        mint = Pubkey.from_bytes(bytes(data[0:32]))
+        if isinstance(pubkey, str):
+            pubkey = Pubkey.from_string(pubkey)
+        if pubkey is not None and pubkey != self.ata(mint):
+            return
+        self.set(mint, TOKEN_AMOUNT.unpack_from(data, TOKEN_AMOUNT_OFFSET)[0])
+
+    def apply_accounts(self, accounts: list):
+        for pubkey, data in accounts:
+            self.apply_account(data, pubkey)
+
+    def discard(self, mint: str):
+        self.balances.pop(str(mint), None)
+        self.versions.pop(str(mint), None)
+
+    async def reconcile(self) -> dict:
+        """
+            Re-read our ATAs, returns {mint: (tracked, actual)} for corrected drift. Mints updated
+            while the read was out keep their newer value.
+        """
+        versions = dict(self.versions)
+        actual = {}
+        for pubkey, data in await owner_token_accounts(self.client, self.owner):
+            mint = Pubkey.from_bytes(bytes(data[0:32]))
+            if pubkey == self.ata(mint):
+                actual[str(mint)] = TOKEN_AMOUNT.unpack_from(data, TOKEN_AMOUNT_OFFSET)[0]
+
+        drift = {}
+        for mint in set(self.balances) | set(actual):
+            if self.versions.get(mint) != versions.get(mint):
+                continue
+            tracked, amount = self.balances.get(mint), actual.get(mint, 0)
+            if tracked is not None and tracked != amount:
+                drift[mint] = (tracked, amount)
+            self.balances[mint] = amount
+        self.corrections += len(drift)
+        return drift
+
+    async def run_reconciler(self, interval: float = 30.0):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                for mint, (tracked, amount) in (await self.reconcile()).items():
+                    logging.warning(f"Balance drift on {mint}: tracked {tracked}, actual {amount}")
+            except Exception as e:
+                logging.error(f"Error reconciling balances, {e}")
+
+__all__ = ["BalanceTracker"]
@@ -0,0 +1,95 @@
+import time
+import asyncio
+import logging
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Processed
+
+class BlockhashCache:
+    """
+        Keeps a recent blockhash in memory so the swap path never waits on getLatestBlockhash.
+
+        A background task refreshes it every `interval` seconds, `get()` refreshes on demand
+        when the cached value is older than `max_age` (a blockhash lives ~60 s on mainnet).
+    """
+    def __init__(self, client: AsyncClient, interval: float = 2.0, max_age: float = 20.0, commitment=Processed):
+        self.client = client
+        self.interval = interval
+        self.max_age = max_age
+        self.commitment = commitment
+        self.blockhash = None
+        self.last_valid_block_height = None
+        self.fetched_at = 0.0
+        self.stats = {"served": 0, "refreshes": 0, "on_demand": 0, "total_age": 0.0, "max_age": 0.0, "last_age": 0.0}
+        self._task = None
+        self._refreshing = None
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logging.error(f"Error refreshing blockhash, {e}")
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self, on_demand: bool = False):
+        refreshing = self._refreshing
+        if refreshing is None: # concurrent callers share one request
+            if on_demand:
+                self.stats["on_demand"] += 1
+            refreshing = self._refreshing = asyncio.ensure_future(self._fetch())
+            refreshing.add_done_callback(self._refreshed)
+        await asyncio.shield(refreshing)
+
+    def _refreshed(self, future: asyncio.Future):
+        if self._refreshing is future: # only the request it finished, a newer one may be out already
+            self._refreshing = None
+
+    async def _fetch(self):
+        resp = (await self.client.get_latest_blockhash(commitment=self.commitment)).value
+        self.blockhash = resp.blockhash
+        self.last_valid_block_height = resp.last_valid_block_height
+        self.fetched_at = time.monotonic()
+        self.stats["refreshes"] += 1
+
+    async def get(self):
+        """
+            A blockhash younger than `max_age`, the age it had is recorded as served-at-send metrics.
+        """
+        self.start()
+        if self.blockhash is None or self.age() > self.max_age:
+            await self.refresh(on_demand=True)
+        age = self.age()
+        self.stats["served"] += 1
+        self.stats["total_age"] += age
+        self.stats["max_age"] = max(self.stats["max_age"], age)
+        self.stats["last_age"] = age
+        return self.blockhash
+
+    def collect(self) -> list:
+        s = self.stats
+        return [
+            ("disbelieve_blockhash_served_total", "counter", "Blockhashes handed to signed transactions", [({}, s["served"])]),
+            ("disbelieve_blockhash_age_seconds_total", "counter", "Summed blockhash age at send, over served for the mean", [({}, s["total_age"])]),
+            ("disbelieve_blockhash_age_seconds", "gauge", "Blockhash age at send, last and largest", [({"stat": "last"}, s["last_age"]), ({"stat": "max"}, s["max_age"])]),
+            ("disbelieve_blockhash_refreshes_total", "counter", "Blockhashes fetched", [({}, s["refreshes"])]),
+            ("disbelieve_blockhash_on_demand_total", "counter", "Fetches a send waited for, the cached blockhash was missing or too old", [({}, s["on_demand"])]),
+        ]
+
+    def summary(self) -> str:
+        s = self.stats
+        avg = s["total_age"] / s["served"] if s["served"] else 0.0
+        return f"{s['served']} served, avg age {avg:.3f}s, max age {s['max_age']:.3f}s, {s['refreshes']} refreshes ({s['on_demand']} on demand)"
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+__all__ = ["BlockhashCache"]
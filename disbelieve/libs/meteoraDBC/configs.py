@@ -0,0 +1,103 @@
+import logging
+from collections import OrderedDict
+from solana.rpc.async_api import AsyncClient
+
+try: from .state import fetch_accounts, parse_pool_config
+except: from state import fetch_accounts, parse_pool_config
+try: from .quote import CurveQuoter
+except: from quote import CurveQuoter
+
+class PoolConfigCache:
+    """
+        Parsed PoolConfig accounts and their curve quoters, keyed by config address.
+
+        Launches share a handful of configs, so they're loaded once (at startup or while a pool is
+        onboarded) and refreshed from account notifications, quoting only ever reads from here.
+        Least recently used configs are evicted past `max_size`, `on_add`/`on_evict` let the owner
+        follow the set, e.g. to keep an account subscription per cached config.
+    """
+    def __init__(self, reader: AsyncClient, max_size: int = 64, on_add=None, on_evict=None):
+        self.reader = reader
+        self.max_size = max_size
+        self.on_add = on_add
+        self.on_evict = on_evict
+        self.entries = OrderedDict() # config -> (parsed config, CurveQuoter)
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "updates": 0, "evictions": 0}
+
+    def __contains__(self, config: str) -> bool:
+        return str(config) in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, config: str) -> dict | None:
+        entry = self._entry(str(config))
+        return None if entry is None else entry[0]
+
+    def quoter(self, config: str) -> CurveQuoter | None:
+        entry = self._entry(str(config))
+        return None if entry is None else entry[1]
+
+    def _entry(self, config: str):
+        entry = self.entries.get(config)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self.entries.move_to_end(config)
+        return entry
+
+    def put(self, config: str, data: bytes):
+        """
+            Parse raw PoolConfig account data, replacing whatever was cached for `config`.
+        """
+        config = str(config)
+        parsed = parse_pool_config(data)
+        is_new = config not in self.entries
+        self.entries[config] = (parsed, CurveQuoter(parsed))
+        self.entries.move_to_end(config)
+        if is_new:
+            if self.on_add is not None:
+                self.on_add(config)
+            while len(self.entries) > self.max_size:
+                self.evict(next(iter(self.entries)))
+        else:
+            self.stats["updates"] += 1
+
+    def apply_account(self, config: str, data: bytes):
+        """
+            Account notification of a cached config, its quoter is rebuilt from the new data.
+        """
+        if data:
+            self.put(config, data)
+        else:
+            self.evict(config)
+
+    def evict(self, config: str):
+        if self.entries.pop(str(config), None) is not None:
+            self.stats["evictions"] += 1
+            if self.on_evict is not None:
+                self.on_evict(str(config))
+
+    async def load(self, *configs: str) -> int:
+        """
+            Fetch every config not cached yet in one getMultipleAccounts call, returns how many were added.
+        """
+        missing = list(dict.fromkeys(str(c) for c in configs if str(c) not in self.entries))
+        if not missing:
+            return 0
+        loaded = 0
+        for config, data in zip(missing, await fetch_accounts(missing, self.reader)):
+            if data is None:
+                logging.warning(f"PoolConfig account {config} not found")
+                continue
+            self.put(config, data)
+            loaded += 1
+        self.stats["loads"] += loaded
+        return loaded
+
+    def summary(self) -> str:
+        s = self.stats
+        return f"{len(self.entries)} configs, {s['hits']} hits, {s['misses']} misses, {s['loads']} loaded, {s['updates']} updated, {s['evictions']} evicted"
+
+__all__ = ["PoolConfigCache"]
@@ -2,12 +2,16 @@
 import json
 import asyncio
 
-try: from .state import fetch_virtual_pool, VirtualPoolLayout, price_from_sqrt;
-except: from state import fetch_virtual_pool, VirtualPoolLayout, price_from_sqrt;
-try: from .pool import find_pool;
-except: from pool import find_pool;
+try: from .state import fetch_virtual_pool, fetch_virtual_pools, fetch_accounts, mint_decimals, VirtualPool, VirtualPoolLayout, price_from_sqrt, sqrt_price_from_account, reserves_from_account;
+except: from state import fetch_virtual_pool, fetch_virtual_pools, fetch_accounts, mint_decimals, VirtualPool, VirtualPoolLayout, price_from_sqrt, sqrt_price_from_account, reserves_from_account;
+try: from .pool import find_pool, PoolLocator;
+except: from pool import find_pool, PoolLocator;
 try: from .swap  import MeteoraDBCSwap;
 except: from swap  import MeteoraDBCSwap;
+try: from .configs import PoolConfigCache;
+except: from configs import PoolConfigCache;
+try: from .quote import CurveQuoter;
+except: from quote import CurveQuoter;
 
 try:
     from solana.rpc.async_api import AsyncClient
@@ -18,42 +22,157 @@ except Exception as e:
     print(f"Error, one or more of required modules are missing, install them with pip. {e}")
 
 class MeteoraDBC:
-    def __init__(self, async_client: AsyncClient, signer: Keypair | str):
+    def __init__(self, async_client: AsyncClient, signer: Keypair | str, pool_configs: list = (), sender=None, reader=None, confirm=None):
         self.client = async_client
+        self.reader = reader or async_client # any AsyncClient-like object for account reads
+        self.pools = PoolLocator(pool_configs)
         self.payer = signer if isinstance(signer, Keypair) else Keypair.from_base58_string(signer)
-        self.swap = MeteoraDBCSwap(self.client, self.payer)
+        self.swap = MeteoraDBCSwap(self.client, self.payer, sender=sender, confirm=confirm)
         self.virtual_pool_layout = VirtualPoolLayout
         self.price_from_sqrt = price_from_sqrt
+        self.sqrt_price_from_account = sqrt_price_from_account
+        self.reserves_from_account = reserves_from_account
+        self.states = {} # mint -> latest VirtualPool, kept live from account notifications
+        self.configs = PoolConfigCache(self.reader) # parsed configs and their quoters
     
     async def fetch_state(self, mint: str | Pubkey):
         try:
             mint = str(mint) if isinstance(mint, Pubkey) else mint
-            pool_addr = await find_pool(mint, self.client)
-            state = await fetch_virtual_pool(pool_addr, self.client)
+            pool_addr = None
+            candidates = self.pools.candidates(mint)
+            if candidates:
+                for addr, state in zip(candidates, await fetch_virtual_pools(candidates, self.reader)):
+                    if state is not None and state["base_mint"] == mint:
+                        pool_addr = addr
+                        break
+
+            if pool_addr is None: # unknown config, fall back to scanning the program once
+                pool_addr = await find_pool(mint, self.reader)
+                state = await fetch_virtual_pool(pool_addr, self.reader)
+
+            self.pools.remember(mint, pool_addr, state["config"])
             state["_pubkey"] = pool_addr
             return (pool_addr, state)
-        except RuntimeError as e:
+        except (RuntimeError, ValueError) as e: # find_pool raises ValueError while the scan doesn't see the pool
             print(f"Error: {e}")
             return pool_addr, "NO_ACC"
 
-    async def buy(self, mint: str, sol_amount: float, fee_sol: float = 0.00001):
+    async def onboard(self, mint: str, atas: list = ()) -> dict:
+        """
+            Everything a fresh launch needs before it can be traded, in one getMultipleAccounts call:
+            the derived pool candidates, the mint (for its decimals), configs not parsed yet and our `atas`.
+            If no config is known the program scan runs alongside that call instead of before it.
+
+            Returns {"pool": (pool_addr, state), "decimals": int | None, "atas": {ata: raw data | None}}.
+        """
+        candidates = self.pools.candidates(mint)
+        configs = [c for c in self.pools.configs if c not in self.configs]
+        keys = candidates + [mint] + [str(ata) for ata in atas] + configs
+
+        async def scan():
+            try:
+                return await find_pool(mint, self.reader)
+            except ValueError: # not indexed yet, fetch_state() below scans once more
+                return None
+
+        if candidates:
+            accounts, found = await fetch_accounts(keys, self.reader), None
+        else:
+            accounts, found = await asyncio.gather(fetch_accounts(keys, self.reader), scan())
+
+        n, m = len(candidates), len(candidates) + 1 + len(atas)
+        pool_addr, state = found, None
+        for addr, data in zip(candidates, accounts[:n]):
+            if data is not None:
+                candidate = VirtualPool(data)
+                if candidate["base_mint"] == mint:
+                    pool_addr, state = addr, candidate
+                    break
+
+        for config, data in zip(configs, accounts[m:]):
+            if data is not None:
+                self.configs.put(config, data)
+
+        if state is None:
+            if pool_addr is None: # derived pools not visible yet, or the config is new to us
+                pool_addr, state = await self.fetch_state(mint)
+            else:
+                state = await fetch_virtual_pool(pool_addr, self.reader)
+        if state != "NO_ACC":
+            self.pools.remember(mint, pool_addr, state["config"])
+            state["_pubkey"] = pool_addr
+            self.states[mint] = state
+
+        mint_data = accounts[n]
+        return {
+            "pool": (pool_addr, state),
+            "decimals": mint_decimals(mint_data) if mint_data else None,
+            "atas": dict(zip(atas, accounts[n + 1:m])),
+        }
+
+    def update_state(self, mint: str, data: bytes):
+        """
+            Replace the cached state of `mint` with a fresh account notification.
+        """
+        pool_addr = self.pools.pools.get(mint)
+        if pool_addr is not None:
+            state = VirtualPool(data)
+            state["_pubkey"] = pool_addr
+            self.states[mint] = state
+
+    def discard_state(self, mint: str):
+        self.states.pop(mint, None)
+
+    async def current_state(self, mint: str):
+        """
+            Cached state of an onboarded pool, fetched only for mints we don't follow.
+        """
+        state = self.states.get(mint)
+        if state is None:
+            _, state = await self.fetch_state(mint)
+            if state == "NO_ACC":
+                await asyncio.sleep(0.2)
+                _, state = await self.fetch_state(mint)
+                if state == "NO_ACC":
+                    raise RuntimeError(f"No account found for mint {mint}")
+        return state
+
+    def quoter(self, state) -> CurveQuoter:
+        """
+            Curve quoter of the pool's config, only ever read from the cache while trading.
+        """
+        quoter = self.configs.quoter(state["config"])
+        if quoter is None:
+            asyncio.create_task(self.warm_configs(state["config"])) # ready for the next trade
+            raise RuntimeError(f"PoolConfig {state['config']} isn't loaded yet")
+        return quoter
+
+    async def warm_configs(self, *configs) -> int:
+        try:
+            return await self.configs.load(*(configs or self.pools.configs))
+        except Exception as e:
+            print(f"Error loading pool configs: {e}")
+            return 0
+
+    async def buy(self, mint: str, sol_amount: float, fee_sol: float = 0.00001, slippage_pct: float | None = None):
         try:
             sol_lams = int(sol_amount * 1e9)
-            pool, state = await self.fetch_state(mint)
+            state = await self.current_state(mint)
             is_migrated = state["is_migrated"]
             if is_migrated == 1:
                 return "migrated"
 
-            if state == "NO_ACC":
-                await asyncio.sleep(0.2)
-                pool, state = await self.fetch_state(mint)
-                if state == "NO_ACC":
-                    raise RuntimeError(f"No account found for mint {mint}")
+            min_amount_out = 1
+            if slippage_pct is not None:
+                try:
+                    min_amount_out = self.quoter(state).min_amount_out(state, sol_lams, True, slippage_pct)
+                except Exception as e:
+                    print(f"Error quoting buy of {mint}, sending without slippage protection: {e}")
 
             buy_tx = await self.swap.buy(
                 state=state,
                 amount_in=sol_lams,
-                min_amount_out=1,
+                min_amount_out=min_amount_out,
                 fee_sol=fee_sol,
             )
             return buy_tx
@@ -61,18 +180,26 @@ class MeteoraDBC:
             traceback.print_exc()
             return None
 
-    async def sell(self, mint: str, percentage: float, fee_sol: float = 0.00001):
+    async def sell(self, mint: str, percentage: float, fee_sol: float = 0.00001, slippage_pct: float = 5.0):
         try:
             assert (0 < percentage <= 100), "Percentage must be between 0 and 100"
-            pool, state = await self.fetch_state(mint)
+            state = await self.current_state(mint)
             is_migrated = state["is_migrated"]
             if is_migrated == 1:
                 return "migrated"
-            
+
+            try:
+                quoter = self.quoter(state)
+            except Exception as e:
+                print(f"Error loading the curve of {mint}, estimating min out from reserves: {e}")
+                quoter = None
+
             sell_tx = await self.swap.sell(
                 state=state,
                 pct=percentage,
+                slippage_pct=slippage_pct,
                 fee_sol=fee_sol,
+                quoter=quoter,
             )
             return sell_tx
         except AssertionError as e:
@@ -83,6 +210,7 @@ class MeteoraDBC:
             return None
 
     async def close(self):
+        await self.swap.blockhashes.close()
         await self.client.close()
 
 __all__ = ["MeteoraDBC"]
@@ -1,10 +1,11 @@
-# pool.py
 from solana.rpc.types import MemcmpOpts, DataSliceOpts
 from solana.rpc.async_api import AsyncClient
 from solders.pubkey import Pubkey # type: ignore
 
 DBC  = Pubkey.from_string("dbcij3LWUppWqq96dh6gJWwBifmcGfLSB5D4DuSMaqN")
+WSOL = Pubkey.from_string("So11111111111111111111111111111111111111112")
 BASE_MINT_OFFSET = 136
+POOL_SEED = b"pool"
 
 async def pools_for_mint(mint_pk: str, ctx: AsyncClient):
     resp = await ctx.get_program_accounts(
@@ -22,4 +23,37 @@ async def find_pool(mint_pk: str, ctx: AsyncClient):
     pools = await pools_for_mint(mint_pk, ctx)
     if len(pools) == 0:
         raise ValueError("No pools found")
-    return pools[0]
\ No newline at end of file
+    return pools[0]
+
+def derive_pool_address(config: Pubkey | str, base_mint: Pubkey | str, quote_mint: Pubkey | str = WSOL) -> Pubkey:
+    """
+        Virtual pool PDA: ["pool", config, larger mint, smaller mint] under the DBC program.
+    """
+    config, base_mint, quote_mint = (k if isinstance(k, Pubkey) else Pubkey.from_string(k) for k in (config, base_mint, quote_mint))
+    first, second = sorted((bytes(base_mint), bytes(quote_mint)), reverse=True)
+    pda, _ = Pubkey.find_program_address([POOL_SEED, bytes(config), first, second], DBC)
+    return pda
+
+class PoolLocator:
+    """
+        Mint -> pool address without getProgramAccounts.
+
+        Pools are derived locally from known config accounts, configs of pools found through the
+        getProgramAccounts fallback are learned so the next launch on them derives locally too.
+    """
+    def __init__(self, configs=()):
+        self.configs = list(dict.fromkeys(str(c) for c in configs))
+        self.pools = {} # mint -> pool address
+
+    def candidates(self, mint: str) -> list:
+        if mint in self.pools:
+            return [self.pools[mint]]
+        return [str(derive_pool_address(config, mint)) for config in self.configs]
+
+    def remember(self, mint: str, pool_addr: str, config: str):
+        self.pools[mint] = pool_addr
+        if config not in self.configs:
+            self.configs.append(config)
+
+    def forget(self, mint: str):
+        self.pools.pop(mint, None)
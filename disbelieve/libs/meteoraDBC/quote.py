@@ -0,0 +1,274 @@
+# quote.py
+import time
+
+# integer math of the dynamic-bonding-curve program, sqrt prices are Q64.64 and liquidity is Q64 scaled
+RESOLUTION = 64
+FEE_DENOMINATOR = 1_000_000_000
+MAX_FEE_NUMERATOR = 990_000_000
+BASIS_POINT_MAX = 10_000
+ONE_Q64 = 1 << RESOLUTION
+U128_MAX = (1 << 128) - 1
+
+COLLECT_FEE_QUOTE_TOKEN = 0  # fees in quote: taken from the input on buys, from the output on sells
+COLLECT_FEE_OUTPUT_TOKEN = 1 # fees always taken from the output
+
+BASE_FEE_LINEAR = 0
+BASE_FEE_EXPONENTIAL = 1
+BASE_FEE_RATE_LIMITER = 2
+
+ACTIVATION_TIMESTAMP = 1
+
+def _div_up(a: int, b: int) -> int:
+    return -(-a // b)
+
+def _mul_div(a: int, b: int, c: int, up: bool) -> int:
+    return _div_up(a * b, c) if up else a * b // c
+
+def delta_base(lower: int, upper: int, liquidity: int, up: bool) -> int:
+    """
+        Δbase = L · (√P_upper − √P_lower) / (√P_upper · √P_lower)
+    """
+    return _mul_div(liquidity, upper - lower, lower * upper, up)
+
+def delta_quote(lower: int, upper: int, liquidity: int, up: bool) -> int:
+    """
+        Δquote = L · (√P_upper − √P_lower) >> 128
+    """
+    prod = liquidity * (upper - lower)
+    return _div_up(prod, 1 << (RESOLUTION * 2)) if up else prod >> (RESOLUTION * 2)
+
+def next_sqrt_from_base_in(sqrt_price: int, liquidity: int, amount: int) -> int:
+    """
+        √P' = √P · L / (L + Δbase · √P), rounded up
+    """
+    if amount == 0:
+        return sqrt_price
+    return _mul_div(liquidity, sqrt_price, liquidity + amount * sqrt_price, True)
+
+def next_sqrt_from_quote_in(sqrt_price: int, liquidity: int, amount: int) -> int:
+    """
+        √P' = √P + Δquote / L, rounded down
+    """
+    return sqrt_price + (amount << (RESOLUTION * 2)) // liquidity
+
+def next_sqrt_from_base_out(sqrt_price: int, liquidity: int, amount: int) -> int:
+    """
+        √P' = √P · L / (L − Δbase · √P), rounded up
+    """
+    if amount == 0:
+        return sqrt_price
+    denominator = liquidity - amount * sqrt_price
+    if denominator <= 0:
+        raise RuntimeError("Not enough liquidity for the requested base output")
+    return _mul_div(liquidity, sqrt_price, denominator, True)
+
+def next_sqrt_from_quote_out(sqrt_price: int, liquidity: int, amount: int) -> int:
+    """
+        √P' = √P − Δquote / L, rounded so the pool never gives out more than it takes
+    """
+    return sqrt_price - _div_up(amount << (RESOLUTION * 2), liquidity)
+
+def pow_q64(base: int, exp: int) -> int:
+    """
+        Q64 power by squaring, truncating after every product like the program's `pow` (base < 1).
+    """
+    result, squared = ONE_Q64, base
+    while exp:
+        if exp & 1:
+            result = (result * squared) >> RESOLUTION
+        squared = (squared * squared) >> RESOLUTION
+        exp >>= 1
+    return result
+
+class CurveQuoter:
+    """
+        Exact swap quotes for pools of one config, from its curve and fees plus live VirtualPool state.
+
+        Walks the same curve segments with the same rounding as the program, so `amount_out` is what
+        the swap would return at the quoted state, fees included (base fee schedule or rate limiter,
+        plus the dynamic fee from the pool's volatility accumulator).
+    """
+    def __init__(self, config: dict):
+        self.sqrt_start_price = config["sqrt_start_price"]
+        self.curve = list(config["curve"]) # [(upper sqrt price, liquidity)] ascending
+        self.collect_fee_mode = config["collect_fee_mode"]
+        self.activation_type = config["activation_type"]
+        self.base_fee = config["base_fee"]
+        self.dynamic_fee = config["dynamic_fee"]
+
+    # fees
+
+    def _current_point(self, current_point: int | None, state) -> int:
+        if current_point is not None:
+            return current_point
+        if self.activation_type == ACTIVATION_TIMESTAMP:
+            return int(time.time())
+        return state["activation_point"] # slot unknown here, quote at the highest scheduled fee
+
+    def base_fee_numerator(self, state, buy: bool, amount_in: int, current_point: int | None = None) -> int:
+        fee = self.base_fee
+        cliff = fee["cliff_fee_numerator"]
+        point = self._current_point(current_point, state)
+        activation = state["activation_point"]
+
+        if fee["base_fee_mode"] == BASE_FEE_RATE_LIMITER:
+            # first: fee increment bps, second: max limiter duration, third: reference amount
+            if not buy or point < activation or point > activation + fee["second_factor"]:
+                return cliff
+            return self._rate_limiter_numerator(cliff, fee["first_factor"], fee["third_factor"], amount_in)
+
+        # first: number of periods, second: period frequency, third: reduction factor
+        periods, frequency, reduction = fee["first_factor"], fee["second_factor"], fee["third_factor"]
+        if frequency == 0:
+            return cliff
+        period = periods if point < activation else min(periods, (point - activation) // frequency)
+        if fee["base_fee_mode"] == BASE_FEE_LINEAR:
+            return cliff - reduction * period
+        return (cliff * pow_q64(ONE_Q64 - (reduction << RESOLUTION) // BASIS_POINT_MAX, period)) >> RESOLUTION
+
+    @staticmethod
+    def _rate_limiter_numerator(cliff: int, increment_bps: int, reference: int, amount_in: int) -> int:
+        if reference == 0 or amount_in <= reference:
+            return cliff
+        increment = increment_bps * FEE_DENOMINATOR // BASIS_POINT_MAX
+        max_index = (MAX_FEE_NUMERATOR - cliff) // increment if increment else 0
+        a, b = divmod(amount_in - reference, reference)
+        if a < max_index:
+            total = reference * (cliff + cliff * a + increment * a * (a + 1) // 2) + b * (cliff + increment * (a + 1))
+        else:
+            n = max_index
+            total = reference * (cliff + cliff * n + increment * n * (n + 1) // 2) + ((a - n) * reference + b) * MAX_FEE_NUMERATOR
+        trading_fee = _div_up(total, FEE_DENOMINATOR)
+        return _mul_div(trading_fee, FEE_DENOMINATOR, amount_in, True)
+
+    def variable_fee_numerator(self, state) -> int:
+        fee = self.dynamic_fee
+        if not fee["initialized"]:
+            return 0
+        volatility = int.from_bytes(state["volatility_tracker"][32:48], "little")
+        v_fee = fee["variable_fee_control"] * (volatility * fee["bin_step"]) ** 2
+        return (v_fee + 99_999_999_999) // 100_000_000_000
+
+    def fee_numerator(self, state, buy: bool, amount_in: int = 0, current_point: int | None = None) -> int:
+        total = self.base_fee_numerator(state, buy, amount_in, current_point) + self.variable_fee_numerator(state)
+        return min(total, MAX_FEE_NUMERATOR)
+
+    def fees_on_input(self, buy: bool) -> bool:
+        return buy and self.collect_fee_mode == COLLECT_FEE_QUOTE_TOKEN
+
+    # curve walks, amounts exclude fees
+
+    def _walk_in(self, sqrt_price: int, amount_in: int, buy: bool) -> tuple:
+        out = 0
+        if buy: # quote in, price up
+            for upper, liquidity in self.curve:
+                if upper <= sqrt_price:
+                    continue
+                max_in = delta_quote(sqrt_price, upper, liquidity, True)
+                if amount_in < max_in:
+                    nxt = next_sqrt_from_quote_in(sqrt_price, liquidity, amount_in)
+                    return out + delta_base(sqrt_price, nxt, liquidity, False), nxt
+                out += delta_base(sqrt_price, upper, liquidity, False)
+                sqrt_price, amount_in = upper, amount_in - max_in
+            if amount_in:
+                raise RuntimeError("Not enough liquidity on the curve for this buy")
+            return out, sqrt_price
+
+        for i in range(len(self.curve) - 1, -1, -1): # base in, price down
+            lower = self.curve[i - 1][0] if i else self.sqrt_start_price
+            liquidity = self.curve[i][1]
+            if lower >= sqrt_price:
+                continue
+            max_in = delta_base(lower, sqrt_price, liquidity, True)
+            if amount_in < max_in:
+                nxt = next_sqrt_from_base_in(sqrt_price, liquidity, amount_in)
+                return out + delta_quote(nxt, sqrt_price, liquidity, False), nxt
+            out += delta_quote(lower, sqrt_price, liquidity, False)
+            sqrt_price, amount_in = lower, amount_in - max_in
+        if amount_in:
+            raise RuntimeError("Not enough liquidity on the curve for this sell")
+        return out, sqrt_price
+
+    def _walk_out(self, sqrt_price: int, amount_out: int, buy: bool) -> tuple:
+        needed = 0
+        if buy: # base out, price up
+            for upper, liquidity in self.curve:
+                if upper <= sqrt_price:
+                    continue
+                max_out = delta_base(sqrt_price, upper, liquidity, False)
+                if amount_out < max_out:
+                    nxt = next_sqrt_from_base_out(sqrt_price, liquidity, amount_out)
+                    return needed + delta_quote(sqrt_price, nxt, liquidity, True), nxt
+                needed += delta_quote(sqrt_price, upper, liquidity, True)
+                sqrt_price, amount_out = upper, amount_out - max_out
+            if amount_out:
+                raise RuntimeError("Not enough liquidity on the curve for this buy")
+            return needed, sqrt_price
+
+        for i in range(len(self.curve) - 1, -1, -1): # quote out, price down
+            lower = self.curve[i - 1][0] if i else self.sqrt_start_price
+            liquidity = self.curve[i][1]
+            if lower >= sqrt_price:
+                continue
+            max_out = delta_quote(lower, sqrt_price, liquidity, False)
+            if amount_out < max_out:
+                nxt = next_sqrt_from_quote_out(sqrt_price, liquidity, amount_out)
+                return needed + delta_base(nxt, sqrt_price, liquidity, True), nxt
+            needed += delta_base(lower, sqrt_price, liquidity, True)
+            sqrt_price, amount_out = lower, amount_out - max_out
+        if amount_out:
+            raise RuntimeError("Not enough liquidity on the curve for this sell")
+        return needed, sqrt_price
+
+    # quotes
+
+    def quote_exact_in(self, state, amount_in: int, buy: bool, current_point: int | None = None) -> dict:
+        """
+            Output of swapping `amount_in` (quote on buys, base on sells) against `state`.
+        """
+        fee_num = self.fee_numerator(state, buy, amount_in, current_point)
+        if self.fees_on_input(buy):
+            fee = _mul_div(amount_in, fee_num, FEE_DENOMINATOR, True)
+            amount_out, next_sqrt = self._walk_in(state["sqrt_price"], amount_in - fee, buy)
+        else:
+            gross, next_sqrt = self._walk_in(state["sqrt_price"], amount_in, buy)
+            fee = _mul_div(gross, fee_num, FEE_DENOMINATOR, True)
+            amount_out = gross - fee
+        return {"amount_in": amount_in, "amount_out": amount_out, "fee": fee, "next_sqrt_price": next_sqrt}
+
+    def quote_exact_out(self, state, amount_out: int, buy: bool, current_point: int | None = None) -> dict:
+        """
+            Smallest input that returns at least `amount_out` after fees.
+            Rate limited buys are priced at the fee of the quoted input, re-checked once.
+        """
+        fee_num = self.fee_numerator(state, buy, 0, current_point)
+        if self.fees_on_input(buy):
+            net_in, next_sqrt = self._walk_out(state["sqrt_price"], amount_out, buy)
+            amount_in = _mul_div(net_in, FEE_DENOMINATOR, FEE_DENOMINATOR - fee_num, True)
+            if self.base_fee["base_fee_mode"] == BASE_FEE_RATE_LIMITER:
+                fee_num = self.fee_numerator(state, buy, amount_in, current_point)
+                amount_in = _mul_div(net_in, FEE_DENOMINATOR, FEE_DENOMINATOR - fee_num, True)
+            fee = amount_in - net_in
+        else:
+            gross = _mul_div(amount_out, FEE_DENOMINATOR, FEE_DENOMINATOR - fee_num, True)
+            amount_in, next_sqrt = self._walk_out(state["sqrt_price"], gross, buy)
+            fee = gross - amount_out
+        return {"amount_in": amount_in, "amount_out": amount_out, "fee": fee, "next_sqrt_price": next_sqrt}
+
+    def quote_batch(self, state, amounts: list, buy: bool, current_point: int | None = None) -> list:
+        """
+            Exact-in outputs for many input sizes against the same state, None where the curve runs out.
+        """
+        quotes = []
+        for amount in amounts:
+            try:
+                quotes.append(self.quote_exact_in(state, amount, buy, current_point)["amount_out"])
+            except RuntimeError:
+                quotes.append(None)
+        return quotes
+
+    def min_amount_out(self, state, amount_in: int, buy: bool, slippage_pct: float, current_point: int | None = None) -> int:
+        amount_out = self.quote_exact_in(state, amount_in, buy, current_point)["amount_out"]
+        return max(1, int(amount_out * (100 - slippage_pct) / 100))
+
+__all__ = ["CurveQuoter", "delta_base", "delta_quote", "FEE_DENOMINATOR"]
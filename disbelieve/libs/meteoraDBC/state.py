@@ -1,5 +1,5 @@
 # state.py
-import asyncio, base64
+import asyncio, base64, struct
 
 from construct import Struct, Int8ul, Int16ul, Int32ul, Int64ul, Bytes, Array
 
@@ -125,6 +125,104 @@ VirtualPoolLayout = Struct(
     "padding1"           / Bytes(56),
 )
 
+_U128 = struct.Struct("<QQ")
+DISCRIMINATOR_LEN = 8
+
+def compile_layout(layout, base: int = DISCRIMINATOR_LEN) -> dict:
+    """
+        Resolve every top-level field of a fixed-size construct Struct to (offset, size, struct.Struct | None),
+        offsets are absolute in the account data (discriminator included).
+    """
+    fields, pos = {}, base
+    for sc in layout.subcons:
+        size = sc.sizeof()
+        fmt = getattr(sc.subcon, "fmtstr", None)
+        fields[sc.name] = (pos, size, struct.Struct(fmt) if fmt else None)
+        pos += size
+    return fields
+
+VIRTUAL_POOL_FIELDS = compile_layout(VirtualPoolLayout)
+VIRTUAL_POOL_SIZE = DISCRIMINATOR_LEN + VirtualPoolLayout.sizeof()
+SQRT_PRICE_OFFSET = VIRTUAL_POOL_FIELDS["sqrt_price_raw"][0]
+
+def sqrt_price_from_account(data) -> int:
+    """
+        Read only the Q64.64 sqrt price out of raw VirtualPool account data.
+    """
+    lo, hi = _U128.unpack_from(data, SQRT_PRICE_OFFSET)
+    return lo | (hi << 64)
+
+_RESERVES = struct.Struct("<QQ")
+RESERVES_OFFSET = VIRTUAL_POOL_FIELDS["base_reserve"][0] # quote_reserve follows
+
+def reserves_from_account(data) -> tuple:
+    """
+        (base_reserve, quote_reserve) out of raw VirtualPool account data.
+    """
+    return _RESERVES.unpack_from(data, RESERVES_OFFSET)
+
+class VirtualPool:
+    """
+        Zero-copy view over raw VirtualPool account data, fields are decoded on first access.
+        Reads like the dict fetch_virtual_pool used to return: `sqrt_price` is an int, pubkeys are base58 strings.
+    """
+    __slots__ = ("_buf", "_cache")
+
+    PUBKEYS = frozenset(("config", "creator", "base_mint", "base_vault", "quote_vault"))
+
+    def __init__(self, data):
+        if len(data) < VIRTUAL_POOL_SIZE:
+            raise ValueError(f"VirtualPool account data too short: {len(data)} < {VIRTUAL_POOL_SIZE}")
+        self._buf = memoryview(data)
+        self._cache = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        value = self._decode(key)
+        self._cache[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._cache[key] = value
+
+    def __contains__(self, key):
+        return key in self._cache or key == "sqrt_price" or (key in VIRTUAL_POOL_FIELDS and key != "sqrt_price_raw")
+
+    def _decode(self, key):
+        if key == "sqrt_price":
+            return sqrt_price_from_account(self._buf)
+        if key == "sqrt_price_raw" or key not in VIRTUAL_POOL_FIELDS:
+            raise KeyError(key)
+        off, size, fmt = VIRTUAL_POOL_FIELDS[key]
+        if fmt is not None:
+            return fmt.unpack_from(self._buf, off)[0]
+        if key in self.PUBKEYS:
+            return str(self.pubkey(key))
+        return bytes(self._buf[off:off + size])
+
+    def pubkey(self, key: str) -> Pubkey:
+        off, _, _ = VIRTUAL_POOL_FIELDS[key]
+        return Pubkey.from_bytes(bytes(self._buf[off:off + 32]))
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        keys = ["sqrt_price" if k == "sqrt_price_raw" else k for k in VIRTUAL_POOL_FIELDS]
+        return keys + [k for k in self._cache if k not in VIRTUAL_POOL_FIELDS and k != "sqrt_price"]
+
+    def to_dict(self) -> dict:
+        return {k: self[k] for k in self.keys()}
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._buf)
+
 Q64 = 1 << 64
 def price_from_sqrt(sqrt_q64: int, base_dec: int, quote_dec: int) -> float:
     p = (sqrt_q64 / Q64) ** 2
@@ -140,34 +238,39 @@ def migration_quote_amount(threshold: int, fee_pct: int) -> tuple[int,int]:
     fee       = threshold - quote_amt
     return quote_amt, fee
 
+def account_data(acc) -> bytes:
+    if isinstance(acc.data, bytes):
+        return acc.data
+    elif isinstance(acc.data, tuple):
+        return base64.b64decode(acc.data[0])
+    raise TypeError(f"unexpected data field type: {type(acc.data)}")
+
 async def fetch_virtual_pool(pool_addr: str, ctx: AsyncClient):
     pk = Pubkey.from_string(pool_addr)
     acc = (await ctx.get_account_info(pk, encoding="base64", commitment=Processed)).value
     if acc is None:
         raise RuntimeError(f"account not found {pool_addr}")
 
-    if isinstance(acc.data, bytes):
-        blob = acc.data
-    elif isinstance(acc.data, tuple):
-        blob = base64.b64decode(acc.data[0])
-    else:
-        raise TypeError(f"unexpected data field type: {type(acc.data)}")
-
-    blob = blob[8:]
-    parsed = VirtualPoolLayout.parse(blob)
-
-    def b58(x: bytes) -> str:
-        return str(Pubkey.from_bytes(x))
-
-    out = {}
-    for k, v in parsed.items():
-        if k == "sqrt_price_raw":
-            out["sqrt_price"] = int.from_bytes(v, "little")
-        elif isinstance(v, bytes) and len(v) == 32:
-            out[k] = b58(v)
-        else:
-            out[k] = v
-    return out
+    return VirtualPool(account_data(acc))
+
+async def fetch_accounts(addrs: list, ctx: AsyncClient) -> list:
+    """
+        Raw data of several accounts in one getMultipleAccounts call, missing accounts come back as None.
+    """
+    pks = [addr if isinstance(addr, Pubkey) else Pubkey.from_string(addr) for addr in addrs]
+    accs = (await ctx.get_multiple_accounts(pks, encoding="base64", commitment=Processed)).value
+    return [None if acc is None else account_data(acc) for acc in accs]
+
+async def fetch_virtual_pools(pool_addrs: list, ctx: AsyncClient) -> list:
+    """
+        Fetch several pools in one getMultipleAccounts call, missing accounts come back as None.
+    """
+    return [None if data is None else VirtualPool(data) for data in await fetch_accounts(pool_addrs, ctx)]
+
+MINT_DECIMALS_OFFSET = 44 # spl mint: mint_authority (4 + 32), supply (8), decimals (u8)
+
+def mint_decimals(data: bytes) -> int:
+    return data[MINT_DECIMALS_OFFSET]
 
 async def fetch_pool_config(pool_addr: str, ctx: AsyncClient):
     pk   = Pubkey.from_string(pool_addr)
@@ -175,11 +278,14 @@ async def fetch_pool_config(pool_addr: str, ctx: AsyncClient):
     if acc is None:
         raise RuntimeError(f"PoolConfig account {pool_addr} not found")
 
-    blob = base64.b64decode(acc.data[0]) if isinstance(acc.data, tuple) else acc.data
+    return parse_pool_config(account_data(acc))
+
+def parse_pool_config(blob: bytes) -> dict:
     parsed = PoolConfigLayout.parse(blob[8:])
 
     def to_pubkey(b):  return str(Pubkey.from_bytes(b))
     def u128(b):       return int.from_bytes(b, "little")
+    fees = parsed.pool_fees
 
     cfg = {
         "quote_mint"                : to_pubkey(parsed.quote_mint),
@@ -190,5 +296,26 @@ async def fetch_pool_config(pool_addr: str, ctx: AsyncClient):
         "migration_fee_pct"         : parsed.migration_fee_pct,
         "migration_sqrt_price"      : u128(parsed.migration_sqrt_price),
         "sqrt_start_price"          : u128(parsed.sqrt_start_price),
+        "collect_fee_mode"          : parsed.collect_fee_mode,
+        "activation_type"           : parsed.activation_type,
+        "base_fee"                  : {
+            "cliff_fee_numerator" : fees.base_fee.cliff_fee_num,
+            "first_factor"        : fees.base_fee.first_factor,
+            "second_factor"       : fees.base_fee.second_factor,
+            "third_factor"        : fees.base_fee.third_factor,
+            "base_fee_mode"       : fees.base_fee.base_fee_mode,
+        },
+        "dynamic_fee"               : {
+            "initialized"          : fees.dynamic_fee.initialized,
+            "bin_step"             : fees.dynamic_fee.bin_step,
+            "variable_fee_control" : fees.dynamic_fee.variable_fee_control,
+        },
+        "protocol_fee_pct"          : fees.protocol_fee_pct,
+        "referral_fee_pct"          : fees.referral_fee_pct,
+        # (sqrt_price, liquidity) per segment, unused points are zeroed
+        "curve"                     : [
+            (u128(point.sqrt_price), u128(point.liquidity))
+            for point in parsed.curve if u128(point.sqrt_price) and u128(point.liquidity)
+        ],
     }
     return cfg
\ No newline at end of file
@@ -8,21 +8,33 @@ from solders.instruction import AccountMeta, Instruction       # type: ignore
 from spl.token.instructions import (
     get_associated_token_address,
     sync_native, SyncNativeParams,
-    create_associated_token_account
 )
 from solders.system_program import transfer, TransferParams
-from solders.transaction import VersionedTransaction # type: ignore
-from solders.message    import MessageV0 # type: ignore
 from solana.rpc.types import TxOpts
 from solana.rpc.commitment import Processed
 from solders.keypair import Keypair # type: ignore
+from solders.hash import Hash # type: ignore
 from solders.compute_budget import set_compute_unit_price, set_compute_unit_limit # type: ignore
-from spl.token.instructions import close_account, CloseAccountParams
+from spl.token.instructions import close_account, CloseAccountParams, create_idempotent_associated_token_account
 from decimal import Decimal
+import asyncio
+try: from .blockhash import BlockhashCache
+except: from blockhash import BlockhashCache
+try: from .ata import AtaRegistry, TOKEN_PROGRAM, TOKEN_2022
+except: from ata import AtaRegistry, TOKEN_PROGRAM, TOKEN_2022
+try: from .balances import BalanceTracker
+except: from balances import BalanceTracker
+try: from .template import SwapTemplate
+except: from template import SwapTemplate
 
 def _token_prog(pool_type: int) -> Pubkey:
     return TOKEN_PROGRAM if pool_type == 0 else TOKEN_2022
 
+def _state_pubkey(state, key: str) -> Pubkey:
+    if hasattr(state, "pubkey"):
+        return state.pubkey(key) # VirtualPool view, skips the base58 round trip
+    return Pubkey.from_string(state[key])
+
 def compute_unit_price_from_total_fee(
     total_lams: int,
     compute_units: int = 120_000
@@ -39,14 +51,24 @@ EVENT_AUTHORITY_PDA, _ = Pubkey.find_program_address([EVENT_AUTH_SEED], DBC_PROG
 SWAP_DISCRIM = bytes([248, 198, 158, 145, 225, 117, 135, 200])
 UNIT_COMPUTE_BUDGET = 200_000
 LAMPORTS_PER_SOL = 1_000_000_000
-
-TOKEN_PROGRAM = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
-TOKEN_2022 = Pubkey.from_string("TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb")
+WSOL_MINT = Pubkey.from_string("So11111111111111111111111111111111111111112")
 
 class MeteoraDBCSwap:
-    def __init__(self, client: AsyncClient, payer: Keypair):
+    def __init__(self, client: AsyncClient, payer: Keypair, sender=None, confirm=None):
         self.client = client
         self.payer = payer
+        self.sender = sender # multi-endpoint broadcaster, falls back to the client when None
+        self.blockhashes = BlockhashCache(client)
+        self.atas = AtaRegistry(client, payer.pubkey(), confirm=confirm, transient=(WSOL_MINT,)) # sells close the WSOL ATA
+        self.balances = BalanceTracker(client, payer.pubkey(), ata=self.atas.ata)
+        self.templates = {} # (pool, quote mint, referral) -> SwapTemplate
+        self.trace = None # trace(mint, stage) as a buy is built, signed and sent
+
+    async def load_wallet(self):
+        """
+            One owner-wide token account lookup seeds both the ATA registry and the balances.
+        """
+        self.balances.apply_accounts(await self.atas.load())
 
     async def mint_of_token_account(self, ata_or_vault: str) -> Pubkey:
         info = (await self.client.get_account_info(Pubkey.from_string(ata_or_vault), encoding="base64")).value
@@ -55,17 +77,6 @@ class MeteoraDBCSwap:
         raw = base64.b64decode(info.data[0])[0:32]
         return Pubkey.from_bytes(raw)
 
-    async def create_ata_if_needed(self, owner: Pubkey, mint: Pubkey):
-        ata = get_associated_token_address(owner, mint)
-        resp = await self.client.get_account_info(ata, commitment=Processed)
-        if resp.value is None:
-            return create_associated_token_account(
-                payer=owner,
-                owner=owner,
-                mint=mint
-            )
-        return None
-
     def build_dbc_swap_ix(
         self,
         state: dict,
@@ -78,18 +89,18 @@ class MeteoraDBCSwap:
         referral_ata: Optional[Pubkey] = None,
     ) -> Tuple[Instruction, Pubkey]:
 
-        base_mint   = Pubkey.from_string(state["base_mint"])
+        base_mint   = _state_pubkey(state, "base_mint")
         if isinstance(quote_mint, str):
             quote_mint  = Pubkey.from_string(quote_mint)
 
-        base_vault  = Pubkey.from_string(state["base_vault"])
-        quote_vault = Pubkey.from_string(state["quote_vault"])
+        base_vault  = _state_pubkey(state, "base_vault")
+        quote_vault = _state_pubkey(state, "quote_vault")
         pool_pk     = Pubkey.from_string(state["_pubkey"] if "_pubkey" in state else "ERROR") \
                         if "_pubkey" in state else None
         if pool_pk is None:
             raise ValueError("state dict must include '_pubkey' with pool address")
 
-        config_pk   = Pubkey.from_string(state["config"])
+        config_pk   = _state_pubkey(state, "config")
         pool_type   = state["pool_type"]
 
         if buy_base:
@@ -101,7 +112,7 @@ class MeteoraDBCSwap:
         user_out_ata = get_associated_token_address(user,  out_mint)
 
         metas = [
-            AccountMeta(Pubkey.from_string(str(POOL_AUTHORITY_PDA)), False, False),
+            AccountMeta(POOL_AUTHORITY_PDA, False, False),
             AccountMeta(config_pk, False, False),
             AccountMeta(pool_pk,   False, True),           # writable
             AccountMeta(user_in_ata,  False, True),
@@ -129,6 +140,124 @@ class MeteoraDBCSwap:
         ix = Instruction(program_id=DBC_PROGRAM_ID, data=data, accounts=metas)
         return ix
 
+    def swap_instructions(
+        self,
+        state: dict,
+        buy_base: bool,
+        creates: tuple,
+        amount_in: int,
+        min_amount_out: int,
+        micro_lamports: int,
+        quote_mint: Pubkey = WSOL_MINT,
+        referral_ata: Optional[Pubkey] = None,
+    ) -> list:
+        """
+            Instructions of a buy (quote -> base) or sell (base -> quote), `creates` are the mints whose ATA
+            gets an idempotent create instruction.
+        """
+        user     = self.payer.pubkey()
+        wsol_ata = self.atas.ata(quote_mint)
+
+        instructions = [
+            set_compute_unit_limit(UNIT_COMPUTE_BUDGET),
+            set_compute_unit_price(micro_lamports),
+        ]
+        for mint in creates:
+            instructions.append(create_idempotent_associated_token_account(payer=user, owner=user, mint=mint))
+
+        if buy_base:
+            instructions.append(
+                transfer(
+                    TransferParams(
+                        from_pubkey = user,
+                        to_pubkey   = wsol_ata,
+                        lamports    = amount_in 
+                    )
+                )
+            )
+            instructions.append(
+                sync_native(
+                    SyncNativeParams(
+                        program_id = TOKEN_PROGRAM,
+                        account    = wsol_ata
+                    )
+                )
+            )
+
+        instructions.append(
+            self.build_dbc_swap_ix(
+                state,
+                user,
+                amount_in,
+                min_amount_out,
+                quote_mint=quote_mint,
+                buy_base=buy_base,
+                referral_ata=referral_ata
+            )
+        )
+
+        if not buy_base:
+            instructions.append(
+                close_account(
+                    CloseAccountParams(
+                        program_id = TOKEN_PROGRAM,
+                        account    = wsol_ata,
+                        dest       = user,
+                        owner      = user,
+                    )
+                )
+            )
+        return instructions
+
+    def prepare(self, state: dict, quote_mint: Pubkey = WSOL_MINT, referral_ata: Optional[Pubkey] = None) -> SwapTemplate:
+        """
+            Template of the pool's buy and sell messages, built once when the mint is detected
+            so trades only patch amounts, compute price and blockhash before signing.
+        """
+        key = (state["_pubkey"], quote_mint, referral_ata)
+        template = self.templates.get(key)
+        if template is None:
+            def build(buy_base, creates, amount_in, min_amount_out, micro_lamports):
+                return self.swap_instructions(
+                    state, buy_base, creates, amount_in, min_amount_out, micro_lamports,
+                    quote_mint=quote_mint, referral_ata=referral_ata,
+                )
+            template = self.templates[key] = SwapTemplate(self.payer, build)
+            base_mint = _state_pubkey(state, "base_mint")
+            template.message(True, self.atas.missing(quote_mint, base_mint))
+            template.message(False, self.atas.missing(quote_mint))
+        return template
+
+    def warm(self):
+        """
+            Compile and sign a throwaway buy and sell of a made-up pool, so the first real trade
+            finds every code path, import and our WSOL ATA derivation already done.
+        """
+        pool = str(Pubkey.new_unique())
+        state = {
+            "_pubkey": pool, "pool_type": 0,
+            **{key: str(Pubkey.new_unique()) for key in ("config", "base_mint", "base_vault", "quote_vault")},
+        }
+        base_mint = Pubkey.from_string(state["base_mint"])
+        template = self.prepare(state)
+        for buy_base, creates in ((True, (WSOL_MINT, base_mint)), (False, (WSOL_MINT,))):
+            template.sign(buy_base, creates, Hash.default(), 1, 1, 1)
+        self.discard(pool)
+        self.atas.discard(base_mint)
+
+    def _trace(self, mint: Pubkey, stage: str):
+        if self.trace is not None:
+            self.trace(str(mint), stage)
+
+    async def send(self, tx: bytes, opts: TxOpts):
+        if self.sender is not None:
+            return await self.sender.send(tx, skip_preflight=opts.skip_preflight, max_retries=opts.max_retries)
+        return (await self.client.send_raw_transaction(tx, opts=opts)).value
+
+    def discard(self, pool: str):
+        for key in [k for k in self.templates if k[0] == pool]:
+            self.templates.pop(key)
+
     async def buy(
             self,
             state: dict, 
@@ -139,73 +268,27 @@ class MeteoraDBCSwap:
             referral_ata: Optional[Pubkey] = None
         ):
 
-        instructions = []
-
         lamports_fee = int(fee_sol * LAMPORTS_PER_SOL)
         micro_lamports = compute_unit_price_from_total_fee(
             lamports_fee,
             compute_units=UNIT_COMPUTE_BUDGET
         )
 
-        instructions.append(set_compute_unit_limit(UNIT_COMPUTE_BUDGET))
-        instructions.append(set_compute_unit_price(micro_lamports))
-
-        user = self.payer.pubkey()
-
-        quote_mint = Pubkey.from_string(quote_mint)
-
-        wsol_ata = get_associated_token_address(user, quote_mint)
-
-        wsol_ata_ix = await self.create_ata_if_needed(user, quote_mint)
-        if wsol_ata_ix:
-            instructions.append(wsol_ata_ix)
-
-        base_ata_ix = await self.create_ata_if_needed(user, Pubkey.from_string(state["base_mint"]))
-        if base_ata_ix:
-            instructions.append(base_ata_ix)
-
-        instructions.append(
-            transfer(
-                TransferParams(
-                    from_pubkey = user,
-                    to_pubkey   = wsol_ata,
-                    lamports    = amount_in 
-                )
-            )
-        )
-        instructions.append(
-            sync_native(
-                SyncNativeParams(
-                    program_id = TOKEN_PROGRAM,
-                    account    = wsol_ata
-                )
-            )
-        )
-
-        swap_ix = self.build_dbc_swap_ix(
-            state,
-            user,
-            amount_in,
-            min_amount_out,
-            quote_mint=quote_mint,
-            buy_base=True,
-            referral_ata=referral_ata
-        )
-
-        instructions.append(swap_ix)
-
-        bh   = (await self.client.get_latest_blockhash(commitment=Processed)).value.blockhash
-        msg  = MessageV0.try_compile(
-            payer = user,
-            instructions = instructions,
-            address_lookup_table_accounts = [],
-            recent_blockhash = bh,
-        )
-        tx = VersionedTransaction(msg, [self.payer])
+        if isinstance(quote_mint, str):
+            quote_mint = Pubkey.from_string(quote_mint)
+        base_mint = _state_pubkey(state, "base_mint")
+        creates   = self.atas.missing(quote_mint, base_mint)
+
+        template, blockhash = self.prepare(state, quote_mint, referral_ata), await self.blockhashes.get()
+        self._trace(base_mint, "built")
+        tx = template.sign(True, creates, blockhash, amount_in, min_amount_out, micro_lamports)
+        self._trace(base_mint, "signed")
         opts = TxOpts(skip_preflight=True, max_retries=0)
-        sig = await self.client.send_transaction(tx, opts=opts)
-        print("sent tx:", sig.value)
-        return sig.value
+        sig = await self.send(tx, opts)
+        self._trace(base_mint, "sent")
+        print("sent tx:", sig)
+        asyncio.create_task(self.atas.settle(sig, [self.atas.ata(mint) for mint in creates]))
+        return sig
 
     async def sell(
         self,
@@ -215,71 +298,43 @@ class MeteoraDBCSwap:
         fee_sol: float = 0.00001,
         quote_mint: str = "So11111111111111111111111111111111111111112",
         referral_ata: Pubkey | None = None,
+        quoter=None,
     ):
 
         assert 0 < pct <= 100, "pct must be between 0 and 100"
 
         user      = self.payer.pubkey()
-        base_mint = Pubkey.from_string(state["base_mint"])
+        base_mint = _state_pubkey(state, "base_mint")
         quote_mnt = Pubkey.from_string(quote_mint)
-        base_ata  = get_associated_token_address(user, base_mint)
-        wsol_ata  = get_associated_token_address(user, quote_mnt)
+        base_ata  = self.atas.ata(base_mint)
 
-        acc = (await self.client.get_account_info_json_parsed(base_ata, commitment=Processed)).value
-        if acc is None:
-            raise RuntimeError(f"Base ATA empty – nothing to sell {base_ata}")
-        raw_bal = int(acc.data.parsed['info']['tokenAmount']['amount'])
+        raw_bal = self.balances.get(base_mint)
+        if not raw_bal: # not tracked yet, ask the chain once
+            acc = (await self.client.get_account_info_json_parsed(base_ata, commitment=Processed)).value
+            if acc is None:
+                raise RuntimeError(f"Base ATA empty – nothing to sell {base_ata}")
+            raw_bal = int(acc.data.parsed['info']['tokenAmount']['amount'])
+            self.balances.set(base_mint, raw_bal)
 
         amount_in = int(raw_bal * (pct / 100.0))
         if amount_in == 0:
             raise RuntimeError("Chosen percentage rounds to zero tokens")
 
-        price      = Decimal(state["quote_reserve"]) / Decimal(state["base_reserve"])
-        min_quote  = int(Decimal(amount_in) * price * Decimal(1 - slippage_pct / 100))
+        if quoter is not None: # exact curve quote of this sell
+            min_quote = quoter.min_amount_out(state, amount_in, False, slippage_pct)
+        else:
+            price      = Decimal(state["quote_reserve"]) / Decimal(state["base_reserve"])
+            min_quote  = int(Decimal(amount_in) * price * Decimal(1 - slippage_pct / 100))
 
         lamports_fee    = int(fee_sol * LAMPORTS_PER_SOL)
         micro_lamports  = compute_unit_price_from_total_fee(lamports_fee,
                                                             compute_units=UNIT_COMPUTE_BUDGET)
-        ix = [
-            set_compute_unit_limit(UNIT_COMPUTE_BUDGET),
-            set_compute_unit_price(micro_lamports),
-        ]
-
-        if await self.create_ata_if_needed(user, quote_mnt):
-            ix.append(await self.create_ata_if_needed(user, quote_mnt))
-
-        swap_ix = self.build_dbc_swap_ix(
-            state       = state,
-            user        = user,
-            amount_in   = amount_in,
-            min_amount_out = min_quote,
-            quote_mint  = quote_mnt,
-            buy_base    = False,
-            referral_ata= referral_ata,
-        )
-        ix.append(swap_ix)
-
-        ix.append(
-            close_account(
-                CloseAccountParams(
-                    program_id = TOKEN_PROGRAM,
-                    account    = wsol_ata,
-                    dest       = user,
-                    owner      = user,
-                )
-            )
-        )
 
-        bh = (await self.client.get_latest_blockhash()).value.blockhash
-        msg = MessageV0.try_compile(
-            payer        = user,
-            instructions = ix,
-            recent_blockhash = bh,
-            address_lookup_table_accounts = [],
+        tx = self.prepare(state, quote_mnt, referral_ata).sign(
+            False, self.atas.missing(quote_mnt), await self.blockhashes.get(), amount_in, min_quote, micro_lamports,
         )
-        tx  = VersionedTransaction(msg, [self.payer])
-        sig = await self.client.send_transaction(tx, opts=TxOpts(skip_preflight=True))
-        print("sent sell tx:", sig.value)
-        return sig.value
+        sig = await self.send(tx, TxOpts(skip_preflight=True))
+        print("sent sell tx:", sig)
+        return sig
 
 __all__ = ["MeteoraDBCSwap"]
\ No newline at end of file
@@ -0,0 +1,83 @@
+import struct
+from solders.hash import Hash # type: ignore
+from solders.keypair import Keypair # type: ignore
+from solders.message import MessageV0, to_bytes_versioned # type: ignore
+
+U64 = struct.Struct("<Q")
+
+# placeholders compiled into the message, located once and patched before every signature
+SENTINEL_BLOCKHASH = Hash(bytes(range(0xA0, 0xC0)))
+SENTINELS = {
+    "amount_in"      : 0x5E17_1E1A_A0A0_0001,
+    "min_amount_out" : 0x5E17_1E1A_A0A0_0002,
+    "micro_lamports" : 0x5E17_1E1A_A0A0_0003,
+}
+
+def _find_all(buf: bytes, needle: bytes) -> list:
+    found, at = [], buf.find(needle)
+    while at != -1:
+        found.append(at)
+        at = buf.find(needle, at + 1)
+    return found
+
+class MessageTemplate:
+    """
+        A compiled v0 message and the byte offsets of its blockhash, amounts and compute price.
+    """
+    def __init__(self, payer: Keypair, instructions: list):
+        msg = MessageV0.try_compile(
+            payer = payer.pubkey(),
+            instructions = instructions,
+            address_lookup_table_accounts = [],
+            recent_blockhash = SENTINEL_BLOCKHASH,
+        )
+        self.message = bytes(to_bytes_versioned(msg))
+        self.blockhash_at = _find_all(self.message, bytes(SENTINEL_BLOCKHASH))
+        self.fields = {name: _find_all(self.message, U64.pack(value)) for name, value in SENTINELS.items()}
+        if len(self.blockhash_at) != 1 or not all(self.fields.values()):
+            raise ValueError("could not locate every placeholder in the compiled message")
+
+    def sign(self, payer: Keypair, blockhash: Hash, **values) -> bytes:
+        """
+            Patch the placeholders and return signed wire-format transaction bytes.
+        """
+        buf = bytearray(self.message)
+        at = self.blockhash_at[0]
+        buf[at:at + 32] = bytes(blockhash)
+        for name, value in values.items():
+            for at in self.fields[name]:
+                U64.pack_into(buf, at, value)
+        msg = bytes(buf)
+        return b"\x01" + bytes(payer.sign_message(msg)) + msg # one signature, compact-u16 length
+
+class SwapTemplate:
+    """
+        Compiled buy and sell messages of one pool, keyed by direction and the ATAs the
+        transaction has to create. `build(buy_base, creates, amount_in, min_amount_out, micro_lamports)`
+        returns the instruction list, it's only called once per variant.
+    """
+    def __init__(self, payer: Keypair, build):
+        self.payer = payer
+        self.build = build
+        self.messages = {}
+
+    def message(self, buy_base: bool, creates: tuple) -> MessageTemplate:
+        key = (buy_base, creates)
+        msg = self.messages.get(key)
+        if msg is None:
+            msg = self.messages[key] = MessageTemplate(
+                self.payer,
+                self.build(buy_base, creates, SENTINELS["amount_in"], SENTINELS["min_amount_out"], SENTINELS["micro_lamports"]),
+            )
+        return msg
+
+    def sign(self, buy_base: bool, creates: tuple, blockhash: Hash, amount_in: int, min_amount_out: int, micro_lamports: int) -> bytes:
+        return self.message(buy_base, creates).sign(
+            self.payer,
+            blockhash,
+            amount_in=amount_in,
+            min_amount_out=min_amount_out,
+            micro_lamports=micro_lamports,
+        )
+
+__all__ = ["SwapTemplate", "MessageTemplate"]
@@ -0,0 +1,164 @@
+import time
+import logging
+from aiohttp import web
+from bisect import bisect_left
+from collections import OrderedDict, deque
+
+try: from .colors import cc
+except: from colors import cc
+
+# pipeline of a launch, from the log frame to our buy being sent, in the order it normally happens
+STAGES = ("frame", "swap_tx", "queued", "accounts", "decimals", "ready", "built", "signed", "sent")
+# upper bounds in seconds, log-spaced from 100us to 10s
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """
+        Cumulative Prometheus buckets plus the last `keep` samples for percentiles in summaries.
+    """
+    __slots__ = ("counts", "count", "total", "samples")
+
+    def __init__(self, keep: int = 512):
+        self.counts = [0] * (len(BUCKETS) + 1) # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=keep)
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def lines(self, name: str, labels: str) -> list:
+        out, running = [], 0
+        for bound, n in zip(BUCKETS + ("+Inf",), self.counts):
+            running += n
+            out.append(f'{name}_bucket{{{labels},le="{bound}"}} {running}')
+        out.append(f"{name}_sum{{{labels}}} {self.total}")
+        out.append(f"{name}_count{{{labels}}} {self.count}")
+        return out
+
+class Metrics:
+    """
+        Per-mint stage timestamps of the launch pipeline, aggregated into latency histograms,
+        and a Prometheus text endpoint over them plus whatever the registered collectors report.
+
+        `mark(mint, stage)` keeps the first perf_counter() of every stage per mint, the time since
+        the mint's log frame and since the stage before it are observed once per mint. Collectors
+        are called only when the endpoint is scraped, components keep their own counters.
+    """
+    def __init__(self, max_traces: int = 1024):
+        self.traces = OrderedDict() # mint -> {stage: perf_counter()}
+        self.max_traces = max_traces
+        self.since_frame = {stage: Histogram() for stage in STAGES[1:]}
+        self.step = {stage: Histogram() for stage in STAGES[1:]}
+        self.collectors = [] # fn() -> [(metric name, type, help, [(labels dict, value)])]
+        self.runner = None
+        self.warm_up = None     # seconds the startup warm-up took
+        self.first_trade = None # log frame -> sent of the first launch we traded
+
+    def mark(self, mint: str, stage: str, at: float | None = None):
+        at = time.perf_counter() if at is None else at
+        trace = self.traces.get(mint)
+        if trace is None:
+            trace = self.traces[mint] = {}
+            if len(self.traces) > self.max_traces:
+                self.traces.popitem(last=False)
+        if stage in trace:
+            return # later trades of the mint aren't on the launch path
+        previous = max((t for t in trace.values() if t <= at), default=None)
+        trace[stage] = at
+        frame = trace.get("frame")
+        if stage != "frame" and stage in self.since_frame:
+            if frame is not None:
+                self.since_frame[stage].observe(at - frame)
+                if stage == STAGES[-1] and self.first_trade is None:
+                    self.first_trade = at - frame
+                    logging.info(f"{cc.LIGHT_GRAY}First trade sent {self.first_trade * 1000:.1f}ms after its launch frame{cc.RESET}")
+            if previous is not None:
+                self.step[stage].observe(at - previous)
+
+    def trace(self, mint: str) -> dict:
+        """
+            Stage -> milliseconds since the log frame (or the first mark) for one mint.
+        """
+        trace = self.traces.get(mint, {})
+        if not trace:
+            return {}
+        start = trace.get("frame", min(trace.values()))
+        return {stage: (t - start) * 1000 for stage, t in sorted(trace.items(), key=lambda item: item[1])}
+
+    def collect(self, fn):
+        self.collectors.append(fn)
+
+    def render(self) -> str:
+        lines = [
+            "# HELP disbelieve_stage_seconds Time from a launch log frame until the stage, first trade of a mint only",
+            "# TYPE disbelieve_stage_seconds histogram",
+        ]
+        for stage, h in self.since_frame.items():
+            if h.count:
+                lines += h.lines("disbelieve_stage_seconds", f'stage="{stage}"')
+        lines += [
+            "# HELP disbelieve_step_seconds Time from the previous stage until the stage",
+            "# TYPE disbelieve_step_seconds histogram",
+        ]
+        for stage, h in self.step.items():
+            if h.count:
+                lines += h.lines("disbelieve_step_seconds", f'stage="{stage}"')
+        for name, description, value in (
+            ("disbelieve_warm_up_seconds", "Startup warm-up before the log subscription", self.warm_up),
+            ("disbelieve_first_trade_seconds", "Time from the launch log frame until the first trade was sent", self.first_trade),
+        ):
+            if value is not None:
+                lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge", f"{name} {value}"]
+        for fn in self.collectors:
+            try:
+                for name, kind, description, samples in fn():
+                    lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+                    for labels, value in samples:
+                        label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+            except Exception as e:
+                logging.error(f"Error collecting metrics from {fn}, {e}")
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, port: int, host: str = "127.0.0.1"):
+        """
+            Expose `render()` at http://host:port/metrics until close().
+        """
+        async def metrics(request):
+            return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", metrics)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host, port).start()
+        logging.info(f"{cc.LIGHT_GRAY}Metrics on http://{host}:{port}/metrics ✔{cc.RESET}")
+
+    def summary(self) -> str:
+        parts = [
+            f"{stage} p50 {h.percentile(0.5) * 1000:.1f}ms p90 {h.percentile(0.9) * 1000:.1f}ms"
+            for stage, h in self.since_frame.items() if h.count
+        ]
+        if not parts:
+            return "no launches traced"
+        first = ""
+        if self.first_trade is not None:
+            first = f", first trade {self.first_trade * 1000:.1f}ms vs p50 {self.since_frame[STAGES[-1]].percentile(0.5) * 1000:.1f}ms"
+        return f"{len(self.traces)} mints traced, since log frame: " + ", ".join(parts) + first
+
+    async def close(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+__all__ = ["Metrics", "Histogram", "STAGES"]
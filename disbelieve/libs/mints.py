@@ -0,0 +1,159 @@
+import sys
+import time
+from hashlib import blake2b
+from collections import OrderedDict
+from solders.pubkey import Pubkey # type: ignore
+
+KEY_SIZE = 32 # a mint's raw public key
+
+class MintState:
+    """
+        What the strategy keeps about one mint, from its launch until it's sold or evicted.
+    """
+    __slots__ = (
+        "mint", "price", "open_price", "held", "buy_price", "sold_pct", "stabilize_until", "buys_noted",
+        "buy_confirmation", "sell_confirmation", "wakeup", "touched",
+    )
+
+    def __init__(self, mint: str, now: float):
+        self.mint = mint
+        self.price = 0.0
+        self.open_price = None   # set by the first streamed price, the handler waits for it
+        self.held = False        # a buy was sent, the exits apply
+        self.buy_price = 0.0
+        self.sold_pct = 0.0      # percentage sold at target profit checkpoints
+        self.stabilize_until = None # peak drop seen, no sell before this clock() for the price to settle
+        self.buys_noted = False  # the below-threshold buys were logged
+        self.buy_confirmation = None
+        self.sell_confirmation = None
+        self.wakeup = None       # asyncio.Event of the running position handler
+        self.touched = now       # last price update, or the launch
+
+    def nbytes(self) -> int:
+        size = sys.getsizeof(self) + sys.getsizeof(self.mint)
+        for value in (self.price, self.open_price, self.buy_price, self.sold_pct, self.touched):
+            if isinstance(value, float):
+                size += sys.getsizeof(value)
+        return size
+
+class MintRegistry:
+    """
+        MintStates of the mints in play, least recently active first.
+
+        Mints we don't hold are evicted once idle for `ttl` seconds of `clock`, and oldest first
+        while more than `capacity` are tracked. Held mints stay until the strategy drops them.
+        `on_evict(state)` is called for each evicted state, after it left the registry.
+    """
+    def __init__(self, ttl: float, capacity: int, clock=time.time, on_evict=None):
+        self.ttl = ttl
+        self.capacity = capacity
+        self.clock = clock
+        self.on_evict = on_evict
+        self.states = OrderedDict() # mint -> MintState, by last activity
+        self.stats = {"tracked": 0, "dropped": 0, "expired": 0, "evicted": 0}
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, mint):
+        return mint in self.states
+
+    def __getitem__(self, mint) -> MintState:
+        return self.states[mint]
+
+    def get(self, mint) -> MintState | None:
+        return self.states.get(mint)
+
+    def track(self, mint: str) -> MintState:
+        state = self.states.get(mint)
+        if state is None:
+            state = self.states[mint] = MintState(mint, self.clock())
+            self.stats["tracked"] += 1
+            if len(self.states) > self.capacity:
+                self.sweep()
+        return state
+
+    def touch(self, state: MintState):
+        state.touched = self.clock()
+        self.states.move_to_end(state.mint)
+
+    def drop(self, mint: str) -> MintState | None:
+        state = self.states.pop(mint, None)
+        if state is not None:
+            self.stats["dropped"] += 1
+        return state
+
+    def sweep(self, now: float | None = None) -> int:
+        """
+            Evict idle and surplus mints we don't hold, returns how many went.
+        """
+        now = self.clock() if now is None else now
+        surplus = len(self.states) - self.capacity
+        evicted = []
+        for state in self.states.values():
+            idle = now - state.touched >= self.ttl
+            if not idle and surplus <= 0:
+                break # the rest were active more recently
+            if state.held:
+                continue
+            evicted.append(state)
+            surplus -= 1
+            self.stats["expired" if idle else "evicted"] += 1
+        for state in evicted:
+            del self.states[state.mint]
+            if self.on_evict is not None:
+                self.on_evict(state)
+        return len(evicted)
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.states) + sum(state.nbytes() for state in self.states.values())
+
+    def collect(self) -> list:
+        held = sum(1 for state in self.states.values() if state.held)
+        return [
+            ("disbelieve_tracked_mints", "gauge", "Mints with strategy state", [({"held": "true"}, held), ({"held": "false"}, len(self.states) - held)]),
+            ("disbelieve_mint_state_bytes", "gauge", "Strategy state per tracked mint", [({}, self.nbytes() / len(self.states) if self.states else 0)]),
+            ("disbelieve_mints_evicted_total", "counter", "Mints dropped without being held", [({"reason": "idle"}, self.stats["expired"]), ({"reason": "capacity"}, self.stats["evicted"])]),
+        ]
+
+    def summary(self) -> str:
+        s = self.stats
+        per_mint = f", {self.nbytes() / len(self.states):.0f} bytes per mint" if self.states else ""
+        return f"{len(self.states)} tracked{per_mint}, {s['tracked']} seen, {s['dropped']} done, {s['expired']} expired, {s['evicted']} evicted over capacity"
+
+class SoldSet:
+    """
+        Mints the strategy is done with, kept for the life of the process as their raw 32-byte
+        keys in a set, instead of the 44-character base58 strings. Raw keys and Pubkeys skip the
+        base58 decode.
+    """
+    def __init__(self, mints=()):
+        self._keys = set()
+        for mint in mints:
+            self.add(mint)
+
+    @staticmethod
+    def key(mint: str | Pubkey | bytes) -> bytes:
+        if isinstance(mint, bytes):
+            return mint
+        if isinstance(mint, Pubkey):
+            return bytes(mint)
+        try:
+            return bytes(Pubkey.from_string(mint))
+        except ValueError: # made-up mints of synthetic recordings
+            return blake2b(mint.encode(), digest_size=KEY_SIZE).digest()
+
+    def add(self, mint: str | Pubkey | bytes):
+        self._keys.add(self.key(mint))
+
+    def __contains__(self, mint) -> bool:
+        return self.key(mint) in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def nbytes(self) -> int:
+        return sys.getsizeof(self._keys) + sum(sys.getsizeof(key) for key in self._keys)
+
+__all__ = ["MintState", "MintRegistry", "SoldSet"]
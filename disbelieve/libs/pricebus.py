@@ -0,0 +1,73 @@
+import asyncio
+from collections import deque
+
+class PriceBus:
+    """
+        Latest-value price slots per mint.
+
+        Producers overwrite the slot of a mint and consumers wake on change, a tick that
+        is overwritten before anyone read it is counted as coalesced instead of queued.
+        `history` keeps the last N ticks per mint for consumers that need every tick.
+    """
+    def __init__(self, history: int = 0):
+        self.latest = {}   # mint -> last update
+        self.first = {}    # mint -> first update, kept even if it was coalesced away
+        self.versions = {} # mint -> number of updates published
+        self.history_size = history
+        self.history = {}  # mint -> deque of updates
+        self.counters = {"published": 0, "coalesced": 0, "delivered": 0}
+        self._dirty = {}   # mints changed since the last drain, insertion ordered
+        self._changed = asyncio.Event()
+
+    @property
+    def depth(self) -> int:
+        """
+            Mints with an update nobody has drained yet, bounded by the number of tracked mints.
+        """
+        return len(self._dirty)
+
+    def publish(self, mint: str, update: dict):
+        self.counters["published"] += 1
+        if mint in self._dirty:
+            self.counters["coalesced"] += 1
+        self.latest[mint] = update
+        if mint not in self.first:
+            self.first[mint] = update
+        self.versions[mint] = self.versions.get(mint, 0) + 1
+        self._dirty[mint] = None
+        if self.history_size:
+            ticks = self.history.get(mint)
+            if ticks is None:
+                ticks = self.history[mint] = deque(maxlen=self.history_size)
+            ticks.append(update)
+        self._changed.set()
+
+    async def drain(self) -> list:
+        """
+            Wait for at least one change, returns [(mint, latest update)] for every changed mint.
+        """
+        while not self._dirty:
+            self._changed.clear()
+            await self._changed.wait()
+        mints, self._dirty = self._dirty, {}
+        self.counters["delivered"] += len(mints)
+        return [(mint, self.latest[mint]) for mint in mints]
+
+    def get(self, mint: str):
+        return self.latest.get(mint)
+
+    def get_history(self, mint: str) -> list:
+        return list(self.history.get(mint, ()))
+
+    def discard(self, mint: str):
+        self.latest.pop(mint, None)
+        self.first.pop(mint, None)
+        self.versions.pop(mint, None)
+        self.history.pop(mint, None)
+        self._dirty.pop(mint, None)
+
+    def summary(self) -> str:
+        c = self.counters
+        return f"{c['published']} ticks published, {c['coalesced']} coalesced, {c['delivered']} delivered, depth {self.depth}"
+
+__all__ = ["PriceBus"]
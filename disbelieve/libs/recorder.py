@@ -0,0 +1,106 @@
+import re
+import json
+import time
+import struct
+
+MAGIC = b"DBRC\x01" # format version 1
+
+# record kinds
+LOG_FRAME = 1  # raw logsSubscribe notification
+ACCOUNT = 2    # pool account data of a mint: mint (u8 length + ascii) followed by the raw account bytes
+TX_META = 3    # json {"signature", "meta"} of a launch transaction
+ONBOARD = 4    # json {"mint", "pool", "decimals", "config"} once a mint is trade-ready
+
+HEADER = struct.Struct("<BdQI") # kind, receive timestamp, slot, payload length
+
+# the context slot sits at the head of every notification
+SLOT = re.compile(rb'"slot"\s*:\s*(\d+)')
+
+def slot_of(raw: bytes) -> int:
+    match = SLOT.search(raw, 0, 160)
+    return int(match.group(1)) if match else 0
+
+class Recorder:
+    """
+        Append-only capture of everything the bot consumes live, for offline replay.
+
+        Each record is a fixed header (kind, wall-clock receive time, slot, length) and the payload
+        as it arrived, writes go through the file buffer and are flushed every `flush_every` records.
+    """
+    def __init__(self, path: str, flush_every: int = 256):
+        self.path = path
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.flush_every = flush_every
+        self.counts = {LOG_FRAME: 0, ACCOUNT: 0, TX_META: 0, ONBOARD: 0}
+        self.written = 0
+
+    def write(self, kind: int, payload: bytes, slot: int = 0, ts: float | None = None):
+        self.file.write(HEADER.pack(kind, time.time() if ts is None else ts, slot, len(payload)))
+        self.file.write(payload)
+        self.counts[kind] += 1
+        self.written += HEADER.size + len(payload)
+        if sum(self.counts.values()) % self.flush_every == 0:
+            self.file.flush()
+
+    def log_frame(self, raw: str | bytes):
+        raw = raw.encode() if isinstance(raw, str) else raw
+        self.write(LOG_FRAME, raw, slot_of(raw))
+
+    def tap(self, callback):
+        """
+            Wrap a raw logsSubscribe callback so every frame is recorded before it's handled.
+        """
+        def recorded(raw):
+            self.log_frame(raw)
+            callback(raw)
+        return recorded
+
+    def account(self, mint: str, data: bytes, slot: int = 0):
+        key = mint.encode()
+        self.write(ACCOUNT, bytes([len(key)]) + key + bytes(data), slot)
+
+    def tx_meta(self, signature: str, meta: dict):
+        self.write(TX_META, json.dumps({"signature": signature, "meta": meta}).encode())
+
+    def onboard(self, mint: str, pool: str, decimals: int, config: str | None = None):
+        self.write(ONBOARD, json.dumps({"mint": mint, "pool": pool, "decimals": decimals, "config": config}).encode())
+
+    def summary(self) -> str:
+        c = self.counts
+        return (
+            f"{self.path}: {c[LOG_FRAME]} log frames, {c[ACCOUNT]} account updates, "
+            f"{c[TX_META]} tx metas, {c[ONBOARD]} mints, {self.written / 1e6:.1f}MB"
+        )
+
+    def close(self):
+        if not self.file.closed:
+            self.file.flush()
+            self.file.close()
+
+def read_records(path: str):
+    """
+        Yield (kind, receive timestamp, slot, payload) in file order, a torn last record is ignored.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a Disbelieve recording")
+        while True:
+            head = f.read(HEADER.size)
+            if len(head) < HEADER.size:
+                return
+            kind, ts, slot, length = HEADER.unpack(head)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield kind, ts, slot, payload
+
+def split_account(payload: bytes) -> tuple:
+    """
+        ACCOUNT payload -> (mint, raw account data)
+    """
+    n = payload[0]
+    return payload[1:1 + n].decode(), payload[1 + n:]
+
+__all__ = ["Recorder", "read_records", "split_account", "LOG_FRAME", "ACCOUNT", "TX_META", "ONBOARD"]
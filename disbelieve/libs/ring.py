@@ -0,0 +1,224 @@
+import struct
+import asyncio
+import platform
+from collections import OrderedDict
+from multiprocessing import Pipe, shared_memory
+
+# head (producer) and the consumer's tail and waiting flag sit on their own cache lines
+HEAD_OFFSET, TAIL_OFFSET, WAITING_OFFSET = 0, 64, 72
+HEADER_SIZE = 128
+_U64 = struct.Struct("<Q")
+_LENGTH = struct.Struct("<I")
+WRAP = 0xFFFFFFFF # length of the filler that sends the consumer back to the start
+# x86 keeps stores in program order across cores, weaker CPUs may show `head` before the frame
+ORDERED_STORES = platform.machine().lower() in ("x86_64", "amd64", "i386", "i686", "x86")
+
+def frame_size(n: int) -> int:
+    return (_LENGTH.size + n + 7) & ~7
+
+class SharedRing:
+    """
+        Single-producer single-consumer ring of byte frames in a shared memory block.
+
+        The producer only writes `head` and the consumer only writes `tail`, both count bytes since
+        the ring was created, so full and empty never look alike. A frame is a u32 length and the
+        payload padded to 8 bytes, one that doesn't fit before the end leaves a wrap marker there.
+        Frames are visible once `head` moves past them, which relies on x86 making one process'
+        stores visible to the other in program order. Nothing here fences them, so other CPUs
+        are refused.
+
+        A consumer about to sleep raises `waiting` and re-checks, the producer rings the bell pipe
+        once per sleep, so a busy ring costs no syscalls and an idle one no polling. `wait()` also
+        wakes on `timeout`, a backstop for a bell lost between the check and the flag.
+
+        The object pickles into a Process' arguments, the child attaches to the same block.
+    """
+    def __init__(self, size: int = 1 << 22, name: str | None = None, bell=None):
+        if not ORDERED_STORES:
+            raise RuntimeError(f"SharedRing needs an x86 CPU, {platform.machine()} may reorder its stores; run with WORKERS=0")
+        self.size = size
+        self.created = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.created, size=HEADER_SIZE + size)
+        self.buf = self.shm.buf
+        if self.created:
+            self.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        self.bell = bell or Pipe(duplex=False) # (reader, writer)
+        self._head = _U64.unpack_from(self.buf, HEAD_OFFSET)[0]
+        self._tail = _U64.unpack_from(self.buf, TAIL_OFFSET)[0]
+        self._rung = 0       # last sleep of the consumer the producer rang for
+        self._generation = 0 # consumer's sleep counter
+        self._ready = None
+        self._watching = False
+        self._flush = None
+        self.backlog = OrderedDict() # key -> frame that didn't fit, sent in order by flush()
+        self.closed = False # the other side's bell end went away
+        self.stats = {"frames": 0, "bytes": 0, "backlogged": 0, "coalesced": 0, "bells": 0, "wakeups": 0, "timeouts": 0}
+
+    def __reduce__(self):
+        return (SharedRing, (self.size, self.shm.name, self.bell))
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def depth(self) -> int:
+        """
+            Bytes written and not consumed yet.
+        """
+        return _U64.unpack_from(self.buf, HEAD_OFFSET)[0] - _U64.unpack_from(self.buf, TAIL_OFFSET)[0]
+
+    def own(self, producer: bool):
+        """
+            Close the bell end this process doesn't use, so the other side sees EOF once this one exits.
+        """
+        self.bell[0 if producer else 1].close()
+
+    # producer
+
+    def put(self, payload: bytes) -> bool:
+        """
+            Append one frame, False if the consumer is too far behind for it to fit.
+        """
+        n = len(payload)
+        need = frame_size(n)
+        if need > self.size // 2:
+            raise ValueError(f"frame of {n} bytes doesn't fit a {self.size} byte ring")
+        head = self._head
+        tail = _U64.unpack_from(self.buf, TAIL_OFFSET)[0]
+        pos = head % self.size
+        skip = self.size - pos if pos + need > self.size else 0
+        if head + skip + need - tail > self.size:
+            return False
+        if skip:
+            _LENGTH.pack_into(self.buf, HEADER_SIZE + pos, WRAP)
+            head += skip
+            pos = 0
+        start = HEADER_SIZE + pos + _LENGTH.size
+        self.buf[start:start + n] = payload
+        _LENGTH.pack_into(self.buf, HEADER_SIZE + pos, n)
+        head += need
+        _U64.pack_into(self.buf, HEAD_OFFSET, head)
+        self._head = head
+        self.stats["frames"] += 1
+        self.stats["bytes"] += n
+
+        waiting = _U64.unpack_from(self.buf, WAITING_OFFSET)[0]
+        if waiting and waiting != self._rung:
+            self._rung = waiting
+            self.stats["bells"] += 1
+            try:
+                self.bell[1].send_bytes(b"")
+            except OSError:
+                self.closed = True
+        return True
+
+    def send(self, payload: bytes, key=None):
+        """
+            put() that never fails: frames that don't fit wait in a local backlog, in order, and go
+            out with flush(). A backlogged frame with the same `key` is replaced instead of queued.
+        """
+        if not self.backlog and self.put(payload):
+            return
+        key = object() if key is None else key
+        if key in self.backlog:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["backlogged"] += 1
+        self.backlog[key] = payload
+        self.flush()
+
+    def flush(self):
+        while self.backlog:
+            key, payload = next(iter(self.backlog.items()))
+            if not self.put(payload):
+                if self._flush is None:
+                    self._flush = asyncio.get_running_loop().call_later(0.001, self._retry)
+                return
+            del self.backlog[key]
+
+    def _retry(self):
+        self._flush = None
+        self.flush()
+
+    # consumer
+
+    def get(self) -> list:
+        """
+            Every frame written since the last call, copied out of the ring.
+        """
+        head = _U64.unpack_from(self.buf, HEAD_OFFSET)[0]
+        tail = self._tail
+        if tail == head:
+            return []
+        frames = []
+        while tail < head:
+            pos = tail % self.size
+            n = _LENGTH.unpack_from(self.buf, HEADER_SIZE + pos)[0]
+            if n == WRAP:
+                tail += self.size - pos
+                continue
+            start = HEADER_SIZE + pos + _LENGTH.size
+            frames.append(bytes(self.buf[start:start + n]))
+            tail += frame_size(n)
+        _U64.pack_into(self.buf, TAIL_OFFSET, tail)
+        self._tail = tail
+        return frames
+
+    def _on_bell(self):
+        reader = self.bell[0]
+        try:
+            while reader.poll():
+                reader.recv_bytes()
+        except (EOFError, OSError):
+            self.closed = True
+            asyncio.get_running_loop().remove_reader(reader.fileno())
+            self._watching = False
+        self._ready.set()
+
+    async def wait(self, timeout: float = 0.01):
+        """
+            Sleep until the producer rings or `timeout` passes, returns at once if frames are pending.
+        """
+        if self.closed:
+            return
+        if not self._watching:
+            self._ready = asyncio.Event()
+            asyncio.get_running_loop().add_reader(self.bell[0].fileno(), self._on_bell)
+            self._watching = True
+        self._generation += 1
+        self._ready.clear()
+        _U64.pack_into(self.buf, WAITING_OFFSET, self._generation)
+        try:
+            if _U64.unpack_from(self.buf, HEAD_OFFSET)[0] != self._tail:
+                return
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            self.stats["wakeups"] += 1
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+        finally:
+            _U64.pack_into(self.buf, WAITING_OFFSET, 0)
+
+    def summary(self) -> str:
+        s = self.stats
+        if not s["frames"]: # consumer side
+            return f"{s['wakeups']} wakeups, {s['timeouts']} idle timeouts"
+        return f"{s['frames']} frames ({s['bytes'] / 1e6:.1f} MB), {s['backlogged']} backlogged, {s['coalesced']} coalesced, {s['bells']} bells"
+
+    def close(self):
+        if self._watching:
+            try:
+                asyncio.get_running_loop().remove_reader(self.bell[0].fileno())
+            except RuntimeError:
+                pass
+            self._watching = False
+        if self._flush is not None:
+            self._flush.cancel()
+        for end in self.bell:
+            end.close()
+        self.buf = None
+        self.shm.close()
+        if self.created:
+            self.shm.unlink()
+
+__all__ = ["SharedRing"]
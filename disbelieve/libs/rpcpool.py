@@ -0,0 +1,141 @@
+import time
+import asyncio
+import functools
+from collections import deque
+from solana.rpc.async_api import AsyncClient
+
+class EndpointHealth:
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.ewma = None
+        self.samples = deque(maxlen=128)
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.unhealthy_until = 0.0
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self.ewma = seconds if self.ewma is None else self.ewma + self.alpha * (seconds - self.ewma)
+
+    def percentile(self, q: float) -> float | None:
+        if len(self.samples) < 8:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+class ReadPool:
+    """
+        Drop-in AsyncClient for reads spread over several RPC endpoints.
+
+        Every `get_*` call goes to the healthy endpoint with the lowest moving latency, if it hasn't
+        answered within its own `hedge_percentile` latency a duplicate goes to the runner-up and
+        whichever answers first wins. The loser is cancelled, its elapsed time still counts as a sample.
+    """
+    def __init__(self, endpoints: list, hedge_percentile: float = 0.9, default_hedge_delay: float = 0.25,
+                 min_hedge_delay: float = 0.005, client_factory=AsyncClient):
+        self.endpoints = list(dict.fromkeys(endpoints))
+        self.clients = {url: client_factory(url) for url in self.endpoints}
+        self.health = {url: EndpointHealth() for url in self.endpoints}
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.stats = {"calls": 0, "hedged": 0, "hedge_wins": 0}
+        self.methods = {} # RPC method -> calls
+        self.last_used = {url: 0.0 for url in self.endpoints} # monotonic() of the last request
+
+    def ranked(self) -> list:
+        def key(url):
+            h = self.health[url]
+            return (not h.healthy(), h.ewma if h.ewma is not None else 0.0)
+        return sorted(self.endpoints, key=key)
+
+    def hedge_delay(self, url: str) -> float:
+        p = self.health[url].percentile(self.hedge_percentile)
+        return self.default_hedge_delay if p is None else max(self.min_hedge_delay, p)
+
+    async def _timed(self, url: str, name: str, args, kwargs):
+        health = self.health[url]
+        self.last_used[url] = time.monotonic()
+        started = time.perf_counter()
+        try:
+            result = await getattr(self.clients[url], name)(*args, **kwargs)
+        except asyncio.CancelledError:
+            health.observe(time.perf_counter() - started) # lower bound, slower than the winner
+            raise
+        except Exception:
+            health.errors += 1
+            health.consecutive_errors += 1
+            if health.consecutive_errors >= 3:
+                health.unhealthy_until = time.monotonic() + 10
+            raise
+        health.observe(time.perf_counter() - started)
+        health.consecutive_errors = 0
+        return result
+
+    async def call(self, name: str, *args, **kwargs):
+        self.stats["calls"] += 1
+        self.methods[name] = self.methods.get(name, 0) + 1
+        urls = self.ranked()
+        first = asyncio.ensure_future(self._timed(urls[0], name, args, kwargs))
+        if len(urls) == 1:
+            return await first
+
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_delay(urls[0]))
+        if done and first.exception() is None:
+            return first.result()
+
+        self.stats["hedged"] += 1
+        second = asyncio.ensure_future(self._timed(urls[1], name, args, kwargs))
+        pending, error = {first, second} - done, first.exception() if done else None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def __getattr__(self, name: str):
+        if name.startswith("get_"):
+            return functools.partial(self.call, name)
+        raise AttributeError(name)
+
+    async def warm(self, urls: list | None = None) -> int:
+        """
+            One getSlot to every endpoint, opening its connection and seeding its latency before
+            the first real read. Returns how many answered.
+        """
+        results = await asyncio.gather(*(self._timed(url, "get_slot", (), {}) for url in urls or self.endpoints), return_exceptions=True)
+        return sum(1 for result in results if not isinstance(result, BaseException))
+
+    async def keep_warm(self, interval: float = 4.0):
+        """
+            Touch endpoints idle for `interval` seconds, the clients drop pooled connections idle for 5 s.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            idle = [url for url in self.endpoints if time.monotonic() - self.last_used[url] >= interval]
+            if idle:
+                await self.warm(idle)
+
+    def summary(self) -> str:
+        per_endpoint = ", ".join(
+            f"{url.split('?')[0]}: ewma {(h.ewma or 0) * 1000:.1f}ms, {h.errors} errors"
+            for url, h in self.health.items()
+        )
+        return f"{self.stats['calls']} reads, {self.stats['hedged']} hedged ({self.stats['hedge_wins']} won) | {per_endpoint}"
+
+    async def close(self):
+        for client in self.clients.values():
+            await client.close()
+
+__all__ = ["ReadPool"]
@@ -0,0 +1,281 @@
+import time
+import pickle
+import struct
+import asyncio
+import logging
+import multiprocessing
+
+try: from .hooks import SolHook
+except: from hooks import SolHook
+try: from .ring import SharedRing
+except: from ring import SharedRing
+try: from .colors import cc
+except: from colors import cc
+try: from .meteoraDBC.state import VirtualPool
+except: from meteoraDBC.state import VirtualPool
+
+# ring frames are a kind byte and a packed tick or a pickled message
+TICK, MESSAGE = b"\x01", b"\x02"
+# mint id, slot, wall time, price, sqrt price as two u64 halves, followed by the raw pool account
+TICK_FRAME = struct.Struct("<IQddQQ")
+U64_MASK = (1 << 64) - 1
+RING_SIZE = 1 << 22 # bytes per direction per worker, a few thousand pool ticks
+REPORT_INTERVAL = 5.0 # seconds between the metrics a worker sends back
+
+class Shard:
+    __slots__ = ("index", "process", "inbox", "outbox", "mints", "ready", "alive", "collected")
+
+    def __init__(self, index: int, process, inbox: SharedRing, outbox: SharedRing):
+        self.index = index
+        self.process = process
+        self.inbox = inbox   # ingestion -> worker: launches and ticks
+        self.outbox = outbox # worker -> ingestion: dropped mints and trace marks
+        self.mints = set()
+        self.ready = asyncio.Event()
+        self.alive = True
+        self.collected = [] # latest metrics the worker reported
+
+class ShardRouter:
+    """
+        Ingestion side of the sharded runtime.
+
+        Spawns `workers` trading processes running `target(index, inbox, outbox)`, hands every
+        onboarded mint to the worker owning the fewest and streams its decoded pool ticks there
+        through the worker's ring. Ticks of a mint still waiting for ring space are coalesced.
+        Messages coming back are passed to `on_message(shard, message)`, except the workers'
+        metric reports, served by collect() with a shard label.
+    """
+    def __init__(self, workers: int, target, on_message, ring_size: int = RING_SIZE):
+        self.workers = workers
+        self.target = target
+        self.on_message = on_message
+        self.ring_size = ring_size
+        self.shards = []
+        self.owners = {} # mint -> Shard
+        self.ids = {}    # mint -> id its ticks carry
+        self.next_id = 0
+        self.stopping = False
+        self.stats = {"launches": 0, "ticks": 0, "unrouted": 0}
+        self._tasks = []
+
+    async def start(self, timeout: float = 120.0):
+        """
+            Spawn the workers and wait until every one loaded its wallet and configs.
+        """
+        started = time.perf_counter()
+        context = multiprocessing.get_context("spawn") # fresh interpreters, not forks of a running loop
+        for index in range(self.workers):
+            inbox, outbox = SharedRing(self.ring_size), SharedRing(self.ring_size)
+            process = context.Process(target=self.target, args=(index, inbox, outbox), name=f"disbelieve-shard-{index}", daemon=True)
+            process.start()
+            inbox.own(producer=True)
+            outbox.own(producer=False)
+            shard = Shard(index, process, inbox, outbox)
+            self.shards.append(shard)
+            self._tasks.append(asyncio.create_task(self._listen(shard)))
+        await asyncio.wait_for(asyncio.gather(*(shard.ready.wait() for shard in self.shards)), timeout)
+        logging.info(f"{cc.LIGHT_GRAY}{self.workers} trading workers ready in {time.perf_counter() - started:.2f}s ✔{cc.RESET}")
+
+    async def _listen(self, shard: Shard):
+        while True:
+            for frame in shard.outbox.get():
+                message = pickle.loads(frame[1:])
+                if message[0] == "ready":
+                    shard.ready.set()
+                elif message[0] == "collect":
+                    shard.collected = message[1]
+                else:
+                    self.on_message(shard, message)
+            if shard.outbox.closed:
+                break
+            await shard.outbox.wait(0.1)
+
+        shard.alive = False
+        if not self.stopping:
+            logging.error(f"{cc.RED}Worker #{shard.index} exited ({shard.process.exitcode}), dropping its {len(shard.mints)} mints{cc.RESET}")
+            for mint in list(shard.mints):
+                self.on_message(shard, ("drop", mint))
+
+    def send(self, shard: Shard, message: tuple):
+        shard.inbox.send(MESSAGE + pickle.dumps(message))
+
+    def onboard(self, mint: str, info: dict) -> int | None:
+        """
+            Give `mint` to the least loaded worker, `info` reaches it ahead of the mint's first tick.
+            Returns the worker's index, None if no worker is left.
+        """
+        live = [shard for shard in self.shards if shard.alive]
+        if not live:
+            return None
+        shard = min(live, key=lambda s: len(s.mints))
+        mint_id = self.next_id
+        self.next_id += 1
+        self.owners[mint], self.ids[mint] = shard, mint_id
+        shard.mints.add(mint)
+        self.send(shard, ("onboard", mint_id, mint, info))
+        self.stats["launches"] += 1
+        return shard.index
+
+    def tick(self, mint: str, slot: int, ts: float, price: float, sqrt_q64: int, data: bytes):
+        shard = self.owners.get(mint)
+        if shard is None:
+            self.stats["unrouted"] += 1
+            return
+        mint_id = self.ids[mint]
+        shard.inbox.send(TICK + TICK_FRAME.pack(mint_id, slot, ts, price, sqrt_q64 & U64_MASK, sqrt_q64 >> 64) + data, key=mint_id)
+        self.stats["ticks"] += 1
+
+    def release(self, mint: str):
+        shard = self.owners.pop(mint, None)
+        self.ids.pop(mint, None)
+        if shard is not None:
+            shard.mints.discard(mint)
+
+    async def stop(self, timeout: float = 10.0):
+        self.stopping = True
+        for shard in self.shards:
+            if shard.alive:
+                self.send(shard, ("stop",))
+        for shard in self.shards:
+            await asyncio.to_thread(shard.process.join, timeout)
+            if shard.process.is_alive():
+                shard.process.terminate()
+        for task in self._tasks:
+            task.cancel()
+        for shard in self.shards:
+            shard.inbox.close()
+            shard.outbox.close()
+
+    def collect(self) -> list:
+        families = {}
+        for shard in self.shards:
+            for name, kind, help, samples in shard.collected:
+                family = families.setdefault(name, (name, kind, help, []))
+                family[3].extend(({**labels, "shard": shard.index}, value) for labels, value in samples)
+        return [
+            ("disbelieve_shard_mints", "gauge", "Mints owned by each trading worker", [({"shard": s.index}, len(s.mints)) for s in self.shards]),
+            ("disbelieve_shard_frames_total", "counter", "Frames written to each worker's ring", [({"shard": s.index}, s.inbox.stats["frames"]) for s in self.shards]),
+            ("disbelieve_shard_backlogged_total", "counter", "Frames that waited for ring space", [({"shard": s.index}, s.inbox.stats["backlogged"]) for s in self.shards]),
+        ] + list(families.values())
+
+    def summary(self) -> str:
+        s = self.stats
+        shards = "; ".join(f"#{shard.index} {len(shard.mints)} mints, {shard.inbox.summary()}" for shard in self.shards)
+        return f"{self.workers} workers, {s['launches']} launches and {s['ticks']} ticks routed, {s['unrouted']} unrouted | {shards}"
+
+class IngestHook(SolHook):
+    """
+        SolHook of the ingestion process when trading runs in workers.
+
+        It keeps the log and pool streams, launch detection and the onboarding read, the decoded
+        ticks and launches go to the owning worker, which sends, confirms and tracks balances itself.
+    """
+    trades = False
+
+    def __init__(self, parent, privkey, workers: int, target):
+        super().__init__(parent, privkey)
+        self.shards = ShardRouter(workers, target, self.on_shard_message)
+        self.metrics.collect(self.shards.collect)
+
+    async def prepare_mint(self, mint: str, info: dict) -> int:
+        dec_base = info["decimals"] if info["decimals"] is not None else await self.get_decimals(mint)
+        pool_addr, state = info["pool"]
+        self.shards.onboard(mint, {"pool": (pool_addr, state.to_bytes()), "decimals": dec_base, "atas": info["atas"]})
+        return dec_base
+
+    def publish_price(self, mint: str, data: bytes, update: dict, slot: int):
+        self.shards.tick(mint, slot, update["ts"], update["price"], update["sqrt"], data)
+
+    def on_shard_message(self, shard: Shard, message: tuple):
+        if message[0] == "mark":
+            self.metrics.mark(*message[1:])
+        elif message[0] == "drop":
+            mint = message[1]
+            self.shards.release(mint)
+            self.parent.sold.add(mint)
+            asyncio.create_task(self.unsubscribe_state(mint))
+
+    async def close(self):
+        await self.shards.stop()
+        logging.info(f"{cc.LIGHT_GRAY}Shards: {self.shards.summary()}{cc.RESET}")
+        await super().close()
+
+class ShardHook(SolHook):
+    """
+        SolHook of a trading worker, launches and pool ticks arrive on `inbox` from the ingestion
+        process, mints the strategy is done with and trace marks go back on `outbox`.
+    """
+    ingests = False
+
+    def __init__(self, parent, privkey, index: int, inbox: SharedRing, outbox: SharedRing):
+        super().__init__(parent, privkey)
+        self.index = index
+        self.inbox, self.outbox = inbox, outbox
+        inbox.own(producer=False)
+        outbox.own(producer=True)
+        self.mints = {} # tick id -> mint
+        self.ids = {}   # mint -> tick id
+        self.meteora_dbc.swap.trace = self.trace
+
+    def send(self, message: tuple):
+        self.outbox.send(MESSAGE + pickle.dumps(message))
+
+    def trace(self, mint: str, stage: str):
+        self.send(("mark", mint, stage, time.perf_counter())) # perf_counter() is system wide, the ingestion side times it
+
+    async def report(self, collect, interval: float = REPORT_INTERVAL):
+        """
+            Send `collect()` to the ingestion process every `interval` seconds, its metrics serve it.
+        """
+        while True:
+            self.send(("collect", collect()))
+            await asyncio.sleep(interval)
+
+    async def consume(self):
+        """
+            Feed the strategy from the inbox until the ingestion process stops the worker or exits.
+        """
+        self.send(("ready",))
+        while True:
+            for frame in self.inbox.get():
+                if frame[:1] == TICK:
+                    mint_id, slot, ts, price, lo, hi = TICK_FRAME.unpack_from(frame, 1)
+                    mint = self.mints.get(mint_id)
+                    if mint is not None:
+                        data = memoryview(frame)[1 + TICK_FRAME.size:]
+                        self.publish_price(mint, data, {"mint": mint, "price": price, "sqrt": lo | (hi << 64), "ts": ts}, slot)
+                    continue
+                message = pickle.loads(frame[1:])
+                if message[0] == "stop":
+                    return
+                if message[0] == "onboard":
+                    await self.adopt(*message[1:])
+            if self.inbox.closed:
+                return
+            await self.inbox.wait()
+
+    async def adopt(self, mint_id: int, mint: str, info: dict):
+        pool_addr, data = info["pool"]
+        state = VirtualPool(data)
+        state["_pubkey"] = pool_addr
+        self.meteora_dbc.pools.remember(mint, pool_addr, state["config"])
+        self.meteora_dbc.states[mint] = state
+        self.mints[mint_id], self.ids[mint] = mint, mint_id
+        self.parent.mints.track(mint)
+        await self.prepare_mint(mint, {**info, "pool": (pool_addr, state)})
+        asyncio.create_task(self.meteora_dbc.warm_configs(state["config"]))
+        self.parent.mint_queue.put_nowait(mint)
+
+    async def unsubscribe_state(self, mint):
+        mint = str(mint)
+        self.mints.pop(self.ids.pop(mint, None), None)
+        self.send(("drop", mint))
+        await super().unsubscribe_state(mint)
+
+    async def close(self):
+        await super().close()
+        logging.info(f"{cc.LIGHT_GRAY}Worker #{self.index} inbox: {self.inbox.summary()}{cc.RESET}")
+        self.inbox.close()
+        self.outbox.close()
+
+__all__ = ["ShardRouter", "IngestHook", "ShardHook", "RING_SIZE", "REPORT_INTERVAL"]
@@ -0,0 +1,244 @@
+import re
+import json
+import asyncio
+import logging
+import traceback
+import itertools
+import websockets
+
+try: from .config import WS_RPC_URL, WS_POOL_SIZE
+except: from config import WS_RPC_URL, WS_POOL_SIZE
+try: from .colors import cc
+except: from colors import cc
+try: from .common import fast_loads
+except: from common import fast_loads
+
+UNSUBSCRIBE_METHODS = {
+    "logsSubscribe": "logsUnsubscribe",
+    "accountSubscribe": "accountUnsubscribe",
+    "signatureSubscribe": "signatureUnsubscribe",
+    "slotSubscribe": "slotUnsubscribe",
+}
+
+# subscriptions the server ends by itself after the first notification
+ONE_SHOT_METHODS = {"signatureSubscribe"}
+
+# notifications end with `"subscription":<id>}}`, found without decoding the frame
+SUBSCRIPTION_ID = re.compile(r'"subscription"\s*:\s*(\d+)')
+
+class Subscription:
+    """
+        One logical subscription, it survives reconnects of the socket that carries it.
+        `sub_id` is the server-side id of the current connection, None while (re)subscribing.
+        Raw subscriptions get the undecoded frame so they can filter before paying for JSON.
+        `active` is also set when the server refuses the subscription, `error` then holds why.
+    """
+    def __init__(self, key, method: str, params: list, callback, raw: bool = False):
+        self.key = key
+        self.method = method
+        self.params = params
+        self.callback = callback
+        self.raw = raw
+        self.conn = None
+        self.sub_id = None
+        self.active = asyncio.Event()
+        self.error = None
+        self.removed = False # unsubscribed, possibly while its subscribe was in flight
+
+class WsConnection:
+    """
+        A single pooled websocket, routes notifications to subscriptions by subscription id.
+    """
+    def __init__(self, manager, index: int):
+        self.manager = manager
+        self.index = index
+        self.ws = None
+        self.subs = set()
+        self.routes = {}  # subscription id -> Subscription
+        self.pending = {} # request id -> (future, Subscription | None)
+
+    async def run(self):
+        while not self.manager.stop_event.is_set():
+            try:
+                async with websockets.connect(
+                    self.manager.url,
+                    ping_interval=2,
+                    ping_timeout=15,
+                    max_size=None,
+                ) as ws:
+                    self.ws = ws
+                    reader = asyncio.create_task(self._read(ws))
+                    for sub in list(self.subs):
+                        await self._send_subscribe(sub)
+                    await reader
+
+            except (websockets.exceptions.ConnectionClosedError, asyncio.TimeoutError):
+                logging.error(f"{cc.RED}Connection #{self.index} closed, reconnecting {len(self.subs)} subscriptions.{cc.RESET}")
+            except Exception as e:
+                logging.error(f"{cc.RED}Error on connection #{self.index}, {e}{cc.RESET}")
+                traceback.print_exc()
+            finally:
+                self._reset()
+                if not self.manager.stop_event.is_set():
+                    await asyncio.sleep(3) # quick back-off reconnect
+
+    def _reset(self):
+        self.ws = None
+        self.routes.clear()
+        for fut, _ in self.pending.values():
+            if not fut.done():
+                fut.cancel()
+        self.pending.clear()
+        for sub in self.subs:
+            sub.sub_id = None
+            sub.active.clear()
+
+    async def _read(self, ws):
+        async for raw in ws:
+            if self.manager.stop_event.is_set():
+                break
+            match = SUBSCRIPTION_ID.search(raw, max(0, len(raw) - 64))
+            if match:
+                sub = self.routes.get(int(match.group(1)))
+                if sub is not None and sub.raw:
+                    self._notify(sub, raw)
+                    continue
+            self.dispatch(fast_loads(raw), raw)
+
+    def _notify(self, sub: Subscription, payload):
+        try:
+            sub.callback(payload)
+        except Exception as e:
+            logging.error(f"{cc.RED}Error in {sub.method} handler for {sub.key}, {e}{cc.RESET}")
+            traceback.print_exc()
+
+    def dispatch(self, message: dict, raw=None):
+        rid = message.get("id")
+        if rid is not None:
+            fut, sub = self.pending.pop(rid, (None, None))
+            if sub is not None:
+                if sub.removed:
+                    if "result" in message: # dropped before the server answered
+                        asyncio.create_task(self._unsubscribe(sub.method, message["result"]))
+                elif "result" in message:
+                    sub.sub_id = message["result"]
+                    self.routes[sub.sub_id] = sub
+                    sub.active.set()
+                else:
+                    logging.error(f"{cc.RED}{sub.method} failed for {sub.key}: {message.get('error')}{cc.RESET}")
+                    self.subs.discard(sub)
+                    sub.error = message.get("error") or "no result"
+                    sub.active.set() # waiters check `error`
+            if fut is not None and not fut.done():
+                fut.set_result(message)
+            return
+
+        params = message.get("params")
+        if not params:
+            return
+        sub = self.routes.get(params.get("subscription"))
+        if sub is None:
+            return
+        if sub.method in ONE_SHOT_METHODS:
+            self.routes.pop(sub.sub_id, None)
+            self.subs.discard(sub)
+            sub.sub_id = None
+        self._notify(sub, raw if sub.raw and raw is not None else message)
+
+    async def request(self, method: str, params: list, sub: Subscription | None = None):
+        rid = next(self.manager.ids)
+        fut = asyncio.get_running_loop().create_future()
+        self.pending[rid] = (fut, sub)
+        await self.ws.send(json.dumps({"jsonrpc": "2.0", "id": rid, "method": method, "params": params}))
+        return fut
+
+    async def _send_subscribe(self, sub: Subscription):
+        await self.request(sub.method, sub.params, sub)
+
+    async def add(self, sub: Subscription):
+        sub.conn = self
+        self.subs.add(sub)
+        if self.ws is not None:
+            try:
+                await self._send_subscribe(sub)
+            except websockets.exceptions.ConnectionClosed:
+                pass # re-sent once the connection is back
+
+    async def remove(self, sub: Subscription):
+        self.subs.discard(sub)
+        sub.removed = True
+        sub_id, sub.sub_id = sub.sub_id, None
+        sub.active.clear()
+        if sub_id is None:
+            return # a subscribe still in flight is undone by dispatch() when it's answered
+        self.routes.pop(sub_id, None)
+        await self._unsubscribe(sub.method, sub_id)
+
+    async def _unsubscribe(self, method: str, sub_id: int):
+        unsubscribe = UNSUBSCRIBE_METHODS.get(method)
+        if unsubscribe and self.ws is not None:
+            try:
+                await self.request(unsubscribe, [sub_id])
+            except websockets.exceptions.ConnectionClosed:
+                pass
+
+class SubscriptionManager:
+    """
+        Carries every websocket subscription over a small, fixed pool of connections.
+
+        Subscriptions are spread over the least loaded connection and re-sent on reconnect,
+        callbacks are plain functions invoked with the decoded notification.
+    """
+    def __init__(self, stop_event: asyncio.Event, url: str = WS_RPC_URL, size: int = WS_POOL_SIZE):
+        self.url = url
+        self.stop_event = stop_event
+        self.ids = itertools.count(1)
+        self.connections = [WsConnection(self, i) for i in range(max(1, size))]
+        self.accounts = {} # mint -> account Subscription
+        self._tasks = []
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(conn.run()) for conn in self.connections]
+
+    async def _add(self, sub: Subscription):
+        self.start()
+        conn = min(self.connections, key=lambda c: len(c.subs))
+        await conn.add(sub)
+        return sub
+
+    async def subscribe(self, method: str, params: list, callback, key=None, raw: bool = False) -> Subscription:
+        return await self._add(Subscription(key, method, params, callback, raw=raw))
+
+    async def unsubscribe(self, sub: Subscription):
+        if sub.conn is not None:
+            await sub.conn.remove(sub)
+
+    def is_subscribed(self, mint: str) -> bool:
+        return mint in self.accounts
+
+    async def subscribe_account(self, mint: str, account: str, callback, commitment: str = "processed"):
+        """
+            Subscribe to an account on behalf of a mint, returns None if the mint is already tracked.
+        """
+        if mint in self.accounts:
+            return None
+        sub = Subscription(mint, "accountSubscribe", [account, {"encoding": "base64", "commitment": commitment}], callback)
+        self.accounts[mint] = sub
+        return await self._add(sub)
+
+    async def unsubscribe_account(self, mint: str):
+        sub = self.accounts.pop(mint, None)
+        if sub is not None:
+            await self.unsubscribe(sub)
+
+    async def close(self):
+        self.stop_event.set()
+        for conn in self.connections:
+            if conn.ws is not None:
+                await conn.ws.close()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+__all__ = ["SubscriptionManager", "Subscription"]
@@ -0,0 +1,192 @@
+import os
+import json
+import queue
+import struct
+import logging
+import threading
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError: # reads need numpy, recording works without it
+    np = None
+
+# one fixed-width 64 byte record per pool update, the sqrt price is split in two u64 halves to stay exact
+TICK = struct.Struct("<dQQQQQdI4x")
+TICK_FIELDS = [
+    ("ts", "<f8"),
+    ("slot", "<u8"),
+    ("sqrt_lo", "<u8"),
+    ("sqrt_hi", "<u8"),
+    ("base_reserve", "<u8"),
+    ("quote_reserve", "<u8"),
+    ("price", "<f8"),
+    ("mint", "<u4"),
+    ("_pad", "V4"),
+]
+TICK_DTYPE = np.dtype(TICK_FIELDS) if np is not None else None
+U64_MASK = (1 << 64) - 1
+MAX_OPEN_FILES = 64 # tick files the writer keeps open, the least recently written is closed first
+CLOSE = b"" # queued in place of a record, the writer closes the mint's file
+
+class TickStore:
+    """
+        Append-only per-mint price history in fixed-width records, one file per mint under `path`.
+
+        `append()` only packs the record and queues it, a writer thread does the file IO and keeps
+        at most `max_open` files open. A mint's ticks are contiguous in its own file, so `ticks(mint)`
+        is an index lookup plus a read-only memory map, time ranges are a binary search on `ts` and
+        every column is a view, not a copy. `forget(mint)` closes the file of a mint we're done with.
+    """
+    def __init__(self, path: str, flush_every: int = 64, max_open: int = MAX_OPEN_FILES):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.index_path = os.path.join(path, "index.json")
+        self.mints = {} # mint -> index, also the file name and the `mint` column, mirrors index.json so it covers every stored mint
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.mints = json.load(f)["mints"]
+        self.flush_every = flush_every
+        self.max_open = max_open
+        self.written = 0
+        self.dropped = 0
+        self._maps = {} # index -> (record count, memmap)
+        self._first = {} # mint in play -> its oldest record, so first() reads the file only for mints of an earlier run
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name="tick-writer", daemon=True)
+        self._writer.start()
+
+    def _file(self, index: int) -> str:
+        return os.path.join(self.path, f"{index}.ticks")
+
+    def index_of(self, mint: str, create: bool = False) -> int | None:
+        index = self.mints.get(mint)
+        if index is None and create:
+            with self._lock:
+                index = self.mints.setdefault(mint, len(self.mints))
+            self._queue.put((index, None)) # the writer persists the index
+        return index
+
+    def _save_index(self):
+        with self._lock:
+            mints = dict(self.mints)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"record_size": TICK.size, "mints": mints}, f)
+        os.replace(tmp, self.index_path)
+
+    def append(self, mint: str, ts: float, slot: int, sqrt_price: int, base_reserve: int, quote_reserve: int, price: float):
+        index = self.mints.get(mint)
+        new = index is None
+        if new:
+            index = self.index_of(mint, create=True)
+        record = TICK.pack(ts, slot, sqrt_price & U64_MASK, sqrt_price >> 64, base_reserve, quote_reserve, price, index)
+        if new:
+            self._first[mint] = record
+        self._queue.put((index, record))
+
+    def forget(self, mint: str):
+        """
+            Done with `mint`: drop its first tick and close its file, the stored ticks stay readable.
+        """
+        self._first.pop(mint, None)
+        index = self.mints.get(mint)
+        if index is not None:
+            self._queue.put((index, CLOSE))
+
+    def _write_loop(self):
+        files = OrderedDict() # index -> open file, least recently written first
+        dirty, pending = set(), 0 # written since the last flush
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            index, record = item
+            try:
+                if record is None:
+                    self._save_index()
+                    continue
+                if record == CLOSE:
+                    f = files.pop(index, None)
+                    if f is not None:
+                        f.close()
+                        dirty.discard(index)
+                    continue
+                f = files.pop(index, None)
+                if f is None:
+                    if len(files) >= self.max_open:
+                        old, f = files.popitem(last=False)
+                        f.close()
+                        dirty.discard(old)
+                    f = open(self._file(index), "ab")
+                files[index] = f
+                f.write(record)
+                self.written += 1
+                dirty.add(index)
+                pending += 1
+                if pending >= self.flush_every or self._queue.empty():
+                    for i in dirty:
+                        files[i].flush()
+                    dirty.clear()
+                    pending = 0
+            except Exception as e:
+                self.dropped += 1
+                logging.error(f"Error writing tick of mint #{index}, {e}")
+        for f in files.values():
+            f.close()
+
+    def count(self, mint: str) -> int:
+        index = self.mints.get(mint)
+        if index is None or not os.path.exists(self._file(index)):
+            return 0
+        return os.path.getsize(self._file(index)) // TICK.size # a torn last record isn't counted
+
+    def ticks(self, mint: str, start: float | None = None, end: float | None = None):
+        """
+            Structured array of the mint's ticks with `start <= ts < end`, memory mapped and read-only.
+        """
+        if np is None:
+            raise RuntimeError("numpy is required to read ticks, install it with pip")
+        index, n = self.mints.get(mint), self.count(mint)
+        if index is None or n == 0:
+            return np.empty(0, dtype=TICK_DTYPE)
+        cached = self._maps.get(index)
+        if cached is None or cached[0] != n:
+            cached = self._maps[index] = (n, np.memmap(self._file(index), dtype=TICK_DTYPE, mode="r", shape=(n,)))
+        view = cached[1]
+        lo = 0 if start is None else int(np.searchsorted(view["ts"], start, side="left"))
+        hi = n if end is None else int(np.searchsorted(view["ts"], end, side="left"))
+        return view[lo:hi]
+
+    def first(self, mint: str) -> dict | None:
+        """
+            Oldest stored tick of a mint, read without numpy, e.g. to restore its open price after a restart.
+            Kept in memory once known, the file is only read for mints first seen by an earlier run.
+        """
+        record = self._first.get(mint)
+        if record is None:
+            index = self.mints.get(mint)
+            if index is None or self.count(mint) == 0:
+                return None
+            with open(self._file(index), "rb") as f:
+                record = self._first[mint] = f.read(TICK.size)
+        ts, slot, lo, hi, base_reserve, quote_reserve, price, _ = TICK.unpack(record)
+        return {"ts": ts, "slot": slot, "sqrt": lo | (hi << 64), "base_reserve": base_reserve, "quote_reserve": quote_reserve, "price": price}
+
+    def summary(self) -> str:
+        return f"{self.path}: {len(self.mints)} mints, {self.written} ticks written, {self.dropped} dropped"
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._maps.clear()
+
+def sqrt_prices(ticks):
+    """
+        Float sqrt prices of a tick array, vectorized from the two u64 halves.
+    """
+    return ticks["sqrt_hi"].astype(np.float64) + ticks["sqrt_lo"].astype(np.float64) / 2.0**64
+
+__all__ = ["TickStore", "TICK_DTYPE", "sqrt_prices"]
@@ -0,0 +1,68 @@
+import time
+import heapq
+import asyncio
+import itertools
+
+class TimerHeap:
+    """
+        A single heap of deadlines shared by every position.
+
+        Timers are keyed, scheduling a key again replaces its deadline and cancelled or
+        replaced entries are skipped lazily when they reach the top of the heap.
+    """
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._heap = []   # (deadline, seq, key)
+        self._timers = {} # key -> (deadline, seq, callback, args)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self._timers)
+
+    def schedule(self, key, deadline: float, callback, *args):
+        seq = next(self._seq)
+        self._timers[key] = (deadline, seq, callback, args)
+        heapq.heappush(self._heap, (deadline, seq, key))
+        if len(self._heap) > 2 * len(self._timers) + 64:
+            self._compact()
+        if self._heap[0][1] == seq:
+            self._wakeup.set() # new earliest deadline
+
+    def cancel(self, key):
+        self._timers.pop(key, None)
+
+    def _compact(self):
+        self._heap = [(deadline, seq, key) for key, (deadline, seq, _, _) in self._timers.items()]
+        heapq.heapify(self._heap)
+
+    def fire_due(self, now: float | None = None) -> float | None:
+        """
+            Run every timer due at `now`, returns the next deadline or None if nothing is scheduled.
+        """
+        now = self.clock() if now is None else now
+        while self._heap:
+            deadline, seq, key = self._heap[0]
+            timer = self._timers.get(key)
+            if timer is None or timer[1] != seq:
+                heapq.heappop(self._heap)
+                continue
+            if deadline > now:
+                return deadline
+            heapq.heappop(self._heap)
+            del self._timers[key]
+            _, _, callback, args = timer
+            callback(*args)
+        return None
+
+    async def run(self):
+        while True:
+            self._wakeup.clear()
+            deadline = self.fire_due()
+            timeout = None if deadline is None else max(0.0, deadline - self.clock())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+__all__ = ["TimerHeap"]
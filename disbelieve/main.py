@@ -1,29 +1,34 @@
 import os
 import traceback
 try: from .libs import (
-    SolHook,
+    SolHook, IngestHook, ShardHook, TimerHeap, MintRegistry, SoldSet,
     BELIEVE, WSOL_MINT,
     cc, cprint, cinput, 
     WS_RPC_URL, HTTP_RPC_URL, PRIVATE_KEY, 
     ASYNC_CLIENT, 
     GAS,
     FIRST_BUY_AMOUNT,
-    NEXT_BUY_AMOUNT
+    NEXT_BUY_AMOUNT,
+    WORKERS,
+    MINT_IDLE_TTL,
+    MAX_TRACKED_MINTS
 )
 except: from libs import (
-    SolHook,
+    SolHook, IngestHook, ShardHook, TimerHeap, MintRegistry, SoldSet,
     BELIEVE, WSOL_MINT,
     cc, cprint, cinput, 
     WS_RPC_URL, HTTP_RPC_URL, PRIVATE_KEY, 
     ASYNC_CLIENT, 
     GAS,
     FIRST_BUY_AMOUNT,
-    NEXT_BUY_AMOUNT
+    NEXT_BUY_AMOUNT,
+    WORKERS,
+    MINT_IDLE_TTL,
+    MAX_TRACKED_MINTS
 )
 from solders.keypair import Keypair # type: ignore
 from solders.pubkey import Pubkey # type: ignore
-import json, asyncio, sys, logging
-from collections import defaultdict
+import json, asyncio, sys, logging, signal
 import time
 import gc
 
@@ -52,18 +57,42 @@ class Settings:
         self.disable_first_buy = bool(os.getenv("DISABLE_FIRST_BUY") or False)
 
 class Disbelieve:
-    def __init__(self):
+    def __init__(self, clock=time.time):
         self.privkey = Keypair.from_base58_string(PRIVATE_KEY)
         self.pubkey = self.privkey.pubkey()
         self.client = ASYNC_CLIENT
         self.mint_queue = asyncio.Queue()
-        self._prices = defaultdict(dict)
-        self._open_prices = {}
-        self.holdings_state = {}
         self.settings = Settings()
-        self.sold = set()
-        self.total_balance_sold = defaultdict(int)
-        self.considers = defaultdict(dict)
+        self.clock = clock # wall clock of the strategy, simulated during replay
+        self.timers = TimerHeap(clock=clock)
+        self.mints = MintRegistry(MINT_IDLE_TTL, MAX_TRACKED_MINTS, clock=clock, on_evict=self.evict) # mint -> MintState
+        self.sold = SoldSet() # mints we're done with, never onboarded again
+        self.shards = None # ShardRouter when trading runs in worker processes
+        self.timers.schedule(("mints", "sweep"), clock() + MINT_IDLE_TTL / 4, self.sweep_mints)
+
+    def wake(self, mint):
+        state = self.mints.get(mint)
+        if state is not None and state.wakeup is not None:
+            state.wakeup.set()
+
+    def sweep_mints(self):
+        self.mints.sweep()
+        self.timers.schedule(("mints", "sweep"), self.clock() + self.mints.ttl / 4, self.sweep_mints)
+
+    def collect_mints(self) -> list:
+        return self.mints.collect() + [("disbelieve_done_mints", "gauge", "Sold, migrated or dropped mints remembered", [({}, len(self.sold))])]
+
+    def evict(self, state):
+        """
+            A mint we never held went quiet: end its position handler and drop its streams.
+        """
+        self.sold.add(state.mint)
+        if state.wakeup is not None:
+            state.wakeup.set()
+        self.hook.prices.discard(state.mint)
+        asyncio.create_task(self.hook.unsubscribe_state(state.mint))
+        if self.settings.debug_sensitivity in [1, 2]:
+            logging.info(f"{cc.LIGHT_GRAY}Dropped {state.mint}, no activity for {self.clock() - state.touched:.0f}s{cc.RESET}")
 
     def is_mint(self, logs):
         c1, c2 = False, False
@@ -80,7 +109,7 @@ class Disbelieve:
     async def monitor_believe(self):
         try:
             while True:
-                message, _ = await self.hook.logs.get()
+                message, _, received_at = await self.hook.logs.get()
                 params = message.get("params", {})
                 result = params.get("result", {})
                 value = result.get("value", {})
@@ -97,103 +126,153 @@ class Disbelieve:
                     continue
 
                 if is_mint:
+                    detected_at = time.perf_counter()
                     meta = await self.hook.get_swap_tx(sig)
+                    if not meta:
+                        continue
+                    fetched_at = time.perf_counter()
                     post_token_balances = meta.get("postTokenBalances", [])
                     for side in post_token_balances:
                         mint = side.get("mint", "")
                         if mint != str(WSOL_MINT):
-                            self.mint_queue.put_nowait(mint)
-                            asyncio.create_task(self.subscribe_mint_updates(mint))
+                            self.hook.metrics.mark(mint, "frame", received_at)
+                            self.hook.metrics.mark(mint, "swap_tx", fetched_at)
+                            self.dispatch(mint, detected_at)
                             break
 
         except Exception as e:
             print(f"Error: {e}")
             traceback.print_exc()
 
-    async def subscribe_mint_updates(self, mint: str | Pubkey):
+    def dispatch(self, mint: str, detected_at: float):
+        """
+            Start the position handler and the onboarding of a launch. Sharded, the worker that
+            gets the mint starts its handler once the pool is onboarded.
+        """
+        if mint in self.sold: # done with it already, no state or onboarding read again
+            return
+        if self.shards is None:
+            self.mints.track(mint)
+            self.mint_queue.put_nowait(mint)
+        self.hook.metrics.mark(mint, "queued")
+        asyncio.create_task(self.subscribe_mint_updates(mint, detected_at))
+
+    async def subscribe_mint_updates(self, mint: str | Pubkey, detected_at: float | None = None):
         """
             We subscribe here to populate 'updates' dictionary.
         """
-        state = await self.hook.meteora_dbc.fetch_state(mint)
-        dec_base = await self.hook.get_decimals(mint)
-        dec_quote = await self.hook.get_decimals(WSOL_MINT)
-
-        await asyncio.gather(
-            self.hook.subscribe_state(state, dec_base, dec_quote, mint),
-        )
+        await self.hook.onboard(str(mint), detected_at)
 
     async def handle_holdings(self, mint, price, peak_price, last_activity_time, just_buy=False):
         try:    
-            if mint not in self.holdings_state or just_buy:
-                if not self.settings.disable_first_buy and mint not in self.sold or just_buy:
-                    if mint not in self.holdings_state:
-                        self.holdings_state[mint] = {"state": "bought", "buy_price": 0}
+            state = self.mints.get(mint)
+            if state is None: # sold or dropped meanwhile
+                return
+            if not state.held or just_buy:
+                if not self.settings.disable_first_buy or just_buy:
+                    state.held = True
                     if just_buy:
-                        await self.hook.meteora_dbc_buy(mint, fee_sol=GAS, buy_amount=NEXT_BUY_AMOUNT)
+                        buy_tx = await self.hook.meteora_dbc_buy(mint, fee_sol=GAS, buy_amount=NEXT_BUY_AMOUNT)
                     else:
-                        await self.hook.meteora_dbc_buy(mint, fee_sol=GAS, buy_amount=FIRST_BUY_AMOUNT)
-                    price = self._prices[mint]["price"]
-                    if self.holdings_state[mint]["state"] == "bought" and self.holdings_state[mint]["buy_price"] == 0:
-                        self.holdings_state[mint]["buy_price"] = price
+                        buy_tx = await self.hook.meteora_dbc_buy(mint, fee_sol=GAS, buy_amount=FIRST_BUY_AMOUNT)
+                    self.track_confirmation(mint, "buy", buy_tx)
+                    price = state.price
+                    if state.buy_price == 0:
+                        state.buy_price = price
                     logging.info(f"{cc.LIGHT_CYAN}Bought {mint} at approx. {price:.10f} SOL{cc.RESET}")
                     if just_buy:
                         return
                     
-            elif mint in self.holdings_state:
+            elif state.held:
                 is_sold = False
-                price = self._prices[mint]["price"]
+                price = state.price
                 if price <= peak_price * (1 - self.settings.max_loss_from_peak):
-                    if mint not in self.considers or "peak_stabilizer_tick" not in self.considers[mint]:
-                        self.considers[mint]["peak_stabilizer_tick"] = 1
-                        await asyncio.sleep(1) # wait for the price to stabilize, this doesn't stop other sessions from selling
+                    if state.stabilize_until is None:
+                        state.stabilize_until = self.clock() + 1
+                        self.timers.schedule((mint, "peak_stabilizer"), state.stabilize_until, self.wake, mint) # re-check once the price had a second to stabilize
+                        return
+                    elif self.clock() < state.stabilize_until: # ticks inside the second don't cut it short
                         return
                     else:
                         sell_tx = await self.hook.meteora_dbc_sell(mint, 100, fee_sol=GAS)
+                        self.track_confirmation(mint, "sell", sell_tx)
                         if sell_tx == "migrated":
                             logging.info(f"{cc.LIGHT_WHITE}Pool {mint} is migrated, skipping sell{cc.RESET}")
                             return "migrated"
                         logging.info(f"{cc.LIGHT_GREEN}Sold {mint} due to max loss from peak{cc.RESET}")
                         is_sold = True
 
-                elif price > (self.holdings_state[mint]["buy_price"] * self.settings.target_profit):
-                    if mint not in self.total_balance_sold or self.total_balance_sold[mint] < 100:
+                elif price > (state.buy_price * self.settings.target_profit):
+                    if state.sold_pct < 100:
                         sell_tx = await self.hook.meteora_dbc_sell(mint, self.settings.checkpoint_balance_percentage, fee_sol=GAS)
+                        self.track_confirmation(mint, "sell", sell_tx)
                         if sell_tx == "migrated":
                             logging.info(f"{cc.LIGHT_WHITE}Pool {mint} is migrated, skipping sell{cc.RESET}")
                             return "migrated"
                         logging.info(f"{cc.LIGHT_GREEN}Sold {mint} due to target profit being reached{cc.RESET}")
-                        self.total_balance_sold[mint] += self.settings.checkpoint_balance_percentage
+                        state.sold_pct += self.settings.checkpoint_balance_percentage
                     else:
-                        logging.info(f"Already sold {mint} at {self.total_balance_sold[mint]}%")
+                        logging.info(f"Already sold {mint} at {state.sold_pct}%")
                         is_sold = True
 
-                elif price <= (self.holdings_state[mint]["buy_price"] * self.settings.max_loss):
+                elif price <= (state.buy_price * self.settings.max_loss):
                     sell_tx = await self.hook.meteora_dbc_sell(mint, 100, fee_sol=GAS)
+                    self.track_confirmation(mint, "sell", sell_tx)
                     if sell_tx == "migrated":
                         logging.info(f"{cc.LIGHT_WHITE}Pool {mint} is migrated, skipping sell{cc.RESET}")
                         return "migrated"
                     logging.info(f"{cc.LIGHT_GREEN}Sold {mint} due to max loss{cc.RESET}")
                     is_sold = True
 
-                elif (time.time() - last_activity_time) >= self.settings.no_activity_threshold:
+                elif (self.clock() - last_activity_time) >= self.settings.no_activity_threshold:
                     sell_tx = await self.hook.meteora_dbc_sell(mint, 100, fee_sol=GAS)
+                    self.track_confirmation(mint, "sell", sell_tx)
                     if sell_tx == "migrated":
                         logging.info(f"{cc.LIGHT_WHITE}Pool {mint} is migrated, skipping sell{cc.RESET}")
                         return "migrated"
-                    logging.info(f"{cc.LIGHT_GREEN}Sold {mint} due to no activity, last activity time: {time.time() - last_activity_time}{cc.RESET}")
+                    logging.info(f"{cc.LIGHT_GREEN}Sold {mint} due to no activity, last activity time: {self.clock() - last_activity_time}{cc.RESET}")
                     is_sold = True
 
                 if is_sold:
-                    self.holdings_state.pop(mint)
-                    self.sold.add(mint)
-                    if mint in self.considers:  
-                        self.considers.pop(mint)
-                    gc.collect()
+                    await self.retire(mint)
 
         except Exception as e:
             print(f"Error in handle_holdings: {e}")
             traceback.print_exc()
 
+    async def retire(self, mint):
+        """
+            Done with `mint`, sold or migrated: its state and streams go, it's never onboarded again.
+        """
+        self.mints.drop(mint)
+        self.sold.add(mint)
+        await self.hook.unsubscribe_state(mint)
+        self.hook.prices.discard(mint)
+        gc.collect()
+
+    def track_confirmation(self, mint, kind, tx):
+        """
+            Follow a bot trade until it's confirmed, the future stays on the position as '<kind>_confirmation'.
+        """
+        if not tx or tx == "migrated":
+            return
+        future = self.hook.confirmations.track(tx)
+        state = self.mints.get(mint)
+        if state is not None and state.held:
+            setattr(state, f"{kind}_confirmation", future)
+
+        def report(fut):
+            if fut.cancelled():
+                return
+            result = fut.result()
+            if result is None:
+                logging.warning(f"{cc.YELLOW}{kind.capitalize()} of {mint} not confirmed in time: {tx}{cc.RESET}")
+            elif result["err"] is not None:
+                logging.error(f"{cc.RED}{kind.capitalize()} of {mint} failed on chain: {result['err']}{cc.RESET}")
+            elif self.settings.debug_sensitivity in [1, 2]:
+                logging.info(f"{cc.LIGHT_GRAY}{kind.capitalize()} of {mint} confirmed in {result['latency'] * 1000:.0f}ms{cc.RESET}")
+        future.add_done_callback(report)
+
     async def mint_updates_handler(self):
         """
             Update local dictionaries with new price data.
@@ -202,15 +281,22 @@ class Disbelieve:
         """
         try:
             while True:
-                update = await self.hook.updates.get()
-                mint = str(update["mint"])
-                price = float(update["price"])
-                self._prices[mint]["price"] = price
-                if self.settings.debug_sensitivity in [1, 2]:
-                    logging.info(f"{cc.LIGHT_MAGENTA}Price update: {price:.10f} | Mint: {mint}{cc.RESET}")
+                for mint, update in await self.hook.prices.drain():
+                    state = self.mints.get(mint)
+                    if state is None: # done with it, its stream is on the way out
+                        continue
+                    price = float(update["price"])
+                    state.price = price
+                    self.mints.touch(state)
+                    if self.settings.debug_sensitivity in [1, 2]:
+                        logging.info(f"{cc.LIGHT_MAGENTA}Price update: {price:.10f} | Mint: {mint}{cc.RESET}")
 
-                if price > 0 and mint not in self._open_prices:
-                    self._open_prices[mint] = price
+                    if price > 0 and state.open_price is None:
+                        stored = self.hook.ticks.first(mint) if self.hook.ticks is not None else None # survives restarts
+                        open_price = float((stored or self.hook.prices.first[mint])["price"])
+                        state.open_price = open_price if open_price > 0 else price
+                    if state.wakeup is not None:
+                        state.wakeup.set()
 
         except Exception as e:
             print(f"Error in mint_updates_handler: {e}")
@@ -218,7 +304,8 @@ class Disbelieve:
 
     async def check_second_buy(self, mint, price, high_price, buys, last_activity_time):
         try:
-            open_price = self._open_prices[mint]
+            state = self.mints[mint]
+            open_price = state.open_price
             thresh = self.settings.target_profit * 0.05
             if price > open_price * (1 + thresh):
                 if buys > self.settings.min_buys_threshold:
@@ -228,8 +315,8 @@ class Disbelieve:
                 else:
                     if self.settings.debug_sensitivity in [1, 2]:
                         if buys > 10:
-                            if "buys" not in self.considers[mint]:
-                                self.considers[mint]["buys"] = buys
+                            if not state.buys_noted:
+                                state.buys_noted = True
                                 logging.info(f"{cc.LIGHT_RED}Not enough buys to buy {mint} yet, {buys} < {self.settings.min_buys_threshold}{cc.RESET}")
             return False
         except Exception as e:
@@ -237,6 +324,7 @@ class Disbelieve:
             traceback.print_exc()
 
     async def handle_position(self, mint):
+        state = None
         try:
             if self.settings.debug_sensitivity in [1, 2]:
                 logging.info(f"{cc.LIGHT_BLUE}Starting position handler for {mint}{cc.RESET}")
@@ -244,21 +332,24 @@ class Disbelieve:
             price, last_price, low_price, high_price = 0, 0, 0, 0
             buys, sells = 0, 0
             is_buy, has_second_buy = False, False
-            last_activity_time = time.time()
-            
-            while mint not in self.sold:
+            last_activity_time = self.clock()
+            state = self.mints.get(mint)
+            if state is None:
+                return
+            wakeup = state.wakeup = asyncio.Event()
+
+            while self.mints.get(mint) is state: # until sold or evicted
+                wakeup.clear()
                 if not initialized:
-                    if mint not in self._open_prices:
-                        await asyncio.sleep(1)
+                    if state.open_price is None:
+                        await wakeup.wait()
                         continue
                     initialized = True
 
-                if mint in self.sold:
-                    break
-
-                price = self._prices[mint]["price"]
+                price = state.price
                 if price != last_price:
-                    last_activity_time = time.time()
+                    last_activity_time = self.clock()
+                    self.timers.schedule((mint, "no_activity"), last_activity_time + self.settings.no_activity_threshold, self.wake, mint)
                     if price > last_price:
                         buys += 1
                         is_buy = True
@@ -284,11 +375,19 @@ class Disbelieve:
 
                 migrated = await self.handle_holdings(mint, price, high_price, last_activity_time)
                 if migrated == "migrated":
+                    await self.retire(mint)
                     break
-                await asyncio.sleep(0.1)
+                if self.mints.get(mint) is not state:
+                    break
+                await wakeup.wait()
         except Exception as e:
             print(f"Error in handle_position: {e}")
             traceback.print_exc()
+        finally:
+            if state is not None:
+                state.wakeup = None
+            self.timers.cancel((mint, "no_activity"))
+            self.timers.cancel((mint, "peak_stabilizer"))
 
     async def mint_queue_processor(self):
         try:
@@ -304,12 +403,21 @@ class Disbelieve:
 
     async def run(self):
         try:
+            if WORKERS:
+                await self.run_ingestion(WORKERS)
+                return
             self.hook = SolHook(self, self.privkey)
+            self.hook.metrics.collect(self.collect_mints)
             logging.info(f"{cc.MAGENTA}Starting Disbelieve...{cc.RESET}")
+            await asyncio.gather(self.hook.warm_up(), self.hook.meteora_dbc.swap.load_wallet())
             await asyncio.gather(
                 self.hook.subscribe(BELIEVE), 
+                self.hook.keep_warm(),
+                self.hook.serve_metrics(),
+                self.hook.meteora_dbc.swap.balances.run_reconciler(),
                 self.monitor_believe(),
                 self.mint_queue_processor(),
+                self.timers.run(),
                 self.mint_updates_handler()
             )
         except asyncio.CancelledError:
@@ -320,11 +428,51 @@ class Disbelieve:
             print(f"Error: {e}")
             traceback.print_exc()
 
+    async def run_ingestion(self, workers: int):
+        """
+            Streams, detection and onboarding on this loop, trading in `workers` processes.
+        """
+        self.hook = IngestHook(self, self.privkey, workers, run_shard)
+        self.shards = self.hook.shards
+        logging.info(f"{cc.MAGENTA}Starting Disbelieve with {workers} trading workers...{cc.RESET}")
+        await asyncio.gather(self.shards.start(), self.hook.warm_up())
+        await asyncio.gather(
+            self.hook.subscribe(BELIEVE),
+            self.hook.keep_warm(),
+            self.hook.serve_metrics(),
+            self.monitor_believe(),
+        )
+
+    async def run_worker(self, index: int, inbox, outbox):
+        """
+            One trading worker: position handlers of the mints the ingestion process gives it.
+        """
+        try:
+            self.hook = ShardHook(self, self.privkey, index, inbox, outbox)
+            await asyncio.gather(self.hook.warm_up(), self.hook.meteora_dbc.swap.load_wallet())
+            tasks = [asyncio.create_task(coro) for coro in (
+                self.hook.meteora_dbc.swap.balances.run_reconciler(),
+                self.hook.keep_warm(),
+                self.mint_queue_processor(),
+                self.timers.run(),
+                self.mint_updates_handler(),
+                self.hook.report(lambda: self.collect_mints() + self.hook.meteora_dbc.swap.blockhashes.collect()),
+            )]
+            await self.hook.consume()
+            for task in tasks:
+                task.cancel()
+        except Exception as e:
+            print(f"Error in worker #{index}: {e}")
+            traceback.print_exc()
+        await self.close()
+
     async def close(self):
         try:
             self.hook.stop_event.set()
+            if self.shards is None: # single process or a worker, the ingestion process tracks no mints
+                logging.info(f"{cc.LIGHT_GRAY}Mints: {self.mints.summary()}, {len(self.sold)} done in {self.sold.nbytes:,} bytes{cc.RESET}")
+            await self.hook.close()
             await self.client.close()
-            await self.hook.session.close()
             logging.info(f"{cc.RED}Program stopped by user.{cc.RESET}")
             sys.exit(0)
         except Exception as e:
@@ -333,6 +481,17 @@ class Disbelieve:
             sys.exit(1)
 
 
+def run_shard(index: int, inbox, outbox):
+    """
+        Entry point of a worker process, the ingestion process stops it, Ctrl-C only reaches that one.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.getLogger().handlers[0].setFormatter(logging.Formatter(
+        f'%(asctime)s - {cc.AQUA}☆ Disbelieve #{index} ☆ {cc.LIGHT_GRAY}┃{cc.RESET} {cc.WHITE}%(message)s{cc.RESET}',
+        datefmt='%H:%M:%S',
+    ))
+    asyncio.run(Disbelieve().run_worker(index, inbox, outbox))
+
 def run():
     disbelieve = Disbelieve()
     asyncio.run(disbelieve.run())
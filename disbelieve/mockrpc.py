@@ -0,0 +1,861 @@
+try: from .libs import BELIEVE, WSOL_MINT, cc, cprint
+except: from libs import BELIEVE, WSOL_MINT, cc, cprint
+try: from .libs.meteoraDBC.state import VirtualPool, VirtualPoolLayout, PoolConfigLayout, parse_pool_config, SQRT_PRICE_OFFSET, RESERVES_OFFSET, MINT_DECIMALS_OFFSET, Q64
+except: from libs.meteoraDBC.state import VirtualPool, VirtualPoolLayout, PoolConfigLayout, parse_pool_config, SQRT_PRICE_OFFSET, RESERVES_OFFSET, MINT_DECIMALS_OFFSET, Q64
+try: from .libs.meteoraDBC.quote import CurveQuoter
+except: from libs.meteoraDBC.quote import CurveQuoter
+try: from .libs.meteoraDBC.pool import DBC, derive_pool_address
+except: from libs.meteoraDBC.pool import DBC, derive_pool_address
+try: from .libs.meteoraDBC.swap import SWAP_DISCRIM
+except: from libs.meteoraDBC.swap import SWAP_DISCRIM
+try: from .libs.meteoraDBC.ata import TOKEN_PROGRAM
+except: from libs.meteoraDBC.ata import TOKEN_PROGRAM
+from solders.pubkey import Pubkey # type: ignore
+from solders.hash import Hash # type: ignore
+from solders.signature import Signature # type: ignore
+from solders.transaction import VersionedTransaction # type: ignore
+from spl.token.instructions import get_associated_token_address
+from collections import defaultdict
+from aiohttp import web, WSMsgType
+import argparse, asyncio, base64, hashlib, json, logging, math, random, struct, time
+
+BASE_SLOT = 340_000_000
+SLOT_SECONDS = 0.4
+BLOCKHASH_SLOTS = 150 # slots a handed out blockhash stays valid for
+ACCOUNT_DISCRIMINATOR = bytes(8) # Anchor discriminators aren't checked by the bot
+TRADE_FEE = 0.01 # cliff fee of the mock pool config
+WS_METHODS = {"logsSubscribe", "accountSubscribe", "signatureSubscribe", "logsUnsubscribe", "accountUnsubscribe", "signatureUnsubscribe"}
+SWAP_ERROR = {"Custom": 6005} # any custom program error, the bot only looks at err being set
+INSUFFICIENT_FUNDS = {"Custom": 1} # spl-token InsufficientFunds
+
+# one pool config for every launch, a single curve segment from 2.5e-5 to 4e-4 lamports per raw token, ~80 SOL deep
+CURVE_START = int(0.005 * Q64)
+CURVE_END = int(0.02 * Q64)
+CURVE_LIQUIDITY = 5_300_000_000_000 * Q64
+
+LAUNCH_LOGS = [
+    "Program SQDS4ep65T869zMMBKyuUq6aD6EgTu8psMjkvj52pCf invoke [1]",
+    "Program log: Instruction: VaultTransactionExecute",
+    "Program 5qWya6UjwWnGVhdSBL3hyZ7B45jbk6Byt1hwd7ohEGXE invoke [2]",
+    "Program log: Instruction: LaunchToken",
+    "Program dbcij3LWUppWqq96dh6gJWwBifmcGfLSB5D4DuSMaqN invoke [3]",
+    "Program log: Instruction: InitializeVirtualPoolWithSplToken",
+    "Program TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA invoke [4]",
+    "Program log: Instruction: InitializeMint2",
+    "Program TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA success",
+    "Program dbcij3LWUppWqq96dh6gJWwBifmcGfLSB5D4DuSMaqN success",
+    "Program 5qWya6UjwWnGVhdSBL3hyZ7B45jbk6Byt1hwd7ohEGXE success",
+    "Program SQDS4ep65T869zMMBKyuUq6aD6EgTu8psMjkvj52pCf success",
+]
+NOISE_LOGS = [
+    "Program 5qWya6UjwWnGVhdSBL3hyZ7B45jbk6Byt1hwd7ohEGXE invoke [1]",
+    "Program log: Instruction: ClaimCreatorFees",
+    "Program dbcij3LWUppWqq96dh6gJWwBifmcGfLSB5D4DuSMaqN invoke [2]",
+    "Program log: Instruction: ClaimCreatorTradingFee",
+    "Program dbcij3LWUppWqq96dh6gJWwBifmcGfLSB5D4DuSMaqN success",
+    "Program 5qWya6UjwWnGVhdSBL3hyZ7B45jbk6Byt1hwd7ohEGXE success",
+]
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str, data=None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data # solders refuses some error codes without the data a real node sends along
+
+    def response(self) -> dict:
+        error = {"code": self.code, "message": self.message}
+        if self.data is not None:
+            error["data"] = self.data
+        return error
+
+class Account:
+    __slots__ = ("data", "owner", "lamports")
+
+    def __init__(self, data: bytes, owner: Pubkey, lamports: int = 2_039_280):
+        self.data = data
+        self.owner = owner
+        self.lamports = lamports
+
+def mint_account(decimals: int, supply: int) -> bytes:
+    """
+        spl-token Mint without authorities: COption authority, supply, decimals, initialized, COption freeze authority.
+    """
+    return bytes(36) + struct.pack("<QBB", supply, decimals, 1) + bytes(36)
+
+def token_account(mint: Pubkey, owner: Pubkey, amount: int) -> bytes:
+    """
+        Initialized spl-token Account: mint, owner, amount, no delegate, not native, no close authority.
+    """
+    return bytes(mint) + bytes(owner) + struct.pack("<Q", amount) + bytes(36) + b"\x01" + bytes(12) + bytes(8) + bytes(36)
+
+def pool_config_account() -> bytes:
+    config = PoolConfigLayout.parse(bytes(PoolConfigLayout.sizeof()))
+    config.quote_mint = bytes(WSOL_MINT)
+    config.pool_fees.base_fee.cliff_fee_num = int(TRADE_FEE * 1e9)
+    config.activation_type = 1
+    config.sqrt_start_price = CURVE_START.to_bytes(16, "little")
+    config.curve[0].sqrt_price = CURVE_END.to_bytes(16, "little")
+    config.curve[0].liquidity = CURVE_LIQUIDITY.to_bytes(16, "little")
+    return ACCOUNT_DISCRIMINATOR + PoolConfigLayout.build(config)
+
+def pool_account(config: Pubkey, creator: Pubkey, base_mint: Pubkey, base_vault: Pubkey, quote_vault: Pubkey, supply: int) -> bytes:
+    """
+        VirtualPool of a fresh launch, the whole supply in the pool at the start of the curve.
+    """
+    pool = VirtualPoolLayout.parse(bytes(VirtualPoolLayout.sizeof()))
+    pool.config, pool.creator, pool.base_mint = bytes(config), bytes(creator), bytes(base_mint)
+    pool.base_vault, pool.quote_vault = bytes(base_vault), bytes(quote_vault)
+    pool.base_reserve = supply
+    pool.sqrt_price_raw = CURVE_START.to_bytes(16, "little")
+    return ACCOUNT_DISCRIMINATOR + VirtualPoolLayout.build(pool)
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {"p50": ordered[len(ordered) // 2], "p90": ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))], "max": ordered[-1]}
+
+class Scenario:
+    """
+        What the mock chain does once the bot is listening: `launches` Believe launches spread over
+        `duration` seconds as Poisson arrivals, each followed by `trades` swaps of other traders about
+        `trade_interval` seconds apart, plus `noise` non-launch Believe log frames per second.
+        `redelivered` of the log frames are sent twice.
+
+        Other traders buy ~`buy_size` SOL (log-normal, `pump_chance` of the buys are 10x), or with
+        `sell_chance` sell part of what they bought, every swap moves the pool along its curve.
+    """
+    DEFAULTS = {
+        "launches": 200, "duration": 60.0, "trades": 40, "trade_interval": 1.5, "buy_size": 0.3,
+        "sell_chance": 0.4, "pump_chance": 0.05, "noise": 5.0, "redelivered": 0.05, "decimals": 6,
+        "supply": 1_000_000_000, "seed": 7,
+    }
+
+    def __init__(self, **values):
+        unknown = set(values) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"unknown scenario settings: {', '.join(sorted(unknown))}")
+        for name, default in self.DEFAULTS.items():
+            setattr(self, name, type(default)(values.get(name, default)))
+
+    def events(self) -> list:
+        """
+            Sorted (seconds after start, kind, launch index) with kind "launch", "trade" or "noise".
+        """
+        rng = random.Random(self.seed)
+        events, at = [], 0.0
+        rate = self.launches / self.duration if self.duration > 0 else 0
+        for i in range(self.launches):
+            at = at + rng.expovariate(rate) if rate else 0.0
+            events.append((at, "launch", i))
+            trade = at
+            for _ in range(self.trades):
+                trade += rng.expovariate(1 / self.trade_interval)
+                events.append((trade, "trade", i))
+        span = max(self.duration, at)
+        at = 0.0
+        while self.noise > 0 and at < span:
+            at += rng.expovariate(self.noise)
+            events.append((at, "noise", -1))
+        return sorted(events)
+
+class Faults:
+    """
+        Latency and errors injected into the RPC, per JSON-RPC method with "*" for every other one:
+        `latency` seconds before answering plus an exponential tail of mean `jitter`, `errors` is the
+        share of requests answered with a JSON-RPC error. Launch transactions stay invisible to
+        getTransaction for `tx_delay` seconds, sent transactions land with probability `land_rate`
+        after `confirm_delay` seconds and every websocket is closed each `drop_every` seconds.
+    """
+    def __init__(self, latency: dict | None = None, jitter: dict | None = None, errors: dict | None = None,
+                 tx_delay: float = 0.0, land_rate: float = 1.0, confirm_delay: float = 0.8, drop_every: float = 0.0, seed: int = 7):
+        self.latency = latency or {}
+        self.jitter = jitter or {}
+        self.errors = errors or {}
+        self.tx_delay = tx_delay
+        self.land_rate = land_rate
+        self.confirm_delay = confirm_delay
+        self.drop_every = drop_every
+        self.rng = random.Random(seed)
+
+    @staticmethod
+    def _get(table: dict, method: str) -> float:
+        return table.get(method, table.get("*", 0.0))
+
+    def delay(self, method: str) -> float:
+        jitter = self._get(self.jitter, method)
+        return self._get(self.latency, method) + (self.rng.expovariate(1 / jitter) if jitter else 0.0)
+
+    def fails(self, method: str) -> bool:
+        rate = self._get(self.errors, method)
+        return rate > 0 and self.rng.random() < rate
+
+    def lands(self) -> bool:
+        return self.rng.random() < self.land_rate
+
+class Launch:
+    __slots__ = ("index", "mint", "pool", "signature", "crowd", "announced", "fetched", "watched", "updated", "bought", "buys", "sells")
+
+    def __init__(self, index: int, mint: Pubkey, pool: Pubkey, signature: str):
+        self.index = index
+        self.mint = mint
+        self.pool = pool
+        self.signature = signature
+        self.crowd = 0        # raw tokens other traders hold
+        self.announced = None # perf_counter() the launch log frame went out
+        self.fetched = None   # first getTransaction of the launch signature
+        self.watched = None   # first accountSubscribe on the pool
+        self.updated = None   # first pool notification sent after that
+        self.bought = None    # first buy received
+        self.buys = 0
+        self.sells = 0
+
+class Ledger:
+    """
+        Everything the bot asked for and sent.
+    """
+    def __init__(self):
+        self.requests = defaultdict(int)        # method -> calls, websocket methods included
+        self.injected = defaultdict(int)        # method -> injected errors
+        self.sends = {"buys": 0, "sells": 0, "other": 0, "landed": 0, "failed": 0, "dropped": 0, "stale": 0, "duplicates": 0, "rejected": 0}
+        self.lamports = {"spent": 0, "received": 0}
+        self.transactions = []                  # one dict per accepted transaction
+        self.drops = 0
+
+    def report(self, launches: list) -> dict:
+        def stage(start, end):
+            spans = sorted((getattr(l, start), getattr(l, end)) for l in launches if getattr(l, start) and getattr(l, end))
+            p = percentiles([e - s for s, e in spans])
+            if p:
+                p["first"] = spans[0][1] - spans[0][0] # the earliest launch, cold paths show here
+            return p
+
+        return {
+            "launches": {
+                "announced": sum(1 for l in launches if l.announced),
+                "fetched": sum(1 for l in launches if l.fetched),
+                "watched": sum(1 for l in launches if l.watched),
+                "bought": sum(1 for l in launches if l.bought),
+            },
+            "latency": {
+                "detect": stage("announced", "fetched"),  # log frame -> getTransaction
+                "onboard": stage("announced", "watched"), # log frame -> pool accountSubscribe
+                "reaction": stage("updated", "bought"),   # first streamed price -> buy on the wire
+                "to_buy": stage("announced", "bought"),
+            },
+            "requests": dict(self.requests),
+            "injected_errors": dict(self.injected),
+            "sends": dict(self.sends),
+            "lamports": dict(self.lamports),
+            "websocket_drops": self.drops,
+        }
+
+    def summary(self, launches: list) -> str:
+        report = self.report(launches)
+        l, s = report["launches"], report["sends"]
+        latency = ", ".join(
+            f"{name} p50 {p['p50'] * 1000:.1f}ms p90 {p['p90'] * 1000:.1f}ms" for name, p in report["latency"].items() if p
+        )
+        return (
+            f"{l['announced']} launches, {l['fetched']} fetched, {l['watched']} watched, {l['bought']} bought | "
+            f"{latency or 'no latencies yet'} | {s['buys']} buys, {s['sells']} sells, {s['landed']} landed, {s['failed']} failed, "
+            f"{s['dropped']} dropped, {s['stale']} stale, {s['duplicates']} duplicates, {s['rejected']} rejected | "
+            f"{sum(report['requests'].values())} requests, {sum(report['injected_errors'].values())} injected errors, {report['websocket_drops']} socket drops"
+        )
+
+class MockSolana:
+    """
+        Local stand-in for a Solana RPC node, HTTP JSON-RPC and websocket subscriptions on one port.
+
+        It serves the accounts, transactions and streams of a `Scenario` through the methods the bot
+        uses, applies the injected `Faults` and books every request and transaction in the `Ledger`.
+        Swaps, of other traders and the bot's once they land, are filled through the curve quoter
+        against the pool's config and move its price, the bot's token accounts follow its fills.
+    """
+    def __init__(self, scenario: Scenario, faults: Faults | None = None, host: str = "127.0.0.1", port: int = 8899):
+        self.scenario = scenario
+        self.faults = faults or Faults()
+        self.host = host
+        self.port = port
+        self.ledger = Ledger()
+        self.rng = random.Random(scenario.seed)
+        self.accounts = {}      # Pubkey -> Account
+        self.transactions = {}  # launch signature -> (visible from, getTransaction result)
+        self.statuses = {}      # signature -> (slot, err) of landed transactions
+        self.blockhashes = {}   # blockhash -> slot it was handed out at
+        self.launches = []
+        self.pools = {}         # pool -> Launch
+        self.by_signature = {}  # launch signature -> Launch
+        self.sent = {}          # signature -> ledger entry of every accepted transaction
+        self.subs = {}          # subscription id -> (websocket, kind, key)
+        self.watchers = defaultdict(dict) # (kind, key) -> {subscription id: websocket}
+        self.sockets = set()
+        self.next_sub = 1
+        self.listening = asyncio.Event() # set by the first logsSubscribe mentioning Believe
+        self.started = time.perf_counter()
+        self.config = Pubkey(self.rng.randbytes(32))
+        self.accounts[self.config] = Account(pool_config_account(), DBC)
+        self.quoter = CurveQuoter(parse_pool_config(self.accounts[self.config].data))
+        self.runner = None
+        self._tasks = []
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def slot(self) -> int:
+        return BASE_SLOT + int((time.perf_counter() - self.started) / SLOT_SECONDS)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/", self.http)
+        app.router.add_get("/", self.websocket)
+        app.router.add_get("/stats", self.stats)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        self.port = self.runner.addresses[0][1]
+        if self.faults.drop_every:
+            self._tasks.append(asyncio.create_task(self._drop_sockets()))
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        for ws in list(self.sockets):
+            await ws.close()
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def stats(self, request):
+        return web.json_response(self.ledger.report(self.launches))
+
+    # scenario
+
+    async def play(self, wait: bool = True):
+        """
+            Run the scenario in real time, from the moment the bot subscribed to the Believe logs if `wait`.
+        """
+        if wait:
+            await self.listening.wait()
+        started = time.perf_counter()
+        for at, kind, index in self.scenario.events():
+            delay = started + at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if kind == "launch":
+                await self.launch(index)
+            elif kind == "trade":
+                await self.trade(self.launches[index])
+            else:
+                await self.publish_logs(str(Signature(self.rng.randbytes(64))), NOISE_LOGS)
+
+    async def launch(self, index: int):
+        rng, scenario = self.rng, self.scenario
+        creator, mint, base_vault, quote_vault = (Pubkey(rng.randbytes(32)) for _ in range(4))
+        pool, signature = derive_pool_address(self.config, mint), str(Signature(rng.randbytes(64)))
+        supply = scenario.supply * 10 ** scenario.decimals
+        launch = Launch(index, mint, pool, signature)
+        self.launches.append(launch)
+        self.pools[pool] = launch
+        self.by_signature[signature] = launch
+        self.accounts[mint] = Account(mint_account(scenario.decimals, supply), TOKEN_PROGRAM, 1_461_600)
+        self.accounts[pool] = Account(pool_account(self.config, creator, mint, base_vault, quote_vault, supply), DBC, 4_223_760)
+
+        slot = self.slot()
+        balance = {"decimals": scenario.decimals, "amount": str(supply), "uiAmount": float(scenario.supply), "uiAmountString": str(scenario.supply)}
+        result = {
+            "slot": slot,
+            "blockTime": int(time.time()),
+            "version": 0,
+            "transaction": {
+                "signatures": [signature],
+                "message": {
+                    "header": {"numRequiredSignatures": 1, "numReadonlySignedAccounts": 0, "numReadonlyUnsignedAccounts": 2},
+                    "accountKeys": [str(creator), str(mint), str(pool), str(base_vault), str(BELIEVE), str(DBC)],
+                    "recentBlockhash": str(self.blockhash(slot)),
+                    "instructions": [{"programIdIndex": 4, "accounts": [0, 1, 2, 3], "data": "", "stackHeight": None}],
+                    "addressTableLookups": [],
+                },
+            },
+            "meta": {
+                "err": None, "status": {"Ok": None}, "fee": 5000,
+                "preBalances": [10_000_000_000, 0, 0, 0, 1, 1], "postBalances": [9_980_000_000, 1_461_600, 4_223_760, 2_039_280, 1, 1],
+                "innerInstructions": [], "logMessages": LAUNCH_LOGS, "preTokenBalances": [],
+                "postTokenBalances": [
+                    {"accountIndex": 3, "mint": str(WSOL_MINT), "owner": str(pool), "programId": str(TOKEN_PROGRAM), "uiTokenAmount": {"decimals": 9, "amount": "0", "uiAmount": None, "uiAmountString": "0"}},
+                    {"accountIndex": 3, "mint": str(mint), "owner": str(pool), "programId": str(TOKEN_PROGRAM), "uiTokenAmount": balance},
+                ],
+                "rewards": [], "loadedAddresses": {"writable": [], "readonly": []}, "computeUnitsConsumed": 149_620,
+            },
+        }
+        self.transactions[signature] = (time.perf_counter() + self.faults.tx_delay, result)
+        launch.announced = time.perf_counter()
+        await self.publish_logs(signature, LAUNCH_LOGS)
+
+    async def trade(self, launch: Launch):
+        scenario, rng = self.scenario, self.rng
+        buy = not launch.crowd or rng.random() >= scenario.sell_chance
+        if buy:
+            size = rng.lognormvariate(math.log(scenario.buy_size), 0.8) * (10 if rng.random() < scenario.pump_chance else 1)
+            amount = max(1, int(size * 1e9))
+        else:
+            amount = max(1, int(launch.crowd * rng.uniform(0.05, 0.5)))
+        try:
+            out = self.fill(launch, amount, buy)
+        except (RuntimeError, ValueError):
+            return # past the end of the curve, migrations aren't mocked
+        launch.crowd += out if buy else -amount
+        await self.publish_pool(launch)
+
+    def fill(self, launch: Launch, amount_in: int, buy: bool, min_out: int = 0) -> int:
+        """
+            Swap `amount_in` (lamports on buys, raw tokens on sells) through the pool's curve and move it,
+            returns the amount out. Raises if the curve can't fill it or it's below `min_out`.
+        """
+        account = self.accounts[launch.pool]
+        quote = self.quoter.quote_exact_in(VirtualPool(account.data), amount_in, buy)
+        out = quote["amount_out"]
+        if out < min_out:
+            raise ValueError(f"{out} out is below the minimum of {min_out}")
+        data = bytearray(account.data)
+        base, quote_reserve = struct.unpack_from("<QQ", data, RESERVES_OFFSET)
+        base, quote_reserve = (base - out, quote_reserve + amount_in) if buy else (base + amount_in, quote_reserve - out)
+        struct.pack_into("<QQ", data, RESERVES_OFFSET, base, max(0, quote_reserve))
+        data[SQRT_PRICE_OFFSET:SQRT_PRICE_OFFSET + 16] = quote["next_sqrt_price"].to_bytes(16, "little")
+        account.data = bytes(data)
+        return out
+
+    async def publish_pool(self, launch: Launch):
+        if await self.publish_account(launch.pool) and launch.watched and launch.updated is None:
+            launch.updated = time.perf_counter()
+
+    # notifications
+
+    async def _send(self, ws, frame: str):
+        try:
+            await ws.send_str(frame)
+        except Exception:
+            pass # the socket is going away, its subscriptions are dropped with it
+
+    async def _notify(self, kind: str, key: str, method: str, result: dict) -> int:
+        watchers = self.watchers.get((kind, key))
+        if not watchers:
+            return 0
+        sends = []
+        for sub_id, ws in list(watchers.items()):
+            frame = json.dumps({"jsonrpc": "2.0", "method": method, "params": {"result": result, "subscription": sub_id}}, separators=(",", ":"))
+            sends.append(self._send(ws, frame))
+        await asyncio.gather(*sends)
+        return len(sends)
+
+    async def publish_logs(self, signature: str, logs: list):
+        result = {"context": {"slot": self.slot()}, "value": {"signature": signature, "err": None, "logs": logs}}
+        await self._notify("logs", str(BELIEVE), "logsNotification", result)
+        if self.rng.random() < self.scenario.redelivered:
+            await self._notify("logs", str(BELIEVE), "logsNotification", result)
+
+    async def publish_account(self, pubkey: Pubkey) -> int:
+        account = self.accounts.get(pubkey)
+        value = self.encode_account(account) if account is not None else None
+        return await self._notify("account", str(pubkey), "accountNotification", {"context": {"slot": self.slot()}, "value": value})
+
+    async def publish_signature(self, signature: str):
+        slot, err = self.statuses[signature]
+        delivered = await self._notify("signature", signature, "signatureNotification", {"context": {"slot": slot}, "value": {"err": err}})
+        if delivered:
+            for sub_id in list(self.watchers.pop(("signature", signature), {})):
+                self.subs.pop(sub_id, None)
+
+    async def _drop_sockets(self):
+        while True:
+            await asyncio.sleep(self.faults.drop_every)
+            self.ledger.drops += 1
+            for ws in list(self.sockets):
+                await ws.close()
+
+    # encoding
+
+    def blockhash(self, slot: int) -> Hash:
+        blockhash = Hash(hashlib.sha256(slot.to_bytes(8, "little")).digest())
+        self.blockhashes.setdefault(str(blockhash), slot)
+        return blockhash
+
+    def encode_account(self, account: Account, encoding: str = "base64", data_slice: dict | None = None) -> dict:
+        data = account.data
+        if encoding == "jsonParsed" and account.owner == TOKEN_PROGRAM:
+            return self._account_json(account, {"program": "spl-token", "parsed": self.parse_token(data), "space": len(data)})
+        if data_slice:
+            data = data[data_slice["offset"]:data_slice["offset"] + data_slice["length"]]
+        return self._account_json(account, [base64.b64encode(data).decode(), "base64"])
+
+    def _account_json(self, account: Account, data) -> dict:
+        return {"data": data, "executable": False, "lamports": account.lamports, "owner": str(account.owner), "rentEpoch": 18446744073709551615, "space": len(account.data)}
+
+    def parse_token(self, data: bytes) -> dict:
+        if len(data) == 82:
+            supply, decimals = struct.unpack_from("<QB", data, 36)
+            return {"type": "mint", "info": {"decimals": decimals, "freezeAuthority": None, "isInitialized": True, "mintAuthority": None, "supply": str(supply)}}
+        mint, owner = Pubkey.from_bytes(data[:32]), Pubkey.from_bytes(data[32:64])
+        amount = struct.unpack_from("<Q", data, 64)[0]
+        decimals = self.decimals(mint)
+        return {"type": "account", "info": {
+            "isNative": False, "mint": str(mint), "owner": str(owner), "state": "initialized",
+            "tokenAmount": {"amount": str(amount), "decimals": decimals, "uiAmount": amount / 10 ** decimals, "uiAmountString": str(amount / 10 ** decimals)},
+        }}
+
+    def decimals(self, mint: Pubkey) -> int:
+        account = self.accounts.get(mint)
+        return account.data[MINT_DECIMALS_OFFSET] if account is not None else 9
+
+    # transport
+
+    async def answer(self, request: dict, ws=None) -> dict:
+        method, rid = request.get("method", ""), request.get("id")
+        self.ledger.requests[method] += 1
+        delay = self.faults.delay(method)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            if self.faults.fails(method):
+                self.ledger.injected[method] += 1
+                raise RpcError(-32005, "Node is behind by 42 slots (injected)", {"numSlotsBehind": 42})
+            handler = getattr(self, f"rpc_{method}", None)
+            if handler is None or (method in WS_METHODS) != (ws is not None):
+                raise RpcError(-32601, "Method not found")
+            params = request.get("params", [])
+            return {"jsonrpc": "2.0", "id": rid, "result": handler(ws, *params) if ws is not None else handler(*params)}
+        except RpcError as e:
+            return {"jsonrpc": "2.0", "id": rid, "error": e.response()}
+        except Exception as e:
+            logging.exception(f"Mock RPC failed on {method}")
+            return {"jsonrpc": "2.0", "id": rid, "error": {"code": -32603, "message": f"Internal error: {e}"}}
+
+    async def http(self, request):
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response(await asyncio.gather(*(self.answer(item) for item in body)))
+        return web.json_response(await self.answer(body))
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        self.sockets.add(ws)
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    asyncio.create_task(self._ws_request(ws, json.loads(msg.data)))
+        finally:
+            self.sockets.discard(ws)
+            for sub_id in [sub_id for sub_id, (owner, _, _) in self.subs.items() if owner is ws]:
+                self._forget(sub_id)
+        return ws
+
+    async def _ws_request(self, ws, request: dict):
+        method = request.get("method", "")
+        response = await self.answer(request, ws)
+        await self._send(ws, json.dumps(response))
+        if method == "signatureSubscribe" and "result" in response and request["params"][0] in self.statuses:
+            await self.publish_signature(request["params"][0]) # landed before the bot asked
+
+    def _subscribe(self, ws, kind: str, key: str) -> int:
+        sub_id, self.next_sub = self.next_sub, self.next_sub + 1
+        self.subs[sub_id] = (ws, kind, key)
+        self.watchers[(kind, key)][sub_id] = ws
+        return sub_id
+
+    def _forget(self, sub_id: int) -> bool:
+        entry = self.subs.pop(sub_id, None)
+        if entry is None:
+            return False
+        _, kind, key = entry
+        watchers = self.watchers.get((kind, key), {})
+        watchers.pop(sub_id, None)
+        if not watchers:
+            self.watchers.pop((kind, key), None)
+        return True
+
+    # websocket methods
+
+    def rpc_logsSubscribe(self, ws, filter, config=None):
+        mentions = filter.get("mentions", []) if isinstance(filter, dict) else [str(BELIEVE)]
+        if str(BELIEVE) not in mentions:
+            raise RpcError(-32602, "only logs mentioning the Believe program are mocked")
+        self.listening.set()
+        return self._subscribe(ws, "logs", str(BELIEVE))
+
+    def rpc_accountSubscribe(self, ws, pubkey, config=None):
+        launch = self.pools.get(Pubkey.from_string(pubkey))
+        if launch is not None and launch.watched is None:
+            launch.watched = time.perf_counter()
+        return self._subscribe(ws, "account", pubkey)
+
+    def rpc_signatureSubscribe(self, ws, signature, config=None):
+        return self._subscribe(ws, "signature", signature)
+
+    def rpc_logsUnsubscribe(self, ws, sub_id):
+        return self._forget(sub_id)
+
+    rpc_accountUnsubscribe = rpc_signatureUnsubscribe = rpc_logsUnsubscribe
+
+    # HTTP methods
+
+    def _context(self, value) -> dict:
+        return {"context": {"slot": self.slot()}, "value": value}
+
+    def rpc_getHealth(self):
+        return "ok"
+
+    def rpc_getSlot(self, config=None):
+        return self.slot()
+
+    def rpc_getAccountInfo(self, pubkey, config=None):
+        config = config or {}
+        account = self.accounts.get(Pubkey.from_string(pubkey))
+        return self._context(None if account is None else self.encode_account(account, config.get("encoding", "base64"), config.get("dataSlice")))
+
+    def rpc_getMultipleAccounts(self, pubkeys, config=None):
+        config = config or {}
+        accounts = [self.accounts.get(Pubkey.from_string(pubkey)) for pubkey in pubkeys]
+        return self._context([
+            None if account is None else self.encode_account(account, config.get("encoding", "base64"), config.get("dataSlice"))
+            for account in accounts
+        ])
+
+    def rpc_getProgramAccounts(self, program, config=None):
+        config = config or {}
+        program, found = Pubkey.from_string(program), []
+        for pubkey, account in self.accounts.items():
+            if account.owner != program or not all(self._matches(account.data, f) for f in config.get("filters", [])):
+                continue
+            found.append({"pubkey": str(pubkey), "account": self.encode_account(account, config.get("encoding", "base64"), config.get("dataSlice"))})
+        return self._context(found) if config.get("withContext") else found
+
+    @staticmethod
+    def _matches(data: bytes, filter: dict) -> bool:
+        if "dataSize" in filter:
+            return len(data) == filter["dataSize"]
+        memcmp = filter["memcmp"]
+        if memcmp.get("encoding") == "base64":
+            expected = base64.b64decode(memcmp["bytes"])
+        else:
+            try:
+                expected = bytes(Pubkey.from_string(memcmp["bytes"]))
+            except ValueError:
+                raise RpcError(-32602, "only base64 and pubkey sized base58 memcmp filters are mocked")
+        return data[memcmp["offset"]:memcmp["offset"] + len(expected)] == expected
+
+    def rpc_getTokenAccountsByOwner(self, owner, filter, config=None):
+        config, owner = config or {}, Pubkey.from_string(owner)
+        program = Pubkey.from_string(filter["programId"]) if "programId" in filter else None
+        mint = Pubkey.from_string(filter["mint"]) if "mint" in filter else None
+        found = []
+        for pubkey, account in self.accounts.items():
+            data = account.data
+            if len(data) != 165 or data[32:64] != bytes(owner):
+                continue
+            if (program is not None and account.owner != program) or (mint is not None and data[:32] != bytes(mint)):
+                continue
+            found.append({"pubkey": str(pubkey), "account": self.encode_account(account, config.get("encoding", "base64"))})
+        return self._context(found)
+
+    def rpc_getTransaction(self, signature, config=None):
+        visible_at, result = self.transactions.get(signature, (None, None))
+        if result is None or time.perf_counter() < visible_at:
+            return None
+        launch = self.by_signature.get(signature)
+        if launch is not None and launch.fetched is None:
+            launch.fetched = time.perf_counter()
+        return result
+
+    def rpc_getLatestBlockhash(self, config=None):
+        slot = self.slot()
+        return self._context({"blockhash": str(self.blockhash(slot)), "lastValidBlockHeight": slot + BLOCKHASH_SLOTS})
+
+    def rpc_getSignatureStatuses(self, signatures, config=None):
+        current, statuses = self.slot(), []
+        for signature in signatures:
+            landed = self.statuses.get(signature)
+            if landed is None:
+                statuses.append(None)
+                continue
+            slot, err = landed
+            statuses.append({
+                "slot": slot, "confirmations": None if current - slot > 31 else current - slot, "err": err,
+                "status": {"Ok": None} if err is None else {"Err": err},
+                "confirmationStatus": "finalized" if current - slot > 31 else "confirmed",
+            })
+        return self._context(statuses)
+
+    def rpc_sendTransaction(self, encoded, config=None):
+        config = config or {}
+        if config.get("encoding", "base58") != "base64":
+            raise RpcError(-32602, "only base64 transactions are mocked")
+        try:
+            tx = VersionedTransaction.from_bytes(base64.b64decode(encoded))
+        except Exception as e:
+            self.ledger.sends["rejected"] += 1
+            raise RpcError(-32602, f"failed to deserialize VersionedTransaction: {e}")
+        signature = str(tx.signatures[0])
+        if signature in self.sent:
+            self.ledger.sends["duplicates"] += 1
+            return signature
+        if not all(tx.verify_with_results()):
+            self.ledger.sends["rejected"] += 1
+            raise RpcError(-32003, "Transaction signature verification failure")
+
+        message, now = tx.message, time.perf_counter()
+        keys = message.account_keys
+        issued = self.blockhashes.get(str(message.recent_blockhash))
+        stale = issued is None or self.slot() - issued > BLOCKHASH_SLOTS
+        if stale and not config.get("skipPreflight"):
+            raise RpcError(-32002, "Transaction simulation failed: Blockhash not found", {
+                "err": "BlockhashNotFound", "logs": [], "accounts": None, "unitsConsumed": 0, "returnData": None,
+            })
+
+        entry = {"signature": signature, "at": now, "kind": "other", "mint": None, "amount_in": 0, "min_out": 0, "out": 0, "landed": False, "err": None, "stale": stale}
+        swap = None
+        for position, ix in enumerate(message.instructions):
+            if keys[ix.program_id_index] == DBC and bytes(ix.data[:8]) == SWAP_DISCRIM:
+                accounts = [keys[i] for i in ix.accounts]
+                user, base_mint = accounts[9], accounts[7]
+                launch = self.pools.get(accounts[2])
+                buy = accounts[3] == get_associated_token_address(user, WSOL_MINT)
+                entry["amount_in"], entry["min_out"] = struct.unpack_from("<QQ", ix.data, 8)
+                entry["kind"], entry["mint"] = "buy" if buy else "sell", str(base_mint)
+                swap = (position, user, base_mint, launch)
+                if launch is not None:
+                    if buy:
+                        launch.buys += 1
+                        launch.bought = launch.bought or now
+                    else:
+                        launch.sells += 1
+                break
+        self.sent[signature] = entry
+        self.ledger.transactions.append(entry)
+        self.ledger.sends[{"buy": "buys", "sell": "sells"}.get(entry["kind"], "other")] += 1
+        if stale:
+            self.ledger.sends["stale"] += 1 # accepted without preflight, never lands
+        elif self.faults.lands():
+            asyncio.get_running_loop().call_later(self.faults.confirm_delay, lambda: asyncio.ensure_future(self.land(entry, swap)))
+        else:
+            self.ledger.sends["dropped"] += 1
+        return signature
+
+    async def land(self, entry: dict, swap: tuple | None):
+        """
+            Apply a sent transaction, a swap fills against the pool as it is when it lands or fails as a whole.
+        """
+        err, launch = None, None
+        if swap is not None:
+            position, user, base_mint, launch = swap
+            buy, ata = entry["kind"] == "buy", get_associated_token_address(user, base_mint)
+            account = self.accounts.get(ata)
+            held = struct.unpack_from("<Q", account.data, 64)[0] if account is not None else 0
+            if launch is None:
+                err = {"InstructionError": [position, SWAP_ERROR]}
+            elif not buy and entry["amount_in"] > held:
+                err = {"InstructionError": [position, INSUFFICIENT_FUNDS]}
+            else:
+                try:
+                    entry["out"] = self.fill(launch, entry["amount_in"], buy, entry["min_out"])
+                except (RuntimeError, ValueError):
+                    err = {"InstructionError": [position, SWAP_ERROR]}
+            if err is None:
+                balance = held + entry["out"] if buy else held - entry["amount_in"]
+                self.accounts[ata] = Account(token_account(base_mint, user, balance), TOKEN_PROGRAM)
+                if buy:
+                    self.ledger.lamports["spent"] += entry["amount_in"]
+                else:
+                    self.ledger.lamports["received"] += entry["out"]
+        entry["landed"], entry["err"] = True, err
+        self.ledger.sends["landed" if err is None else "failed"] += 1
+        self.statuses[entry["signature"]] = (self.slot(), err)
+        if swap is not None and err is None:
+            await self.publish_account(get_associated_token_address(swap[1], swap[2]))
+            await self.publish_pool(launch)
+        await self.publish_signature(entry["signature"])
+
+def method_values(values: list | None, default: float | None = None) -> dict:
+    """
+        ["0.02", "getTransaction=0.2"] -> {"*": 0.02, "getTransaction": 0.2}
+    """
+    table = {} if default is None else {"*": default}
+    for value in values or []:
+        method, _, number = value.rpartition("=")
+        table[method or "*"] = float(number)
+    return table
+
+def load_scenario(path: str) -> tuple:
+    """
+        A JSON scenario file: Scenario settings plus an optional "faults" object of Faults arguments.
+    """
+    with open(path) as f:
+        values = json.load(f)
+    return values, values.pop("faults", {})
+
+async def serve(scenario: Scenario, faults: Faults, host: str, port: int, wait: bool, linger: float, report: str | None):
+    mock = MockSolana(scenario, faults, host, port)
+    await mock.start()
+    cprint(f"Mock Solana RPC on {mock.url} and {mock.ws_url}", color=cc.LIGHT_WHITE)
+    cprint(f"Run the bot with HTTP_RPC_URL={mock.url} WS_RPC_URL={mock.ws_url}, add DBC_POOL_CONFIGS={mock.config} to skip getProgramAccounts", color=cc.LIGHT_GRAY)
+    if wait:
+        cprint(f"{scenario.launches} launches over {scenario.duration:g}s start once the bot subscribes to the Believe logs", color=cc.LIGHT_GRAY)
+    try:
+        await mock.play(wait)
+        cprint(f"Scenario done, serving the bot's exits for {linger:g}s more", color=cc.LIGHT_GRAY)
+        await asyncio.sleep(linger)
+    finally:
+        cprint(mock.ledger.summary(mock.launches), color=cc.LIGHT_GREEN)
+        if report:
+            with open(report, "w") as f:
+                json.dump(mock.ledger.report(mock.launches), f, indent=2)
+        await mock.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock Solana RPC and websocket server playing Believe launches")
+    parser.add_argument("--scenario", help="JSON file of scenario settings and faults, the options below override it")
+    for name, default in Scenario.DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=None, help=f"default {default}")
+    parser.add_argument("--latency", action="append", help="seconds before answering, METHOD=S for one method, repeatable")
+    parser.add_argument("--jitter", action="append", help="mean of the exponential latency tail, METHOD=S for one method, repeatable")
+    parser.add_argument("--errors", action="append", help="share of requests answered with an error, METHOD=R for one method, repeatable")
+    parser.add_argument("--tx-delay", type=float, default=None, help="seconds launch transactions are invisible to getTransaction")
+    parser.add_argument("--land-rate", type=float, default=None, help="share of sent transactions that land")
+    parser.add_argument("--confirm-delay", type=float, default=None, help="seconds until a sent transaction lands")
+    parser.add_argument("--drop-every", type=float, default=None, help="close every websocket this often, 0 never")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--no-wait", action="store_true", help="start the scenario right away instead of on the bot's log subscription")
+    parser.add_argument("--linger", type=float, default=30.0, help="seconds to keep serving after the last event")
+    parser.add_argument("--json", help="write the final report here")
+    args = parser.parse_args()
+
+    values, faults = load_scenario(args.scenario) if args.scenario else ({}, {})
+    for name in Scenario.DEFAULTS:
+        if getattr(args, name) is not None:
+            values[name] = getattr(args, name)
+    scenario = Scenario(**values)
+    for name, table in (("latency", args.latency), ("jitter", args.jitter), ("errors", args.errors)):
+        if table:
+            faults[name] = {**faults.get(name, {}), **method_values(table)}
+    for name in ("tx_delay", "land_rate", "confirm_delay", "drop_every"):
+        if getattr(args, name) is not None:
+            faults[name] = getattr(args, name)
+    faults.setdefault("seed", scenario.seed)
+
+    try:
+        asyncio.run(serve(scenario, Faults(**faults), args.host, args.port, not args.no_wait, args.linger, args.json))
+    except KeyboardInterrupt:
+        pass
+
+def run():
+    main()
+
+if __name__ == "__main__":
+    main()
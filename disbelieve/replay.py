@@ -0,0 +1,217 @@
+try: from .main import Disbelieve
+except: from main import Disbelieve
+try: from .libs import BELIEVE, FIRST_BUY_AMOUNT, GAS, cc, cprint
+except: from libs import BELIEVE, FIRST_BUY_AMOUNT, GAS, cc, cprint
+try: from .libs.feed import LogFeed
+except: from libs.feed import LogFeed
+try: from .libs.pricebus import PriceBus
+except: from libs.pricebus import PriceBus
+try: from .libs.metrics import Metrics
+except: from libs.metrics import Metrics
+try: from .libs.recorder import read_records, split_account, LOG_FRAME, ACCOUNT, TX_META, ONBOARD
+except: from libs.recorder import read_records, split_account, LOG_FRAME, ACCOUNT, TX_META, ONBOARD
+try: from .libs.meteoraDBC.state import sqrt_price_from_account, price_from_sqrt
+except: from libs.meteoraDBC.state import sqrt_price_from_account, price_from_sqrt
+from collections import defaultdict
+import argparse, asyncio, json, logging, time
+
+SETTLE_TICKS = 16 # loop iterations a record needs to travel feed -> monitor -> position handler
+
+class SimClock:
+    """
+        Replay time, moved forward by the driver to each record's receive timestamp.
+    """
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+class PaperConfirmations:
+    def __init__(self):
+        self.tracked = 0
+
+    def track(self, signature, commitment=None) -> asyncio.Future:
+        self.tracked += 1
+        future = asyncio.get_running_loop().create_future()
+        future.set_result({"signature": str(signature), "slot": None, "err": None, "latency": 0.0, "source": "paper"})
+        return future
+
+class ReplayHook:
+    """
+        Stands in for SolHook during replay: launch metas come from the recording instead of RPC,
+        recorded pool updates replace the account subscriptions and trades are paper fills at the
+        last streamed price (fees are the configured GAS, curve slippage isn't modelled).
+    """
+    def __init__(self, parent, metas: dict, onboards: dict):
+        self.parent = parent
+        self.logs = asyncio.Queue()
+        self.feed = LogFeed(self.logs, BELIEVE)
+        self.prices = PriceBus()
+        self.confirmations = PaperConfirmations()
+        self.ticks = None
+        self.metrics = Metrics()
+        self.metas = metas       # signature -> recorded meta
+        self.onboards = onboards # mint -> recorded onboarding info
+        self.decimals = {}       # mints the bot onboarded -> base decimals
+        self.last_prices = {}    # mint -> last recorded price, also after the bot dropped the mint
+        self.positions = defaultdict(lambda: {"tokens": 0.0, "spent": 0.0, "received": 0.0})
+        self.trades = 0
+
+    async def get_swap_tx(self, tx_id: str):
+        return self.metas.get(tx_id)
+
+    async def onboard(self, mint: str, detected_at: float | None = None):
+        info = self.onboards.get(mint)
+        if info is not None:
+            self.decimals[mint] = info["decimals"]
+
+    def on_account(self, mint: str, data: bytes, ts: float):
+        info = self.onboards.get(mint)
+        if info is None:
+            return
+        sqrt_q64 = sqrt_price_from_account(data)
+        price = self.last_prices[mint] = price_from_sqrt(sqrt_q64, info["decimals"], 9)
+        if mint in self.decimals:
+            self.prices.publish(mint, {"mint": mint, "price": price, "sqrt": sqrt_q64, "ts": ts})
+
+    def _price(self, mint: str) -> float:
+        update = self.prices.latest.get(mint)
+        return float(update["price"]) if update else 0.0
+
+    async def meteora_dbc_buy(self, mint: str, buy_amount: float = FIRST_BUY_AMOUNT, fee_sol: float = GAS):
+        price = self._price(mint)
+        if price <= 0:
+            return None
+        position = self.positions[mint]
+        position["tokens"] += buy_amount / price
+        position["spent"] += buy_amount + fee_sol
+        self.trades += 1
+        return f"paper-buy-{self.trades}"
+
+    async def meteora_dbc_sell(self, mint: str, percentage: float, fee_sol: float = GAS):
+        price, position = self._price(mint), self.positions[mint]
+        tokens = position["tokens"] * percentage / 100
+        if price <= 0 or tokens <= 0:
+            return None
+        position["tokens"] -= tokens
+        position["received"] += tokens * price - fee_sol
+        self.trades += 1
+        return f"paper-sell-{self.trades}"
+
+    async def unsubscribe_state(self, mint: str):
+        self.decimals.pop(str(mint), None)
+
+    def pnl(self, mint: str | None = None) -> float:
+        """
+            Realized plus unrealized PnL, tokens left in the wallet are valued at the mint's last recorded price.
+        """
+        positions = self.positions.items() if mint is None else [(mint, self.positions[mint])]
+        return sum(p["received"] + p["tokens"] * self.last_prices.get(m, 0.0) - p["spent"] for m, p in positions)
+
+    def summary(self) -> str:
+        return f"{self.trades} paper trades on {len(self.positions)} mints, PnL {self.pnl():+.6f} SOL"
+
+class Replay:
+    """
+        Feeds a recording through the real monitor, price handler and position handlers.
+
+        The strategy's clock and timers follow the recorded receive times, `speed` 0 replays as fast
+        as the handlers keep up, any other value sleeps the recorded gaps divided by it.
+    """
+    def __init__(self, path: str, speed: float = 0.0, settings=None):
+        self.path = path
+        self.speed = speed
+        self.settings = settings # overrides the Settings read from the environment
+        self.records, self.metas, self.onboards = [], {}, {}
+        for kind, ts, slot, payload in read_records(path):
+            if kind == TX_META:
+                entry = json.loads(payload)
+                self.metas[entry["signature"]] = entry["meta"]
+            elif kind == ONBOARD:
+                entry = json.loads(payload)
+                self.onboards[entry["mint"]] = entry
+            else:
+                self.records.append((kind, ts, payload))
+
+    async def settle(self, hook: ReplayHook):
+        spins = 0
+        while (hook.logs.qsize() or hook.prices.depth) and spins < 10_000: # bounded if a handler died
+            await asyncio.sleep(0)
+            spins += 1
+        for _ in range(SETTLE_TICKS):
+            await asyncio.sleep(0)
+
+    async def advance(self, bot: Disbelieve, clock: SimClock, ts: float):
+        """
+            Fire every timer due up to `ts` at its own deadline, then move the clock to `ts`.
+        """
+        while True:
+            deadline = bot.timers.fire_due(clock.now)
+            await self.settle(bot.hook)
+            if deadline is None or deadline > ts:
+                break
+            clock.now = deadline
+        clock.now = max(clock.now, ts)
+
+    async def run(self) -> dict:
+        if not self.records:
+            raise ValueError(f"{self.path} has no log frames or pool updates")
+        clock = SimClock(self.records[0][1])
+        bot = Disbelieve(clock=clock)
+        if self.settings is not None:
+            bot.settings = self.settings
+        hook = bot.hook = ReplayHook(bot, self.metas, self.onboards)
+        tasks = [asyncio.create_task(coro) for coro in (bot.monitor_believe(), bot.mint_queue_processor(), bot.mint_updates_handler())]
+
+        started, previous = time.perf_counter(), None
+        for kind, ts, payload in self.records:
+            if self.speed and previous is not None:
+                await asyncio.sleep(max(0.0, ts - previous) / self.speed)
+            previous = ts
+            await self.advance(bot, clock, ts)
+            if kind == LOG_FRAME:
+                hook.feed(payload.decode())
+            elif kind == ACCOUNT:
+                hook.on_account(*split_account(payload), ts)
+            await self.settle(hook)
+
+        # open positions run into their no-activity exits
+        await self.advance(bot, clock, clock.now + bot.settings.no_activity_threshold + 1)
+        wall = time.perf_counter() - started
+        for task in tasks:
+            task.cancel()
+
+        span = self.records[-1][1] - self.records[0][1]
+        return {
+            "records": len(self.records),
+            "span": span,
+            "wall": wall,
+            "speedup": span / wall if wall else float("inf"),
+            "mints": len(self.onboards),
+            "trades": hook.trades,
+            "pnl": hook.pnl(),
+            "mint_pnl": {mint: hook.pnl(mint) for mint in hook.positions},
+            "feed": hook.feed.summary(),
+            "summary": hook.summary(),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a Disbelieve recording against the strategy")
+    parser.add_argument("path", help="file written with RECORD_PATH set")
+    parser.add_argument("--speed", type=float, default=0.0, help="recorded time per wall second, 0 runs unthrottled")
+    parser.add_argument("--quiet", action="store_true", help="only print the result")
+    args = parser.parse_args()
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    result = asyncio.run(Replay(args.path, args.speed).run())
+    cprint(f"Replayed {result['records']} records ({result['span']:.1f}s recorded) in {result['wall']:.2f}s, {result['speedup']:.0f}x real time", color=cc.LIGHT_WHITE)
+    cprint(f"Feed: {result['feed']}", color=cc.LIGHT_GRAY)
+    cprint(result["summary"], color=cc.LIGHT_GREEN if result["pnl"] >= 0 else cc.LIGHT_RED)
+
+def run():
+    main()
+
+if __name__ == "__main__":
+    main()
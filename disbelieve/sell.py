@@ -11,6 +11,9 @@ class Sell:
 
     async def sell(self, mint: str, pct: float, fee_sol: float = GAS):
         try:
+            meteora_dbc = self.hook.meteora_dbc
+            state = meteora_dbc.states[mint] = await meteora_dbc.current_state(mint) # the sell reuses it
+            await meteora_dbc.warm_configs(state["config"]) # quotes min out on the curve, not the reserves
             sell = await self.hook.meteora_dbc_sell(mint, float(pct), fee_sol)
             return sell
         except Exception as e:
@@ -0,0 +1,264 @@
+try: from .libs import FIRST_BUY_AMOUNT, NEXT_BUY_AMOUNT, GAS, cc, cprint
+except: from libs import FIRST_BUY_AMOUNT, NEXT_BUY_AMOUNT, GAS, cc, cprint
+try: from .libs.recorder import read_records, split_account, ACCOUNT, ONBOARD
+except: from libs.recorder import read_records, split_account, ACCOUNT, ONBOARD
+try: from .libs.ticks import TickStore
+except: from libs.ticks import TickStore
+try: from .libs.meteoraDBC.state import sqrt_price_from_account, price_from_sqrt
+except: from libs.meteoraDBC.state import sqrt_price_from_account, price_from_sqrt
+from concurrent.futures import ProcessPoolExecutor
+import argparse, itertools, json, os, time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Settings knobs, in grid column order, with the environment variable each one comes from
+PARAMS = [
+    ("target_profit", "TARGET_PROFIT"),
+    ("max_loss", "MAX_LOSS"),
+    ("checkpoint_balance_percentage", "CHECKPOINT_BALANCE_PERCENTAGE"),
+    ("no_activity_threshold", "NO_ACTIVITY_IN_SECONDS"),
+    ("max_loss_from_peak", "MAX_LOSS_FROM_PEAK_PERCENTAGE"),
+    ("min_buys_threshold", "MIN_BUYS_THRESHOLD"),
+]
+STABILIZER_DELAY = 1.0 # handle_holdings re-checks a drop from peak one second later
+
+class GridSimulation:
+    """
+        Disbelieve's entry and exit rules over one launch's price series, for every grid row at once.
+
+        Mirrors `handle_position`, `check_second_buy` and `handle_holdings`: every price update is one
+        evaluation and the no-activity and peak-stabilizer timers are extra evaluations at the last
+        price at their deadlines. Fills are at the evaluated price and each trade pays `gas`, tokens
+        still held when a position is dropped or the series ends are valued at the last price.
+    """
+    def __init__(self, grid, first_buy: float, next_buy: float, gas: float, disable_first_buy: bool = False):
+        self.tp, self.ml, self.cp, self.thr, self.mlp, self.mbt = (grid[:, i] for i in range(len(PARAMS)))
+        self.first_buy, self.next_buy, self.gas = first_buy, next_buy, gas
+        self.disable_first_buy = disable_first_buy
+        n = len(grid)
+        self.done = np.zeros(n, bool)         # mint in self.sold, the position handler returned
+        self.holding = np.zeros(n, bool)      # MintState.held
+        self.traded = np.zeros(n, bool)
+        self.buy_price = np.zeros(n)
+        self.tokens = np.zeros(n)
+        self.cash = np.zeros(n)
+        self.sold_pct = np.zeros(n)           # MintState.sold_pct
+        self.stab_until = np.full(n, np.inf)  # MintState.stabilize_until
+        self.has_second_buy = np.zeros(n, bool)
+        self.stab_due = np.full(n, np.inf)    # pending peak_stabilizer timer
+        self.idle_due = np.full(n, np.inf)    # pending no_activity timer
+        self.open_price, self.last_price, self.high, self.last_change, self.buys = 0.0, 0.0, 0.0, 0.0, 0
+
+    def _buy(self, mask, price: float, amount: float):
+        self.holding |= mask
+        self.traded |= mask
+        self.tokens[mask] += amount / price
+        self.cash[mask] -= amount + self.gas
+        self.buy_price[mask & (self.buy_price == 0)] = price
+
+    def _sell(self, mask, price: float, pct):
+        mask = mask & (self.tokens > 0) # nothing is sent without a balance
+        sold = self.tokens[mask] * pct[mask] / 100
+        self.tokens[mask] -= sold
+        self.cash[mask] += sold * price - self.gas
+
+    def evaluate(self, mask, price: float, now):
+        """
+            One `handle_holdings(mint, price, high_price, last_activity_time)` call for the rows in `mask`.
+        """
+        mask = mask & ~self.done
+        held = mask & self.holding # the first buy returns before any exit is checked
+        if not self.disable_first_buy:
+            self._buy(mask & ~self.holding, price, self.first_buy)
+
+        peak = held & (price <= self.high * (1 - self.mlp))
+        first = peak & (self.stab_until == np.inf) # re-checked a second later
+        self.stab_until[first] = (now + STABILIZER_DELAY) if np.isscalar(now) else now[first] + STABILIZER_DELAY
+        self.stab_due[first] = self.stab_until[first]
+        wait = peak & (now < self.stab_until) # nothing is sold before the second is up
+        rest = held & ~peak
+        target = rest & (price > self.buy_price * self.tp)
+        checkpoint = target & (self.sold_pct < 100)
+        self._sell(checkpoint, price, self.cp)
+        self.sold_pct[checkpoint] += self.cp[checkpoint]
+        rest &= ~target
+        loss = rest & (price <= self.buy_price * self.ml)
+        idle = rest & ~loss & ((now - self.last_change) >= self.thr)
+
+        exits = (peak & ~wait) | loss | idle
+        self._sell(exits, price, np.full(len(self.done), 100.0))
+        self.done |= exits | (target & ~checkpoint) # "Already sold" drops the position without a sell
+        self.holding &= ~self.done
+
+    def fire_timers(self, until: float):
+        """
+            Evaluate every timer due up to `until` at its own deadline, at the last price.
+            Timers of a row that are due together wake its handler once.
+        """
+        while True:
+            due = np.minimum(self.stab_due, self.idle_due)
+            fire = ~self.done & (due <= until) & (due < np.inf)
+            if not fire.any():
+                return
+            self.stab_due[fire & (self.stab_due == due)] = np.inf
+            self.idle_due[fire & (self.idle_due == due)] = np.inf
+            self.evaluate(fire, self.last_price, due)
+
+    def tick(self, ts: float, price: float):
+        self.fire_timers(ts)
+        active = ~self.done
+        if price != self.last_price:
+            self.last_change = ts
+            self.idle_due[active] = ts + self.thr[active]
+            is_buy = price > self.last_price
+            self.buys += is_buy
+            self.high = max(self.high, price)
+            if is_buy:
+                second = active & ~self.has_second_buy & (price > self.open_price * (1 + self.tp * 0.05)) & (self.buys > self.mbt)
+                self._buy(second, price, self.next_buy)
+                self.has_second_buy |= second
+            self.last_price = price
+        self.evaluate(active, price, ts)
+
+    def run(self, ts, prices) -> tuple:
+        """
+            Returns (PnL in SOL, traded) per grid row.
+        """
+        positive = prices > 0
+        ts, prices = ts[positive], prices[positive]
+        if len(prices) == 0:
+            return self.cash, self.traded
+        self.open_price = float(prices[0])
+        for t, p in zip(ts.tolist(), prices.tolist()):
+            self.tick(t, p)
+            if self.done.all():
+                break
+        self.fire_timers(np.inf)
+        return self.cash + self.tokens * float(prices[-1]), self.traded
+
+def simulate_launches(args) -> tuple:
+    """
+        Worker entry point: (launches, grid, amounts) -> (PnL per [launch, row], traded per [launch, row]).
+    """
+    launches, grid, first_buy, next_buy, gas, disable_first_buy = args
+    pnl = np.zeros((len(launches), len(grid)))
+    traded = np.zeros((len(launches), len(grid)), bool)
+    for i, (ts, prices) in enumerate(launches):
+        pnl[i], traded[i] = GridSimulation(grid, first_buy, next_buy, gas, disable_first_buy).run(ts, prices)
+    return pnl, traded
+
+def sweep(launches: list, grid, first_buy: float = FIRST_BUY_AMOUNT, next_buy: float = NEXT_BUY_AMOUNT,
+          gas: float = GAS, disable_first_buy: bool = False, workers: int | None = None) -> dict:
+    """
+        Per-row results over `launches` ([(ts, prices)] in launch order): total PnL, share of the
+        traded launches that ended in profit, max drawdown of the running PnL and launches traded.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, len(launches) // (workers * 4)) # launch lengths vary a lot, smaller chunks balance the workers
+    jobs = [(launches[i:i + chunk], grid, first_buy, next_buy, gas, disable_first_buy) for i in range(0, len(launches), chunk)]
+    if workers == 1 or len(jobs) == 1:
+        parts = [simulate_launches(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(simulate_launches, jobs))
+    pnl = np.concatenate([p for p, _ in parts])
+    traded = np.concatenate([t for _, t in parts])
+
+    equity = np.vstack([np.zeros(len(grid)), np.cumsum(pnl, axis=0)])
+    drawdown = (np.maximum.accumulate(equity, axis=0) - equity).max(axis=0)
+    entered = traded.sum(axis=0)
+    hits = ((pnl > 0) & traded).sum(axis=0)
+    return {
+        "pnl": pnl.sum(axis=0),
+        "hit_rate": np.divide(hits, entered, out=np.zeros(len(grid)), where=entered > 0),
+        "drawdown": drawdown,
+        "traded": entered,
+    }
+
+def parse_values(spec: str) -> list:
+    """
+        "2,3,4" or "start:stop:step" (stop included).
+    """
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        return list(np.round(np.arange(start, stop + step / 2, step), 10))
+    return [float(x) for x in spec.split(",")]
+
+def build_grid(values: dict):
+    return np.array(list(itertools.product(*(values[name] for name, _ in PARAMS))), dtype=np.float64)
+
+def load_ticks(path: str) -> list:
+    store = TickStore(path)
+    launches = []
+    for mint in store.mints:
+        ticks = store.ticks(mint)
+        if len(ticks):
+            launches.append((np.array(ticks["ts"]), np.array(ticks["price"])))
+    store.close()
+    return sorted(launches, key=lambda launch: launch[0][0])
+
+def load_recording(path: str) -> list:
+    decimals, series = {}, {}
+    for kind, ts, _, payload in read_records(path):
+        if kind == ONBOARD:
+            entry = json.loads(payload)
+            decimals[entry["mint"]] = entry["decimals"]
+        elif kind == ACCOUNT:
+            mint, data = split_account(payload)
+            series.setdefault(mint, []).append((ts, sqrt_price_from_account(data)))
+    launches = []
+    for mint, points in series.items():
+        if mint in decimals:
+            ts = np.array([t for t, _ in points])
+            prices = np.array([price_from_sqrt(s, decimals[mint], 9) for _, s in points])
+            launches.append((ts, prices))
+    return sorted(launches, key=lambda launch: launch[0][0])
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the position Settings over recorded launches")
+    parser.add_argument("sources", nargs="+", help="TICK_STORE directories or RECORD_PATH files")
+    defaults = {"target_profit": "2:6:0.5", "max_loss": "0.5:0.95:0.05", "checkpoint_balance_percentage": "0.5,10,25,50",
+                "no_activity_threshold": "5,10,20,40", "max_loss_from_peak": "0.05:0.3:0.05", "min_buys_threshold": "5,10,15,25"}
+    for name, env in PARAMS:
+        parser.add_argument(f"--{name.replace('_', '-')}", default=defaults[name], help=f"{env} values, a,b,c or start:stop:step")
+    parser.add_argument("--first-buy", type=float, default=FIRST_BUY_AMOUNT)
+    parser.add_argument("--next-buy", type=float, default=NEXT_BUY_AMOUNT)
+    parser.add_argument("--gas", type=float, default=GAS)
+    parser.add_argument("--disable-first-buy", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--csv", help="write every configuration's results here")
+    args = parser.parse_args()
+    if np is None:
+        raise SystemExit("numpy is required for sweeps, install it with pip")
+
+    launches = []
+    for source in args.sources:
+        launches += load_ticks(source) if os.path.isdir(source) else load_recording(source)
+    launches.sort(key=lambda launch: launch[0][0])
+    grid = build_grid({name: parse_values(getattr(args, name)) for name, _ in PARAMS})
+
+    started = time.perf_counter()
+    result = sweep(launches, grid, args.first_buy, args.next_buy, args.gas, args.disable_first_buy, args.workers)
+    elapsed = time.perf_counter() - started
+    cprint(f"{len(grid)} configurations over {len(launches)} launches in {elapsed:.2f}s", color=cc.LIGHT_WHITE)
+
+    header = [env for _, env in PARAMS] + ["PNL_SOL", "HIT_RATE", "MAX_DRAWDOWN", "TRADED"]
+    rows = [list(grid[i]) + [result["pnl"][i], result["hit_rate"][i], result["drawdown"][i], int(result["traded"][i])] for i in range(len(grid))]
+    rows.sort(key=lambda row: row[-4], reverse=True)
+    for row in rows[:args.top]:
+        cprint("  ".join(f"{h}={v:g}" for h, v in zip(header, row)), color=cc.LIGHT_GREEN if row[-4] > 0 else cc.LIGHT_RED)
+    if args.csv:
+        with open(args.csv, "w") as f:
+            f.write(",".join(header) + "\n")
+            for row in rows:
+                f.write(",".join(f"{v:g}" for v in row) + "\n")
+
+def run():
+    main()
+
+if __name__ == "__main__":
+    main()
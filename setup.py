@@ -6,6 +6,7 @@ setup(
     version="0.1.25",
     packages=find_packages(),
     include_package_data=True,
+    package_data={"disbelieve": ["fixtures/*.json"]},
     install_requires=[
         "construct",
         "solana",
@@ -17,11 +18,19 @@ setup(
         "python-dotenv",
         "readchar"
     ],
+    extras_require={
+        "fast": ["orjson"],
+        "analytics": ["numpy"],
+    },
     python_requires=">=3.8",
     entry_points={
         "console_scripts": [
             "disbelieve = disbelieve.main:run",
             "sell = disbelieve.sell:run",
+            "disbelieve-replay = disbelieve.replay:run",
+            "disbelieve-sweep = disbelieve.sweep:run",
+            "disbelieve-bench = disbelieve.bench:run",
+            "disbelieve-mockrpc = disbelieve.mockrpc:run",
         ],
     },
     classifiers=[